@@ -0,0 +1,454 @@
+"""Minimal fake Discord REST API + gateway for benchmarks that need a logged-in Bot.
+
+Serves just enough of `/api/v10` for `Client.start()` (login, application
+info, gateway lookup, command sync), message creation and reactions, member
+lookups (`GET /guilds/{id}/members/{id}`, the synthetic members below), and a
+JSON gateway that answers HELLO, IDENTIFY and heartbeats. Point discord.py
+at it with `fake.patch_discord()`.
+
+Message and reaction routes enforce Discord-style per-channel fixed-window
+rate limits (`rate_limits`), answering 429 with `retry_after` and the
+X-RateLimit-* headers discord.py reads.
+
+For sharded runs `/gateway/bot` reports `shard_count` and
+`max_concurrency`, each shard's READY only lists its own guilds, IDENTIFYs
+closer than `identify_interval` within one bucket are answered with
+INVALID_SESSION and counted, and `events_per_second` streams MESSAGE_CREATE
+events into every shard's guild channels after READY.
+
+Every session keeps its last `session_log` dispatch events: RESUME (op 6)
+replays the ones after the client's sequence number and ends with RESUMED,
+or answers INVALID_SESSION for an unknown session. `emit()` adds events to
+a session while nothing is connected, as Discord does while a bot is down.
+REQUEST_GUILD_MEMBERS (op 8) is answered with 1000-member chunks of
+synthetic members up to the guild's `member_count` (every 20th a bot),
+filtered by `user_ids` or `query`/`limit` when the request has them.
+
+Connections opened with `compress=zlib-stream` get one zlib stream with a
+Z_SYNC_FLUSH per message, as Discord sends it; `bytes_sent` counts wire
+bytes. GUILD_CREATE honours the IDENTIFY's `large_threshold`: smaller
+guilds carry their full member list, larger ones are flagged `large`.
+Like Discord, a session only gets the events its IDENTIFY intents cover
+(`EVENT_INTENT_BITS`); the rest are counted in `filtered`.
+"""
+import asyncio
+import json
+import re
+import time
+import zlib
+from datetime import datetime, timezone
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+from benchmarks._stub import StubServer
+
+APPLICATION_ID = 100000000000000001
+BOT_USER = {"id": str(APPLICATION_ID), "username": "bench-bot", "discriminator": "0000", "avatar": None, "bot": True}
+OWNER_USER = {"id": "42", "username": "bench-owner", "discriminator": "0001", "avatar": None}  # passes is_owner() checks
+
+# Guild events -> intent bit Discord gates them behind (guild traffic only, so the guild_* bits)
+EVENT_INTENT_BITS = {
+    "GUILD_MEMBER_ADD": 1, "GUILD_MEMBER_UPDATE": 1, "GUILD_MEMBER_REMOVE": 1,
+    "GUILD_BAN_ADD": 2, "GUILD_BAN_REMOVE": 2,
+    "VOICE_STATE_UPDATE": 7,
+    "PRESENCE_UPDATE": 8,
+    "MESSAGE_CREATE": 9, "MESSAGE_UPDATE": 9, "MESSAGE_DELETE": 9, "MESSAGE_DELETE_BULK": 9,
+    "MESSAGE_REACTION_ADD": 10, "MESSAGE_REACTION_REMOVE": 10, "MESSAGE_REACTION_REMOVE_ALL": 10, "MESSAGE_REACTION_REMOVE_EMOJI": 10,
+    "TYPING_START": 11,
+}
+
+# Discord's per-channel limits: (requests, window seconds)
+DEFAULT_RATE_LIMITS = {"messages": (5, 5.0), "reactions": (1, 0.25)}
+
+_MESSAGES = re.compile(r"/channels/(\d+)/messages$")
+_REACTIONS = re.compile(r"/channels/(\d+)/messages/(\d+)/reactions/[^/]+/@me$")
+_MEMBER = re.compile(r"/guilds/(\d+)/members/(\d+)$")
+
+def patch_discord(url: str) -> None:
+    """Send every discord.py REST request and gateway connection to the fake at `url` (e.g. in a worker process)."""
+    import yarl
+    from discord.gateway import DiscordWebSocket
+    from discord.http import Route
+
+    Route.BASE = f"{url}/api/v10"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"{url.replace('http', 'ws', 1)}/gateway")
+
+def message_create(guild_id: str, channel_id: str, content: str, message_id: int, author_id: str = "42") -> Dict[str, Any]:
+    """MESSAGE_CREATE payload from a regular member in a guild text channel."""
+    return {
+        "id": str(message_id), "channel_id": channel_id, "guild_id": guild_id,
+        "author": {"id": author_id, "username": "chatter", "discriminator": "0001", "avatar": None},
+        "member": {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0},
+        "content": content, "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+        "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+        "embeds": [], "pinned": False, "type": 0, "flags": 0,
+    }
+
+def _json(data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # discord.py only decodes bodies whose Content-Type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), status=status, headers={"Content-Type": "application/json", **(headers or {})})
+
+class FakeDiscord:
+    """Async context manager running the fake REST API and gateway on one local port."""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        guilds: Optional[List[Dict[str, Any]]] = None,
+        rate_limits: Optional[Dict[str, tuple]] = None,
+        shard_count: int = 1,
+        max_concurrency: int = 1,
+        identify_interval: float = 0.0,
+        heartbeat_interval: float = 41.25,
+        events_per_second: float = 0.0,
+        ack_delay: float = 0.0,
+        session_log: int = 10_000,
+    ) -> None:
+        self.server = StubServer(self._handle, latency=latency)
+        self.guilds = guilds or []
+        self.shard_count = shard_count
+        self.max_concurrency = max_concurrency
+        self.identify_interval = identify_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.events_per_second = events_per_second
+        self.ack_delay = ack_delay  # discord.py stamps a heartbeat after sending it, so an instant ACK reads as a full interval
+        self._last_identify: Dict[int, float] = {}  # bucket -> time.monotonic()
+        self.identify_times: Dict[int, float] = {}  # shard id -> time.perf_counter() of its accepted IDENTIFY
+        self.ready_times: Dict[int, float] = {}
+        self.identify_violations = 0
+        self.events_sent: Counter = Counter()
+        self.shard_sockets: Dict[int, web.WebSocketResponse] = {}
+        self.session_log = session_log  # dispatch events kept per session for RESUME
+        self.session_logs: Dict[str, Dict[str, Any]] = {}
+        self.resumes = 0
+        self.resumed_events = 0
+        self.bytes_sent = 0  # on the wire, i.e. after transport compression
+        self.recording: Optional[List[str]] = None  # set to a list to capture every gateway message sent
+        self._compressors: Dict[web.WebSocketResponse, Any] = {}
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self._windows: Dict[tuple, List[float]] = {}  # (route, channel id) -> [remaining, reset_at]
+        self.rate_limited: Counter = Counter()
+        self.filtered: Counter = Counter()  # events a session's intents didn't cover
+        self.messages: List[Dict[str, Any]] = []
+        self.received_at: Dict[str, float] = {}  # message content -> time.perf_counter() when it landed
+        self.reactions: Counter = Counter()
+        self.gateway_ops: Counter = Counter()
+        self.identifies: List[Dict[str, Any]] = []
+        self.sockets: List[web.WebSocketResponse] = []
+        self.sessions = 0
+
+    @property
+    def url(self) -> str:
+        return self.server.url
+
+    @property
+    def hits(self) -> Counter:
+        return self.server.hits
+
+    def patch_discord(self) -> None:
+        """Send every discord.py REST request and gateway connection to this server."""
+        patch_discord(self.url)
+
+    async def __aenter__(self) -> "FakeDiscord":
+        await self.server.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        for ws in list(self.sockets):
+            await ws.close()
+        await self.server.__aexit__(*exc)
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        path = request.path
+        if path == "/gateway":
+            return await self._gateway(request)
+        if path.endswith("/users/@me"):
+            return _json(BOT_USER)
+        if path.endswith("/oauth2/applications/@me"):
+            return _json({
+                "id": str(APPLICATION_ID), "name": "bench", "icon": None, "description": "",
+                "bot_public": True, "bot_require_code_grant": False, "verify_key": "0" * 64,
+                "owner": OWNER_USER, "flags": 0, "team": None,
+            })
+        if path.endswith("/gateway/bot"):
+            return _json({
+                "url": f"ws://127.0.0.1:{self.server.port}/gateway",
+                "shards": self.shard_count,
+                "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": self.max_concurrency},
+            })
+        match = _MESSAGES.search(path)
+        if match and request.method == "POST":
+            return await self._create_message(request, int(match.group(1)))
+        match = _REACTIONS.search(path)
+        if match and request.method == "PUT":
+            limited, headers = self._take("reactions", int(match.group(1)))
+            if limited is not None:
+                return limited
+            self.reactions[int(match.group(2))] += 1
+            return web.Response(status=204, headers=headers)
+        match = _MEMBER.search(path)
+        if match and request.method == "GET":
+            guild = next((guild for guild in self.guilds if guild["id"] == match.group(1)), None)
+            i = int(match.group(2)) - int(match.group(1)) * 1000
+            if guild is None or not 0 <= i < guild.get("member_count", 0):
+                return _json({"message": "Unknown Member", "code": 10007}, status=404)
+            return _json(self.member_payload(guild, i))
+        if path.endswith("/commands") and request.method == "PUT":
+            payload = await request.json()
+            for i, command in enumerate(payload):
+                command.setdefault("id", str(APPLICATION_ID + i + 1))
+                command.setdefault("application_id", str(APPLICATION_ID))
+                command.setdefault("version", "1")
+            return _json(payload)
+        return _json({"message": "Unknown route", "code": 0}, status=404)
+
+    def _take(self, route: str, channel_id: int) -> tuple:
+        """Spend one request of the channel's window; returns (429 response or None, rate-limit headers)."""
+        limit, per = self.rate_limits[route]
+        now = time.monotonic()
+        window = self._windows.setdefault((route, channel_id), [limit, 0.0])
+        if now >= window[1]:
+            window[0], window[1] = limit, now + per
+        reset_after = round(window[1] - now, 3)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Bucket": f"{route}-bucket",
+            "X-RateLimit-Reset": str(time.time() + reset_after),
+            "X-RateLimit-Reset-After": str(reset_after),
+        }
+        if window[0] <= 0:
+            self.rate_limited[route] += 1
+            headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Scope": "user"})
+            return _json({"message": "You are being rate limited.", "retry_after": reset_after, "global": False}, status=429, headers=headers), headers
+        window[0] -= 1
+        headers["X-RateLimit-Remaining"] = str(window[0])
+        return None, headers
+
+    async def _create_message(self, request: web.Request, channel_id: int) -> web.Response:
+        limited, headers = self._take("messages", channel_id)
+        if limited is not None:
+            return limited
+        if request.content_type.startswith("multipart/"):
+            payload = json.loads((await request.post())["payload_json"])
+        else:
+            payload = await request.json()
+        message = {
+            "id": str(APPLICATION_ID + 10_000 + len(self.messages)),
+            "channel_id": str(channel_id),
+            "author": BOT_USER,
+            "content": payload.get("content") or "",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": payload.get("embeds") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        }
+        self.messages.append(message)
+        self.received_at[message["content"]] = time.perf_counter()
+        return _json(message, headers=headers)
+
+    def shard_guilds(self, shard: Optional[List[int]]) -> List[Dict[str, Any]]:
+        if not shard or shard[1] <= 1:
+            return self.guilds
+        return [guild for guild in self.guilds if (int(guild["id"]) >> 22) % shard[1] == shard[0]]
+
+    def ready_payload(self, sequence: int, guilds: Optional[List[Dict[str, Any]]] = None, shard: Optional[List[int]] = None) -> Dict[str, Any]:
+        self.sessions += 1
+        guilds = self.guilds if guilds is None else guilds
+        payload = {
+            "op": 0, "t": "READY", "s": sequence,
+            "d": {
+                "v": 10,
+                "user": BOT_USER,
+                "guilds": [{"id": guild["id"], "unavailable": True} for guild in guilds],
+                "session_id": f"session-{self.sessions}",
+                "resume_gateway_url": f"ws://127.0.0.1:{self.server.port}/gateway",
+                "application": {"id": str(APPLICATION_ID), "flags": 0},
+            },
+        }
+        if shard:
+            payload["d"]["shard"] = shard
+        return payload
+
+    async def dispatch(self, shard_id: int, event: str, data: Dict[str, Any]) -> None:
+        """Push one gateway event to a connected shard (no sequence number, so it doesn't skew event counts)."""
+        await self._send(self.shard_sockets[shard_id], {"op": 0, "t": event, "s": None, "d": data})
+
+    @staticmethod
+    def member_payload(guild: Dict[str, Any], i: int) -> Dict[str, Any]:
+        """Synthetic member `i` of a guild (ids are guild id * 1000 + i; every 20th is a bot)."""
+        user = {"id": str(int(guild["id"]) * 1000 + i), "username": f"member{i}", "discriminator": "0001", "avatar": None}
+        if i % 20 == 19:
+            user["bot"] = True
+        return {"user": user, "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+    def member_payloads(self, guild: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Synthetic members for a guild's `member_count`, as GUILD_MEMBERS_CHUNK sends them."""
+        return [self.member_payload(guild, i) for i in range(guild.get("member_count", 0))]
+
+    async def emit(self, session_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Add a dispatch event to a session, delivering it if a shard is connected (else it waits for a RESUME)."""
+        session = self.session_logs[session_id]
+        if not self._wants(session, event):
+            return
+        session["sequence"] += 1
+        message = {"op": 0, "t": event, "s": session["sequence"], "d": data}
+        session["log"].append(message)
+        ws = session["ws"]
+        if ws is not None and not ws.closed:
+            await self._send(ws, message)
+
+    def _wants(self, session: Dict[str, Any], event: str) -> bool:
+        bit = EVENT_INTENT_BITS.get(event)
+        if bit is None or session.get("intents") is None or session["intents"] >> bit & 1:
+            return True
+        self.filtered[event] += 1
+        return False
+
+    def guild_create(self, guild: Dict[str, Any], large_threshold: int) -> Dict[str, Any]:
+        """GUILD_CREATE as Discord sends it: members inline up to `large_threshold`, else flagged large without them."""
+        count = guild.get("member_count", len(guild.get("members", [])))
+        if count > large_threshold:
+            return {**guild, "large": True}
+        return {**guild, "large": False, "members": guild.get("members") or self.member_payloads(guild)}
+
+    async def _send(self, ws: web.WebSocketResponse, message: Dict[str, Any]) -> None:
+        raw = json.dumps(message)
+        if self.recording is not None:
+            self.recording.append(raw)
+        compressor = self._compressors.get(ws)
+        if compressor is None:
+            self.bytes_sent += len(raw)
+            await ws.send_str(raw)
+            return
+        frame = compressor.compress(raw.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.bytes_sent += len(frame)
+        await ws.send_bytes(frame)
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.sockets.append(ws)
+        if request.query.get("compress") == "zlib-stream":
+            self._compressors[ws] = zlib.compressobj()
+        session: Optional[Dict[str, Any]] = None
+        streamer: Optional[asyncio.Task] = None
+
+        async def send(event: str, data: Dict[str, Any]) -> None:
+            if not self._wants(session, event):
+                return
+            session["sequence"] += 1
+            message = {"op": 0, "t": event, "s": session["sequence"], "d": data}
+            session["log"].append(message)
+            await self._send(ws, message)
+
+        async def stream(shard_id: int, guilds: List[Dict[str, Any]]) -> None:
+            channels = [(guild["id"], channel["id"]) for guild in guilds for channel in guild.get("channels", [])]
+            if not channels:
+                return
+            interval, sent = 1 / self.events_per_second, 0
+            started = time.monotonic()
+            while not ws.closed:
+                guild_id, channel_id = channels[sent % len(channels)]
+                sent += 1
+                await send("MESSAGE_CREATE", message_create(guild_id, channel_id, "just chatting", APPLICATION_ID + 1_000_000 + self.events_sent.total()))
+                self.events_sent[shard_id] += 1
+                await asyncio.sleep(max(started + sent * interval - time.monotonic(), 0))
+
+        def attach(shard_id: int, guilds: List[Dict[str, Any]]) -> None:
+            nonlocal streamer
+            session["ws"] = ws
+            self.shard_sockets[shard_id] = ws
+            if self.events_per_second and streamer is None:
+                streamer = asyncio.create_task(stream(shard_id, guilds))
+
+        await self._send(ws, {"op": 10, "d": {"heartbeat_interval": int(self.heartbeat_interval * 1000)}})
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                self.gateway_ops[data["op"]] += 1
+                if data["op"] == 1:
+                    if self.ack_delay:
+                        asyncio.get_running_loop().call_later(self.ack_delay, lambda: asyncio.ensure_future(self._send(ws, {"op": 11})))
+                    else:
+                        await self._send(ws, {"op": 11})
+                elif data["op"] == 2:
+                    shard = data["d"].get("shard")
+                    shard_id = shard[0] if shard else 0
+                    bucket = shard_id % self.max_concurrency
+                    now = time.monotonic()
+                    if self.identify_interval and now - self._last_identify.get(bucket, float("-inf")) < self.identify_interval:
+                        self.identify_violations += 1
+                        await self._send(ws, {"op": 9, "d": False})
+                        continue
+                    self._last_identify[bucket] = now
+                    self.identify_times[shard_id] = time.perf_counter()
+                    self.identifies.append(data["d"])
+                    guilds = self.shard_guilds(shard)
+                    ready = self.ready_payload(0, guilds, shard)
+                    session = self.session_logs[ready["d"]["session_id"]] = {"sequence": 0, "log": deque(maxlen=self.session_log), "ws": None, "shard": shard_id, "intents": data["d"].get("intents")}
+                    attach(shard_id, guilds)
+                    await send("READY", ready["d"])
+                    for guild in guilds:
+                        await send("GUILD_CREATE", self.guild_create(guild, data["d"].get("large_threshold", 50)))
+                    self.ready_times[shard_id] = time.perf_counter()
+                    await asyncio.sleep(0)
+                elif data["op"] == 6:
+                    resumed = self.session_logs.get(data["d"]["session_id"])
+                    log = resumed["log"] if resumed else ()
+                    seq = data["d"]["seq"] or 0
+                    if resumed is None or (log and log[0]["s"] > seq + 1):
+                        await self._send(ws, {"op": 9, "d": False})  # unknown session or events already dropped
+                        continue
+                    session = resumed
+                    shard_id = session["shard"]
+                    attach(shard_id, self.shard_guilds([shard_id, self.shard_count]))
+                    missed = [message for message in log if message["s"] > seq]
+                    for message in missed:
+                        await self._send(ws, message)
+                    self.resumes += 1
+                    self.resumed_events += len(missed)
+                    await send("RESUMED", {})
+                    self.ready_times[shard_id] = time.perf_counter()
+                elif data["op"] == 8:
+                    request_data = data["d"]
+                    guild = next((guild for guild in self.guilds if guild["id"] == str(request_data["guild_id"])), None)
+                    not_found: List[str] = []
+                    if request_data.get("user_ids") is not None:
+                        user_ids = request_data["user_ids"]
+                        members = []
+                        for user_id in user_ids if isinstance(user_ids, list) else [user_ids]:
+                            i = int(user_id) - int(guild["id"]) * 1000 if guild else -1
+                            if guild and 0 <= i < guild.get("member_count", 0):
+                                members.append(self.member_payload(guild, i))
+                            else:
+                                not_found.append(str(user_id))
+                    else:
+                        members = self.member_payloads(guild) if guild else []
+                        if request_data.get("query"):
+                            members = [member for member in members if member["user"]["username"].startswith(request_data["query"])]
+                        if request_data.get("limit"):
+                            members = members[:request_data["limit"]]
+                    chunks = [members[i:i + 1000] for i in range(0, len(members), 1000)] or [[]]
+                    for index, chunk in enumerate(chunks):
+                        await send("GUILD_MEMBERS_CHUNK", {
+                            "guild_id": request_data["guild_id"], "members": chunk, "chunk_index": index,
+                            "chunk_count": len(chunks), "nonce": request_data.get("nonce"), "not_found": not_found,
+                        })
+        finally:
+            if streamer is not None:
+                streamer.cancel()
+            self.sockets.remove(ws)
+            self._compressors.pop(ws, None)
+        return ws
@@ -0,0 +1,47 @@
+"""Local aiohttp stub server shared by the benchmarks; counts every request it serves."""
+import asyncio
+import ssl
+from collections import Counter
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+class StubServer:
+    """Serve `handler` on 127.0.0.1 (random port) and count hits per path."""
+
+    def __init__(self, handler: Handler, *, latency: float = 0.0, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+        self.handler = handler
+        self.latency = latency
+        self.ssl_context = ssl_context
+        self.hits: Counter = Counter()
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"{'https' if self.ssl_context else 'http'}://127.0.0.1:{self.port}"
+
+    @property
+    def total(self) -> int:
+        return sum(self.hits.values())
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        self.hits[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await self.handler(request)
+
+    async def __aenter__(self) -> "StubServer":
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._dispatch)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=self.ssl_context)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._runner.cleanup()
@@ -0,0 +1,67 @@
+"""Check avatar download caching and in-flight dedup against a local CDN stub.
+
+Usage: python benchmarks/avatar_cache_bench.py --members 200 --burst 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiohttp import web
+
+from benchmarks._stub import StubServer
+from src.modules.avatar_cache import AvatarCache
+
+AVATAR = bytes(24 * 1024)  # roughly the size of a 256px avatar PNG
+
+async def _serve_avatar(request: web.Request) -> web.Response:
+    return web.Response(body=AVATAR, content_type="image/png")
+
+async def _run(members: int, burst: int, latency: float) -> dict:
+    async with StubServer(_serve_avatar, latency=latency) as cdn:
+        cache = AvatarCache(max_bytes=len(AVATAR) * members)
+        urls = [f"{cdn.url}/avatars/{uid}/{uid:032x}.png?size=256" for uid in range(members)]
+
+        # Join flood: the same members appear many times concurrently
+        flood = [urls[i % members] for i in range(max(burst, members))]
+        random.shuffle(flood)
+        started = time.perf_counter()
+        await asyncio.gather(*(cache.fetch(url) for url in flood))
+        flood_s = time.perf_counter() - started
+        flood_hits = cdn.total
+
+        # Everyone leaves and rejoins with the same avatar
+        started = time.perf_counter()
+        await asyncio.gather(*(cache.fetch(url) for url in urls))
+        rejoin_s = time.perf_counter() - started
+        await cache.close()
+
+        result = {
+            "fetches": len(flood) + members,
+            "distinct_avatars": members,
+            "upstream_requests_flood": flood_hits,
+            "upstream_requests_rejoin": cdn.total - flood_hits,
+            "flood_ms": round(flood_s * 1000, 1),
+            "rejoin_ms": round(rejoin_s * 1000, 1),
+            **cache.stats(),
+        }
+        assert flood_hits == members, "concurrent fetches of one avatar were not coalesced"
+        assert cdn.total == flood_hits, "rejoining members re-downloaded cached avatars"
+        return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the avatar cache against a local stub CDN.")
+    parser.add_argument("--members", type=int, default=200, help="Distinct avatars (default: 200)")
+    parser.add_argument("--burst", type=int, default=1000, help="Concurrent fetches in the flood (default: 1000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response delay in seconds (default: 0.05)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.members, args.burst, args.latency))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure event-loop latency while welcome cards are rendered under a join flood.
+
+Usage: python benchmarks/card_render_bench.py --rate 500 --seconds 5 --mode thread
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image
+
+from src.modules.card_renderer import CardQueueFull, CardRenderer, CardRequest, render_card
+
+def _fake_avatar() -> bytes:
+    buf = BytesIO()
+    Image.new("RGBA", (256, 256), (88, 101, 242, 255)).save(buf, format="PNG")
+    return buf.getvalue()
+
+async def _probe_lag(samples: list, stop: asyncio.Event, interval: float = 0.005) -> None:
+    """Record how late the loop wakes up from a fixed short sleep."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+async def _run(mode: str, rate: int, seconds: float, workers: int, queue_size: int) -> dict:
+    request = CardRequest(
+        avatar=_fake_avatar(),
+        top_text="Welcome benchmark-user!",
+        bottom_text="Welcome to Benchmark Guild!",
+        background_path=str(ROOT / "src" / "assets" / "icon" / "memberalerts.png"),
+    )
+    renderer = None if mode == "inline" else CardRenderer(mode=mode, workers=workers, queue_size=queue_size, timeout=0)
+    counts = {"rendered": 0, "rejected": 0}
+
+    async def join() -> None:
+        if renderer is None:
+            render_card(request)  # the pre-pool behaviour: PIL work on the loop
+            counts["rendered"] += 1
+            return
+        try:
+            await renderer.render(request)
+            counts["rendered"] += 1
+        except CardQueueFull:
+            counts["rejected"] += 1
+
+    lag: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_lag(lag, stop))
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(join()))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    if renderer:
+        renderer.shutdown()
+
+    lag_ms = sorted(x * 1000 for x in lag) or [0.0]
+    return {
+        "mode": mode,
+        "joins": len(tasks),
+        "elapsed_s": round(elapsed, 2),
+        "rendered": counts["rendered"],
+        "rejected": counts["rejected"],
+        "lag_p50_ms": round(statistics.median(lag_ms), 2),
+        "lag_p99_ms": round(lag_ms[int(len(lag_ms) * 0.99) - 1 if len(lag_ms) > 1 else 0], 2),
+        "lag_max_ms": round(lag_ms[-1], 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark loop latency under simulated member joins.")
+    parser.add_argument("--mode", choices=["inline", "thread", "process", "all"], default="all")
+    parser.add_argument("--rate", type=int, default=500, help="Simulated joins per second (default: 500)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of the flood (default: 5)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    modes = ["inline", "thread", "process"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(json.dumps(asyncio.run(_run(mode, args.rate, args.seconds, args.workers, args.queue_size))))
+
+if __name__ == "__main__":
+    main()
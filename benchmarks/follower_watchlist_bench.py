@@ -0,0 +1,171 @@
+"""Watchlist polling, local answers and time-series footprint for `rblxfollowers`.
+
+Three parts:
+  poll     – one poller pass over the watched ids against a local stub:
+             requests sent, peak request rate vs. the configured cap, and
+             how the poller backs off when the stub starts answering 429.
+  answer   – `rblxfollowers` count latency for watched ids (local history)
+             vs. unwatched ids (60 s cache miss -> upstream).
+  storage  – a simulated year of 5-minute polls: rows and bytes on disk
+             for the compact series vs. one row per poll, plus the cost
+             of a 30-day growth query.
+
+Usage: python benchmarks/follower_watchlist_bench.py --watched 200 --rate 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiohttp import web
+
+from benchmarks._stub import StubServer
+from benchmarks.roblox_lookup_bench import make_cog, roblox_stub
+from src.modules.follower_series import FollowerSeries
+from src.modules.http_client import HttpClient
+
+def _percentiles(values: list) -> dict:
+    values = sorted(values)
+    pick = lambda p: round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 3)
+    return {"p50_ms": pick(0.5), "p99_ms": pick(0.99)}
+
+async def _poll_and_answer(args: argparse.Namespace) -> dict:
+    throttled = {"until": 0.0}
+    per_second: Counter = Counter()
+
+    async def handler(request: web.Request) -> web.Response:
+        per_second[int(time.monotonic())] += 1
+        if time.monotonic() < throttled["until"]:
+            return web.json_response({"errors": []}, status=429, headers={"Retry-After": "1"})
+        return await roblox_stub(request)
+
+    async with StubServer(handler, latency=args.latency / 1000) as stub:
+        client = HttpClient(limit_per_host=100)
+        cog = make_cog(stub.url, client, {"RobloxWatchlist": {"Path": ":memory:", "BatchSize": args.batch, "RequestsPerSecond": args.rate}})
+        watched = list(range(1, args.watched + 1))
+        cog.watched.update(watched)
+
+        started = time.perf_counter()
+        await cog.poll(watched)
+        poll_s = time.perf_counter() - started
+        poll_requests = stub.total
+        peak_rate = max(per_second.values())
+        assert all(cog.series.latest(user_id)[1] == user_id * 7 for user_id in watched), "poller stored wrong counts"
+
+        # 429 storm: both hosts rate limit for 2 s mid-pass
+        stub.hits.clear()
+        per_second.clear()
+        throttled["until"] = time.monotonic() + 2.0
+        started = time.perf_counter()
+        await cog.poll(watched)
+        throttled_s = time.perf_counter() - started
+        throttled_requests = sum(stub.hits.values())
+        refreshed = sum(cog.series.latest(user_id)[0] >= int(time.time() - throttled_s) for user_id in watched)
+
+        watched_latencies, unwatched_latencies = [], []
+        for user_id in random.sample(watched, min(100, len(watched))):
+            t = time.perf_counter()
+            await cog.get_follower_count(user_id)
+            watched_latencies.append(time.perf_counter() - t)
+        for user_id in range(10_000, 10_100):
+            t = time.perf_counter()
+            await cog.get_follower_count(user_id)
+            unwatched_latencies.append(time.perf_counter() - t)
+        await cog.cog_unload()
+        await client.close()
+
+    return {
+        "part": "poll+answer",
+        "watched": args.watched,
+        "rate_cap": args.rate,
+        "poll_s": round(poll_s, 2),
+        "poll_requests": poll_requests,
+        "peak_requests_per_s": peak_rate,
+        "throttled_pass_s": round(throttled_s, 2),
+        "throttled_pass_requests": throttled_requests,
+        "throttled_pass_refreshed": refreshed,
+        "answer_watched": _percentiles(watched_latencies),
+        "answer_unwatched": _percentiles(unwatched_latencies),
+    }
+
+async def _storage(args: argparse.Namespace) -> dict:
+    polls = 365 * 24 * 12  # a year of 5-minute polls
+    start = int(time.time()) - polls * 300
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        series = FollowerSeries(os.path.join(tmp, "series.sqlite3"), retention_days=None)
+        naive = sqlite3.connect(os.path.join(tmp, "naive.sqlite3"))
+        naive.execute("CREATE TABLE samples (user_id INTEGER, ts INTEGER, count INTEGER)")
+        counts = {user_id: rng.randrange(100, 100_000) for user_id in range(args.storage_users)}
+        started = time.perf_counter()
+        for n in range(polls):
+            ts = start + n * 300
+            rows = []
+            for user_id in counts:
+                if rng.random() < 0.05:  # most polls see an unchanged count
+                    counts[user_id] += rng.randrange(-2, 10)
+                series.append(user_id, counts[user_id], ts)
+                rows.append((user_id, ts, counts[user_id]))
+            naive.executemany("INSERT INTO samples VALUES (?, ?, ?)", rows)
+            if n % 288 == 0:
+                await series.flush()
+                naive.commit()
+        await series.flush()
+        naive.commit()
+        append_s = time.perf_counter() - started
+        naive_rows = naive.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+        naive.close()
+
+        started = time.perf_counter()
+        for user_id in counts:
+            series.delta(user_id, 30 * 86400, now=start + polls * 300)
+        delta_us = (time.perf_counter() - started) / len(counts) * 1e6
+        stats = series.stats()
+        await series.close()
+        reloaded = FollowerSeries(os.path.join(tmp, "series.sqlite3"), retention_days=None)
+        started = time.perf_counter()
+        await reloaded.load()
+        load_s = time.perf_counter() - started
+        assert reloaded.stats()["points"] == stats["points"], "reload lost points"
+        await reloaded.close()
+        series_bytes = os.path.getsize(os.path.join(tmp, "series.sqlite3"))
+        naive_bytes = os.path.getsize(os.path.join(tmp, "naive.sqlite3"))
+
+    return {
+        "part": "storage",
+        "users": args.storage_users,
+        "polls": polls * args.storage_users,
+        "rows_per_poll": naive_rows,
+        "rows_compact": stats["points"],
+        "disk_mb_per_poll": round(naive_bytes / 2**20, 1),
+        "disk_mb_compact": round(series_bytes / 2**20, 1),
+        "memory_mb": round(stats["memory_bytes"] / 2**20, 1),
+        "append_s": round(append_s, 1),
+        "load_s": round(load_s, 2),
+        "delta_30d_us": round(delta_us, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Roblox follower watchlist poller and time-series store.")
+    parser.add_argument("--watched", type=int, default=200, help="Watched user ids (default: 200)")
+    parser.add_argument("--batch", type=int, default=10, help="Poller batch size (default: 10)")
+    parser.add_argument("--rate", type=float, default=20, help="Poller request cap per second (default: 20)")
+    parser.add_argument("--latency", type=float, default=50.0, help="Stub latency in ms (default: 50)")
+    parser.add_argument("--storage-users", type=int, default=50, help="Users in the simulated year of history (default: 50)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_poll_and_answer(args))))
+    print(json.dumps(asyncio.run(_storage(args))))
+
+if __name__ == "__main__":
+    main()
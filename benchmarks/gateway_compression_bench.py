@@ -0,0 +1,209 @@
+"""Gateway transport compression and `large_threshold`: bytes on the wire, decompression CPU, READY-to-ready.
+
+  connect – a `discord.Client` in a child process identifies through
+            `GetIdentify` against `_fake_discord.py` serving a guild mix
+            (mostly small guilds, a few with thousands of members; the
+            bot's intents, so guilds flagged large are chunked) for every
+            `LargeThreshold` x transport. Reports wire bytes until ready,
+            member chunk requests, READY-to-`on_ready` time and the
+            child's CPU time. discord.py waits `guild_ready_timeout` after
+            the last GUILD_CREATE; the child lowers it to `--ready-timeout`
+            so the wait doesn't drown the differences.
+  trace   – replays recorded gateway traffic (the messages the fake sent in
+            the LargeThreshold 250 run, including `--events` MESSAGE_CREATE/s
+            for `--linger` seconds after ready; or `--trace FILE`, one gateway
+            message per line) through each transport: wire bytes and the CPU
+            discord.py spends decompressing, next to the JSON parse every
+            transport pays.
+
+Usage: python benchmarks/gateway_compression_bench.py --guilds 200 --save-trace trace.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+THRESHOLDS = (50, 100, 250)
+TRANSPORTS = ("none", "zlib-stream")
+
+def _guilds(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Seeded size mix: 70% under 50 members, 20% 50-250, 8% 250-2000, 2% 2000-10000."""
+    rng = random.Random(seed)
+    guilds = []
+    for k in range(count):
+        roll = rng.random()
+        low, high = (5, 50) if roll < 0.7 else (50, 250) if roll < 0.9 else (250, 2000) if roll < 0.98 else (2000, 10000)
+        guild_id = str((k + 1) << 22)
+        guilds.append({
+            "id": guild_id, "name": f"guild {k}", "owner_id": "42", "unavailable": False,
+            "member_count": rng.randint(low, high), "features": [], "emojis": [], "stickers": [], "members": [], "threads": [],
+            "presences": [], "voice_states": [],
+            "roles": [{"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(int(guild_id) + 1), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        })
+    return guilds
+
+# ---------- child: one client connection ----------
+async def _child(args: argparse.Namespace) -> None:
+    import discord
+    from benchmarks._fake_discord import patch_discord
+    from src.modules.set_identify import GetIdentify
+
+    patch_discord(args.url)
+    GetIdentify(transport=args.transport, large_threshold=args.large_threshold).install()
+    intents = discord.Intents.default()
+    intents.message_content = intents.typing = intents.presences = intents.members = True  # as Bot.__init__
+    client = discord.Client(intents=intents, guild_ready_timeout=args.ready_timeout)
+    marks: Dict[str, float] = {}
+
+    @client.event
+    async def on_connect() -> None:  # dispatched once READY is parsed
+        marks.setdefault("ready_event", time.perf_counter())
+        marks.setdefault("cpu", time.process_time())
+
+    runner = asyncio.create_task(client.start("bench-token"))
+    await asyncio.create_task(client.wait_until_ready())
+    ready = time.perf_counter()
+    os.write(args.report_fd, (json.dumps({
+        "ready_to_ready_ms": round((ready - marks["ready_event"]) * 1000, 1),
+        "cpu_ms": round((time.process_time() - marks["cpu"]) * 1000, 1),
+        "members_cached": sum(len(guild.members) for guild in client.guilds),
+        "guilds": len(client.guilds),
+    }) + "\n").encode())
+    await asyncio.sleep(args.linger)
+    os.write(args.report_fd, b"{}\n")
+    await runner
+
+# ---------- parent ----------
+async def _connect(args: argparse.Namespace, fake, transport: str, threshold: int, linger: float) -> Dict[str, Any]:
+    read_fd, write_fd = os.pipe()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, __file__, "--child", "--url", fake.url, "--transport", transport,
+        "--large-threshold", str(threshold), "--ready-timeout", str(args.ready_timeout), "--linger", str(linger),
+        "--report-fd", str(write_fd), pass_fds=(write_fd,), cwd=ROOT,
+        stdout=asyncio.subprocess.DEVNULL, stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    reader = asyncio.StreamReader()
+    transport_, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb"))
+    bytes_before, chunks_before = fake.bytes_sent, fake.gateway_ops[8]
+    try:
+        line = await asyncio.wait_for(reader.readline(), args.timeout)
+        if not line:
+            raise RuntimeError(f"child exited with {await proc.wait()}")
+        report = json.loads(line)
+        result = {
+            "part": "connect",
+            "transport": transport,
+            "large_threshold": threshold,
+            "wire_bytes": fake.bytes_sent - bytes_before,
+            "chunk_requests": fake.gateway_ops[8] - chunks_before,
+            **report,
+        }
+        await asyncio.wait_for(reader.readline(), args.timeout + linger)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+        transport_.close()
+    return result
+
+def _zstd_codec():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def _trace(messages: List[str], repeat: int) -> List[Dict[str, Any]]:
+    from src.modules.set_identify import ZlibStreamContext
+
+    raw = [message.encode() for message in messages]
+    started = time.process_time()
+    for _ in range(repeat):
+        for data in raw:
+            json.loads(data)
+    parse_ms = (time.process_time() - started) * 1000 / repeat
+    plain = sum(len(data) for data in raw)
+    results = [{"part": "trace", "transport": "none", "messages": len(raw), "wire_bytes": plain, "ratio": 1.0, "decompress_ms": 0.0, "json_parse_ms": round(parse_ms, 1)}]
+
+    codecs = [("zlib-stream", lambda: zlib.compressobj(), lambda c, d: c.compress(d) + c.flush(zlib.Z_SYNC_FLUSH), ZlibStreamContext)]
+    zstandard = _zstd_codec()
+    if zstandard is not None:
+        from discord import utils
+        codecs.append(("zstd-stream", lambda: zstandard.ZstdCompressor().compressobj(),
+                       lambda c, d: c.compress(d) + c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), utils._ActiveDecompressionContext))
+    for name, compressor, frame, context in codecs:
+        stream = compressor()
+        frames = [frame(stream, data) for data in raw]
+        wire = sum(len(data) for data in frames)
+        started = time.process_time()
+        for _ in range(repeat):
+            decompressor = context()
+            for data in frames:
+                decompressor.decompress(data)
+        results.append({
+            "part": "trace", "transport": name, "messages": len(raw), "wire_bytes": wire,
+            "ratio": round(plain / wire, 2), "decompress_ms": round((time.process_time() - started) * 1000 / repeat, 1),
+            "json_parse_ms": round(parse_ms, 1),
+        })
+    if zstandard is None:
+        results.append({"part": "trace", "transport": "zstd-stream", "skipped": "zstandard is not installed"})
+    return results
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from benchmarks._fake_discord import FakeDiscord
+
+    results = []
+    recording: Optional[List[str]] = None
+    async with FakeDiscord(guilds=_guilds(args.guilds, args.seed), heartbeat_interval=5.0, ack_delay=0.02, events_per_second=args.events) as fake:
+        for threshold in THRESHOLDS:
+            for transport in TRANSPORTS:
+                record = threshold == 250 and transport == "none" and not args.trace
+                if record:
+                    fake.recording = recording = []
+                results.append(await _connect(args, fake, transport, threshold, args.linger if record else 0.0))
+                fake.recording = None
+    if args.trace:
+        recording = Path(args.trace).read_text(encoding="utf-8").splitlines()
+    elif args.save_trace:
+        Path(args.save_trace).write_text("\n".join(recording) + "\n", encoding="utf-8")
+    results.extend(_trace(recording, args.repeat))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark gateway transport compression and large_threshold.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--transport", default="zlib-stream", help=argparse.SUPPRESS)
+    parser.add_argument("--large-threshold", type=int, default=250, help=argparse.SUPPRESS)
+    parser.add_argument("--report-fd", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--guilds", type=int, default=200, help="Guilds in the seeded size mix (default: 200)")
+    parser.add_argument("--seed", type=int, default=7, help="Guild mix seed (default: 7)")
+    parser.add_argument("--events", type=float, default=500.0, help="MESSAGE_CREATE/s streamed after READY (default: 500)")
+    parser.add_argument("--linger", type=float, default=2.0, help="Seconds of post-ready traffic in the recorded trace (default: 2)")
+    parser.add_argument("--ready-timeout", type=float, default=0.2, help="guild_ready_timeout of the client (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="Decompression passes over the trace (default: 5)")
+    parser.add_argument("--trace", help="Replay this recorded trace (JSON lines) instead of recording one")
+    parser.add_argument("--save-trace", help="Write the recorded trace here")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-connection timeout in seconds (default: 120)")
+    parser.add_argument("--verbose", action="store_true", help="Show the children's stderr")
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args))
+        return
+    for result in asyncio.run(_run(args)):
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
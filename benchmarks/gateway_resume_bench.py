@@ -0,0 +1,207 @@
+"""Restart after a crash: RESUME from the gateway checkpoint vs. a fresh IDENTIFY.
+
+Boots `Bot` in a child process against `_fake_discord.py` (large guilds, so
+a fresh session has to request member chunks), waits for a gateway
+checkpoint and SIGKILLs it, as a crash under Railway's ON_FAILURE restart
+policy would. While it is down the fake queues `--missed` MESSAGE_CREATE
+and a few GUILD_MEMBER_ADD events on the dead session. The next process
+either resumes (`GatewaySession.Enabled`) or identifies (disabled), and the
+bench records, per restart:
+
+  connect_to_ready_ms – end of `setup_hook()` (login done) to `on_ready`
+  caught_up_ms        – ... to the last queued MESSAGE_CREATE (null if they never came)
+  gateway_bytes       – bytes the fake sent to reach ready and catch up
+  chunk_requests      – REQUEST_GUILD_MEMBERS sent by the new process
+  missed_delivered    – queued MESSAGE_CREATEs the new process received
+  members_cached      – members in the new process' cache
+
+Usage: python benchmarks/gateway_resume_bench.py --guilds 20 --members 5000 --runs 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+def _guilds(count: int, members: int) -> List[Dict[str, Any]]:
+    guilds = []
+    for k in range(count):
+        guild_id = str((k + 1) << 22)
+        guilds.append({
+            "id": guild_id, "name": f"guild {k}", "owner_id": "42", "unavailable": False, "large": True,
+            "member_count": members, "features": [], "emojis": [], "stickers": [], "members": [], "threads": [],
+            "presences": [], "voice_states": [],
+            "roles": [{"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(int(guild_id) + 1), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        })
+    return guilds
+
+# ---------- child: one bot process ----------
+async def _child(args: argparse.Namespace) -> None:
+    import bot as bot_module
+    from benchmarks._fake_discord import patch_discord
+    from src.modules.load_config import ConfigService
+
+    patch_discord(args.url)
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config.update({
+        "Storage": {"Backend": "sqlite", "Path": str(Path(args.tmp) / "bot.sqlite3"), "FlushInterval": 0.1},
+        "Startup": {"ReportPath": str(Path(args.tmp) / "startup_report.json"), "SyncHashPath": str(Path(args.tmp) / "tree.sha256")},
+        "Metrics": {},
+        "LazyExtensions": {"Enabled": False},
+        "RobloxWatchlist": {"Path": ":memory:"},
+        "GatewaySession": {**config.get("GatewaySession", {}), "Enabled": args.mode == "resume"},
+    })
+    bot = bot_module.Bot(config)
+    report = lambda event, **data: os.write(args.report_fd, (json.dumps({"event": event, **data}) + "\n").encode())
+    marks: Dict[str, float] = {}
+    messages = 0
+
+    async def on_message(message) -> None:
+        nonlocal messages
+        if message.content.startswith("missed "):
+            messages += 1
+
+    bot.add_listener(on_message)
+    setup_hook = bot.setup_hook
+
+    async def timed_setup_hook() -> None:
+        await setup_hook()
+        marks["connect"] = time.perf_counter()
+
+    bot.setup_hook = timed_setup_hook
+    runner = asyncio.create_task(bot.start("bench-token"))
+    await asyncio.create_task(bot.wait_until_ready())  # scheduled after start(), which initialises the client
+    ready = time.perf_counter()
+    deadline = time.monotonic() + 10
+    while messages < args.expect_missed and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+    report(
+        "ready",
+        connect_to_ready_ms=round((ready - marks["connect"]) * 1000, 1),
+        caught_up_ms=round((time.perf_counter() - marks["connect"]) * 1000, 1) if messages >= args.expect_missed else None,
+        missed_delivered=messages,
+        members_cached=sum(len(guild.members) for guild in bot.guilds),
+        guilds=len(bot.guilds),
+        gateway=bot.gateway_sessions.stats(),
+    )
+    # Wait for a checkpoint that covers the session, then idle until the parent kills us
+    checkpoints = bot.gateway_sessions.checkpoints
+    while bot.gateway_sessions.enabled and bot.gateway_sessions.checkpoints < checkpoints + 2:
+        await asyncio.sleep(0.05)
+    await bot.storage.flush()
+    report("checkpointed")
+    await runner
+
+# ---------- parent ----------
+async def _read_event(reader: asyncio.StreamReader, proc: asyncio.subprocess.Process, timeout: float) -> Dict[str, Any]:
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        raise RuntimeError(f"child exited with {await proc.wait()}")
+    return json.loads(line)
+
+async def _start(args: argparse.Namespace, fake, tmp: str, mode: str, expect_missed: int) -> Dict[str, Any]:
+    read_fd, write_fd = os.pipe()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, __file__, "--child", "--mode", mode, "--url", fake.url, "--tmp", tmp,
+        "--report-fd", str(write_fd), "--expect-missed", str(expect_missed),
+        pass_fds=(write_fd,), cwd=ROOT,
+        stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+        stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    reader = asyncio.StreamReader()
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb"))
+    bytes_before, chunks_before = fake.bytes_sent, fake.gateway_ops[8]
+    try:
+        ready = await _read_event(reader, proc, args.timeout)
+        result = {
+            "mode": mode,
+            "connect_to_ready_ms": ready["connect_to_ready_ms"],
+            "caught_up_ms": ready["caught_up_ms"],
+            "gateway_bytes": fake.bytes_sent - bytes_before,
+            "chunk_requests": fake.gateway_ops[8] - chunks_before,
+            "missed_delivered": ready["missed_delivered"],
+            "members_cached": ready["members_cached"],
+            "guilds": ready["guilds"],
+            "restored_events": ready["gateway"]["replayed_events"],
+            "replay_ms": ready["gateway"]["replay_ms"],
+            "resumed": ready["gateway"]["resumed"] > 0,
+        }
+        await _read_event(reader, proc, args.timeout)  # checkpointed
+    finally:
+        if proc.returncode is None:
+            proc.send_signal(signal.SIGKILL)  # a crash: no clean close, the session stays resumable
+        await proc.wait()
+        transport.close()
+    return result
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from benchmarks._fake_discord import FakeDiscord, message_create
+
+    guilds = _guilds(args.guilds, args.members)
+    channel = guilds[0]["channels"][0]["id"]
+    results = []
+    async with FakeDiscord(guilds=guilds, heartbeat_interval=1.0, ack_delay=0.02) as fake:
+
+        async def crash_window(run: int) -> None:
+            """Queue events on the newest session, as Discord does while the bot is down."""
+            session_id = list(fake.session_logs)[-1]
+            for i in range(args.missed):
+                await fake.emit(session_id, "MESSAGE_CREATE", message_create(guilds[0]["id"], channel, f"missed {i}", 5_000_000 + run * 100_000 + i))
+            for i in range(3):
+                await fake.emit(session_id, "GUILD_MEMBER_ADD", {
+                    "guild_id": guilds[0]["id"], "user": {"id": str(9_000_000 + run * 10 + i), "username": "newcomer", "discriminator": "0001", "avatar": None},
+                    "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0,
+                })
+
+        for mode in ("resume", "identify"):
+            with tempfile.TemporaryDirectory() as tmp:
+                await _start(args, fake, tmp, mode, 0)  # first boot identifies (and checkpoints, when enabled)
+                for run in range(args.runs):
+                    await crash_window(run)
+                    results.append(await _start(args, fake, tmp, mode, args.missed))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark gateway RESUME from a checkpoint vs. IDENTIFY after a crash.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="resume", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--tmp", help=argparse.SUPPRESS)
+    parser.add_argument("--report-fd", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--expect-missed", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--guilds", type=int, default=20, help="Large guilds (default: 20)")
+    parser.add_argument("--members", type=int, default=5000, help="Members per guild (default: 5000)")
+    parser.add_argument("--missed", type=int, default=200, help="MESSAGE_CREATEs queued while the bot is down (default: 200)")
+    parser.add_argument("--runs", type=int, default=3, help="Crash/restart cycles per mode (default: 3)")
+    parser.add_argument("--timeout", type=float, default=90.0, help="Per-boot timeout in seconds (default: 90)")
+    parser.add_argument("--verbose", action="store_true", help="Show the children's output")
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args))
+        return
+
+    results = asyncio.run(_run(args))
+    for result in results:
+        print(json.dumps(result))
+    for mode in ("resume", "identify"):
+        runs = [result for result in results if result["mode"] == mode]
+        print(json.dumps({
+            "mode": mode,
+            "runs": len(runs),
+            **{key: statistics.median(run[key] for run in runs) for key in ("connect_to_ready_ms", "gateway_bytes", "chunk_requests", "missed_delivered", "members_cached")},
+        }))
+
+if __name__ == "__main__":
+    main()
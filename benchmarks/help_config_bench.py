@@ -0,0 +1,70 @@
+"""Latency of the `help` command with per-call config parsing vs. the shared config snapshot.
+
+Usage: python benchmarks/help_config_bench.py --calls 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # config.json is resolved relative to the working directory, as in bot.py
+
+from src.cogs.help import HelpCog
+from src.modules.load_config import ConfigService, JsonLoader
+
+class _Author:
+    id = 1
+
+class _FakeContext:
+    author = _Author()
+
+    async def reply(self, **kwargs) -> None:
+        pass
+
+def _old_get_prefix() -> str:
+    # Pre-change behaviour: JsonLoader.__init__ parsed the file, then load() parsed it again
+    loader = JsonLoader()
+    loader.load()
+    return loader.load()["Prefix"]
+
+async def _measure(cog: HelpCog, calls: int, query) -> list:
+    ctx = _FakeContext()
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await cog.help_command.callback(cog, ctx, query=query)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples
+
+async def _run(calls: int) -> list:
+    cog = HelpCog(bot=None)
+    results = []
+    for label, prefix_fn in (("json-per-call", _old_get_prefix), ("config-snapshot", HelpCog._get_prefix)):
+        cog._get_prefix = prefix_fn
+        for query in (None, "ping"):
+            samples = await _measure(cog, calls, query)
+            results.append({
+                "mode": label,
+                "query": query,
+                "calls": calls,
+                "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+                "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 1),
+            })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark help-command latency before/after the config service.")
+    parser.add_argument("--calls", type=int, default=2000, help="Invocations per case (default: 2000)")
+    args = parser.parse_args()
+    ConfigService.shared()  # parse once up front, as bot startup does
+    for result in asyncio.run(_run(args.calls)):
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
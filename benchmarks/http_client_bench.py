@@ -0,0 +1,115 @@
+"""External-API request latency: a new ClientSession per command vs. the shared HttpClient pool.
+
+Requests go to a local HTTPS stub (self-signed certificate generated with
+the `openssl` CLI; plain HTTP with --no-tls) that answers after a fixed
+delay, so the difference is connection and TLS setup. Reports p50/p99
+latency and how many connections each mode opened.
+
+Usage: python benchmarks/http_client_bench.py --requests 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import aiohttp
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._stub import StubServer
+from src.modules.http_client import HttpClient
+
+async def _handler(request: web.Request) -> web.Response:
+    return web.json_response({"results": [{"id": 1}]})
+
+def _server_context(tmp: str) -> Optional[ssl.SSLContext]:
+    cert, key = Path(tmp) / "cert.pem", Path(tmp) / "key.pem"
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+             "-keyout", str(key), "-out", str(cert)],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        print("openssl not available; benchmarking plain HTTP", file=sys.stderr)
+        return None
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+def _summary(mode: str, latencies: List[float], elapsed: float, connections: int) -> dict:
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "requests_per_s": round(len(latencies) / elapsed),
+        "connections_opened": connections,
+    }
+
+async def _run(requests: int, concurrency: int, fetch) -> tuple:
+    latencies: List[float] = []
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in queue:
+            started = time.perf_counter()
+            await fetch()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+async def _session_per_request(url: str, requests: int, concurrency: int) -> dict:
+    async def fetch() -> None:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, ssl=False) as resp:
+                await resp.json()
+
+    latencies, elapsed = await _run(requests, concurrency, fetch)
+    return _summary("session-per-request", latencies, elapsed, requests)
+
+async def _shared_client(url: str, requests: int, concurrency: int, limit_per_host: int) -> dict:
+    client = HttpClient(limit_per_host=limit_per_host)
+
+    async def fetch() -> None:
+        async with client.get(url, ssl=False) as resp:
+            await resp.json()
+
+    latencies, elapsed = await _run(requests, concurrency, fetch)
+    host = client.stats()["hosts"]["127.0.0.1"]
+    await client.close()
+    result = _summary("shared-client", latencies, elapsed, host["new_connections"])
+    result.update({key: host[key] for key in ("reused_connections", "pool_waits", "max_in_flight")})
+    result["histogram_p50_ms"], result["histogram_p99_ms"] = host["latency"]["p50_ms"], host["latency"]["p99_ms"]
+    return result
+
+async def _main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        context = None if args.no_tls else _server_context(tmp)
+        async with StubServer(_handler, latency=args.latency / 1000, ssl_context=context) as stub:
+            url = f"{stub.url}/v1/search"
+            print(json.dumps(await _session_per_request(url, args.requests, args.concurrency)))
+            print(json.dumps(await _shared_client(url, args.requests, args.concurrency, args.limit_per_host)))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the shared pooled HTTP client against a session per request.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per mode (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent commands (default: 8)")
+    parser.add_argument("--latency", type=float, default=5.0, help="Stub response delay in ms (default: 5)")
+    parser.add_argument("--limit-per-host", type=int, default=4, help="HttpClient per-host connection cap (default: 4)")
+    parser.add_argument("--no-tls", action="store_true", help="Benchmark plain HTTP")
+    asyncio.run(_main(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
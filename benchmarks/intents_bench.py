@@ -0,0 +1,247 @@
+"""Declared intents and the raw-event router: events/s and CPU on a replayed high-traffic trace.
+
+Boots `Bot` in a child process against `_fake_discord.py`, which (like
+Discord) only sends the events the IDENTIFY intents cover, then replays a
+seeded trace with the mix a busy bot sees (mostly PRESENCE_UPDATE and
+TYPING_START, then messages, edits, deletes, reactions and member updates,
+for members the bot has cached) between two marker messages. Modes:
+
+  legacy  – the intents Bot always asked for (members, presences, typing,
+            message_content), every event parsed and dispatched
+  router  – the same intents, undeclared events dropped after the JSON parse
+  minimal – the intents the loaded extensions declare, plus the router
+  nocache – minimal with discord.py's message cache off (`max_messages=None`),
+            so the router drops edits, deletes and reactions nobody listens to
+
+Per run: trace events the fake delivered, events the router dropped, child
+CPU and wall time from the first marker to the last, and events/s of the
+trace over both (wall time shares the one machine with the fake).
+
+Usage: python benchmarks/intents_bench.py --events 20000 --runs 3 --save-trace trace.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = {
+    "legacy": {"Minimal": False, "DropUndeclared": False},
+    "router": {"Minimal": False, "DropUndeclared": True},
+    "minimal": {"Minimal": True, "DropUndeclared": True},
+    "nocache": {"Minimal": True, "DropUndeclared": True},
+}
+BOT_OPTIONS = {"nocache": {"max_messages": None}}
+MIX = (
+    ("PRESENCE_UPDATE", 55), ("TYPING_START", 15), ("MESSAGE_CREATE", 15), ("MESSAGE_UPDATE", 5),
+    ("MESSAGE_REACTION_ADD", 4), ("MESSAGE_DELETE", 2), ("MESSAGE_REACTION_REMOVE", 2), ("GUILD_MEMBER_UPDATE", 2),
+)
+TIMESTAMP = "2024-01-01T00:00:00+00:00"
+
+def _guilds(count: int, members: int) -> List[Dict[str, Any]]:
+    guilds = []
+    for k in range(count):
+        guild_id = str((k + 1) << 22)
+        guilds.append({
+            "id": guild_id, "name": f"guild {k}", "owner_id": "42", "unavailable": False,
+            "member_count": members, "features": [], "emojis": [], "stickers": [], "members": [], "threads": [],
+            "presences": [], "voice_states": [],
+            "roles": [{"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(int(guild_id) + 1), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        })
+    return guilds
+
+def _trace(guilds: List[Dict[str, Any]], count: int, seed: int) -> List[Dict[str, Any]]:
+    """Seeded dispatch events over the fake's guilds, channels and (chunked) member ids."""
+    from benchmarks._fake_discord import message_create
+
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    events = []
+    for i in range(count):
+        guild = rng.choice(guilds)
+        guild_id, channel_id = guild["id"], guild["channels"][0]["id"]
+        user_id = str(int(guild_id) * 1000 + rng.randrange(guild["member_count"]))
+        user = {"id": user_id, "username": f"member{user_id[-3:]}", "discriminator": "0001", "avatar": None}
+        member = {"user": user, "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False, "flags": 0}
+        message_id = str(7_000_000_000 + rng.randrange(count))
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "PRESENCE_UPDATE":
+            status = rng.choice(("online", "idle", "dnd"))
+            data = {"user": {"id": user_id}, "guild_id": guild_id, "status": status, "client_status": {"desktop": status},
+                    "activities": [{"name": "a game", "type": 0, "created_at": 1_700_000_000_000}] if rng.random() < 0.5 else []}
+        elif kind == "TYPING_START":
+            data = {"channel_id": channel_id, "guild_id": guild_id, "user_id": user_id, "timestamp": 1_700_000_000, "member": member}
+        elif kind == "MESSAGE_CREATE":
+            data = message_create(guild_id, channel_id, f"chatter {i}", 7_000_000_000 + i, user_id)
+        elif kind == "MESSAGE_UPDATE":
+            data = {**message_create(guild_id, channel_id, f"edited {i}", int(message_id), user_id), "edited_timestamp": TIMESTAMP}
+        elif kind == "MESSAGE_DELETE":
+            data = {"id": message_id, "channel_id": channel_id, "guild_id": guild_id}
+        elif kind == "MESSAGE_REACTION_ADD":
+            data = {"user_id": user_id, "channel_id": channel_id, "message_id": message_id, "guild_id": guild_id,
+                    "emoji": {"id": None, "name": "\U0001f44d"}, "member": member, "type": 0, "burst": False}
+        elif kind == "MESSAGE_REACTION_REMOVE":
+            data = {"user_id": user_id, "channel_id": channel_id, "message_id": message_id, "guild_id": guild_id,
+                    "emoji": {"id": None, "name": "\U0001f44d"}, "type": 0, "burst": False}
+        else:
+            data = {"guild_id": guild_id, **member, "nick": f"nick {i}"}
+        events.append({"t": kind, "d": data})
+    return events
+
+# ---------- child: one bot process ----------
+async def _child(args: argparse.Namespace) -> None:
+    import bot as bot_module
+    from benchmarks._fake_discord import patch_discord
+    from src.modules.load_config import ConfigService
+
+    patch_discord(args.url)
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config.update({
+        "Storage": {"Backend": "sqlite", "Path": str(Path(args.tmp) / "bot.sqlite3"), "FlushInterval": 0.1},
+        "Startup": {"ReportPath": str(Path(args.tmp) / "startup_report.json"), "SyncHashPath": str(Path(args.tmp) / "tree.sha256")},
+        "Metrics": {},
+        "LazyExtensions": {"Enabled": False},
+        "RobloxWatchlist": {"Path": ":memory:"},
+        "GatewaySession": {"Enabled": False},  # no checkpoint writes inside the measured window
+        "Intents": MODES[args.mode],
+    })
+    bot = bot_module.Bot(config, **BOT_OPTIONS.get(args.mode, {}))
+    report = lambda event, **data: os.write(args.report_fd, (json.dumps({"event": event, **data}) + "\n").encode())
+    marks: Dict[str, tuple] = {}
+    done = asyncio.Event()
+
+    async def on_message(message) -> None:
+        if message.content in ("trace start", "trace end"):
+            marks[message.content] = (time.perf_counter(), time.process_time(), bot.intent_planner.stats()["dropped_events"])
+            if message.content == "trace end":
+                done.set()
+
+    bot.add_listener(on_message)
+    runner = asyncio.create_task(bot.start("bench-token"))
+    await asyncio.create_task(bot.wait_until_ready())
+    report("ready", intents=bot.intents.value, members_cached=sum(len(guild.members) for guild in bot.guilds))
+    await done.wait()
+    (wall_start, cpu_start, dropped_start), (wall_end, cpu_end, dropped_end) = marks["trace start"], marks["trace end"]
+    report(
+        "done",
+        wall_ms=round((wall_end - wall_start) * 1000, 1),
+        cpu_ms=round((cpu_end - cpu_start) * 1000, 1),
+        dropped=dropped_end - dropped_start,
+        enabled=bot.intent_planner.stats()["enabled"],
+    )
+    await runner
+
+# ---------- parent ----------
+async def _read_event(reader: asyncio.StreamReader, proc: asyncio.subprocess.Process, timeout: float) -> Dict[str, Any]:
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        raise RuntimeError(f"child exited with {await proc.wait()}")
+    return json.loads(line)
+
+async def _replay(args: argparse.Namespace, fake, guilds: List[Dict[str, Any]], trace: List[Dict[str, Any]], mode: str) -> Dict[str, Any]:
+    from benchmarks._fake_discord import message_create
+
+    read_fd, write_fd = os.pipe()
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, __file__, "--child", "--mode", mode, "--url", fake.url, "--tmp", tmp,
+            "--report-fd", str(write_fd), pass_fds=(write_fd,), cwd=ROOT,
+            stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+            stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+        )
+        os.close(write_fd)
+        reader = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb"))
+        try:
+            ready = await _read_event(reader, proc, args.timeout)
+            session_id = list(fake.session_logs)[-1]
+            guild_id, channel_id = guilds[0]["id"], guilds[0]["channels"][0]["id"]
+            filtered = sum(fake.filtered.values())
+            await fake.emit(session_id, "MESSAGE_CREATE", message_create(guild_id, channel_id, "trace start", 6_000_000_000))
+            for event in trace:
+                await fake.emit(session_id, event["t"], event["d"])
+            await fake.emit(session_id, "MESSAGE_CREATE", message_create(guild_id, channel_id, "trace end", 6_000_000_001))
+            delivered = len(trace) - (sum(fake.filtered.values()) - filtered)
+            done = await _read_event(reader, proc, args.timeout)
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            transport.close()
+    return {
+        "mode": mode,
+        "intents": ready["intents"],
+        "trace_events": len(trace),
+        "delivered": delivered,
+        "dropped_by_router": done["dropped"],
+        "cpu_ms": done["cpu_ms"],
+        "wall_ms": done["wall_ms"],
+        "events_per_cpu_s": round(len(trace) / (done["cpu_ms"] / 1000), 0) if done["cpu_ms"] else None,
+        "events_per_s": round(len(trace) / (done["wall_ms"] / 1000), 0) if done["wall_ms"] else None,
+        "members_cached": ready["members_cached"],
+        "enabled": done["enabled"],
+    }
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from benchmarks._fake_discord import FakeDiscord
+
+    guilds = _guilds(args.guilds, args.members)
+    if args.trace:
+        trace = [json.loads(line) for line in Path(args.trace).read_text(encoding="utf-8").splitlines() if line]
+    else:
+        trace = _trace(guilds, args.events, args.seed)
+        if args.save_trace:
+            Path(args.save_trace).write_text("".join(json.dumps(event) + "\n" for event in trace), encoding="utf-8")
+    results = []
+    async with FakeDiscord(guilds=guilds, heartbeat_interval=30.0, ack_delay=0.02) as fake:
+        for _ in range(args.runs):
+            for mode in MODES:
+                results.append(await _replay(args, fake, guilds, trace, mode))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark declared intents and the raw-event router on a replayed gateway trace.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="minimal", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--tmp", help=argparse.SUPPRESS)
+    parser.add_argument("--report-fd", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--guilds", type=int, default=20, help="Guilds (default: 20)")
+    parser.add_argument("--members", type=int, default=500, help="Members per guild (default: 500)")
+    parser.add_argument("--events", type=int, default=20000, help="Events in the generated trace (default: 20000)")
+    parser.add_argument("--seed", type=int, default=7, help="Trace seed (default: 7)")
+    parser.add_argument("--trace", help="Replay this trace (JSON lines of {\"t\", \"d\"}, e.g. from --save-trace) instead")
+    parser.add_argument("--save-trace", help="Write the generated trace here")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode (default: 3)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-step timeout in seconds (default: 120)")
+    parser.add_argument("--verbose", action="store_true", help="Show the children's output")
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args))
+        return
+
+    results = asyncio.run(_run(args))
+    for result in results:
+        print(json.dumps(result))
+    for mode in MODES:
+        runs = [result for result in results if result["mode"] == mode]
+        print(json.dumps({
+            "mode": mode,
+            "runs": len(runs),
+            **{key: statistics.median(run[key] for run in runs) for key in ("delivered", "dropped_by_router", "cpu_ms", "wall_ms", "events_per_cpu_s", "events_per_s")},
+        }))
+
+if __name__ == "__main__":
+    main()
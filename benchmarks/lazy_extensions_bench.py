@@ -0,0 +1,90 @@
+"""Boot cost with every extension loaded eagerly vs. the lazy-extension manifest.
+
+Each mode runs `Bot.setup_hook()` in a fresh interpreter (no Discord login,
+slash-command sync skipped) and reports setup time, resident memory and the
+number of imported modules. The lazy run then loads each deferred extension
+as a first invocation would, to show what that one-off cost is.
+
+Usage: python benchmarks/lazy_extensions_bench.py
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+async def _boot(lazy: bool, report_dir: str) -> dict:
+    from src.modules.load_config import ConfigService
+    from src.modules.startup import rss_bytes
+
+    rss_start = rss_bytes()
+    modules_start = len(sys.modules)
+    import bot as bot_module
+
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config["Storage"] = {"Backend": "memory"}
+    config["Startup"] = {**config.get("Startup", {}), "ReportPath": str(Path(report_dir) / "startup_report.json")}
+    config["LazyExtensions"] = {**config.get("LazyExtensions", {}), "Enabled": lazy}
+
+    bot = bot_module.Bot(config)
+
+    async def no_sync(startup) -> None:
+        return None
+
+    bot._sync_tree = no_sync
+    await bot._async_setup_hook()  # what login() does before calling setup_hook
+    started = time.perf_counter()
+    await bot.setup_hook()
+    result = {
+        "mode": "lazy" if lazy else "eager",
+        "setup_hook_ms": round((time.perf_counter() - started) * 1000, 1),
+        "rss_mb": round(rss_bytes() / 2**20, 1),
+        "rss_growth_mb": round((rss_bytes() - rss_start) / 2**20, 1),
+        "modules_imported": len(sys.modules) - modules_start,
+        "cogs": len(bot.cogs),
+    }
+    if bot.lazy_extensions is not None:
+        deferred = bot.lazy_extensions.stats()["deferred"]
+        for short in deferred:
+            await bot.lazy_extensions.ensure_loaded(short)
+        result["deferred"] = deferred
+        result["first_use"] = bot.lazy_extensions.loaded
+    await bot.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark eager vs. lazy extension loading.")
+    parser.add_argument("--child", choices=("eager", "lazy"), help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode (default: 3)")
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = asyncio.run(_boot(args.child == "lazy", tmp))
+        print(json.dumps(result))
+        return
+
+    best = {}
+    for mode in ("eager", "lazy"):
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(output)
+            if mode not in best or result["setup_hook_ms"] < best[mode]["setup_hook_ms"]:
+                best[mode] = result
+        print(json.dumps(best[mode]))
+    print(json.dumps({
+        "setup_ms_saved": round(best["eager"]["setup_hook_ms"] - best["lazy"]["setup_hook_ms"], 1),
+        "rss_mb_saved": round(best["eager"]["rss_mb"] - best["lazy"]["rss_mb"], 1),
+        "modules_not_imported": best["eager"]["modules_imported"] - best["lazy"]["modules_imported"],
+    }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Event-loop monitor: does it catch and attribute real blocking calls, and what does it cost?
+
+  detection – runs the blocking calls this bot has had on its loop, each in
+              its own named task with idle gaps between them: an inline PIL
+              welcome card render, a blocking `psutil` CPU sample, a
+              `JsonLoader` parse of a large file and a plain `time.sleep`.
+              Reports, per call, how long it really blocked, what the monitor
+              measured, and the site/task it blamed.
+  overhead  – loop throughput (task switches/s) with the monitor off, at its
+              default 250 ms tick and at an aggressive 10 ms tick.
+
+Usage: python benchmarks/loop_monitor_bench.py --json-mb 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import psutil
+from PIL import Image
+
+from src.modules.card_renderer import CardRequest, render_card
+from src.modules.load_config import JsonLoader
+from src.modules.loop_monitor import LoopMonitor
+
+def _fake_avatar() -> bytes:
+    buf = BytesIO()
+    Image.new("RGBA", (256, 256), (88, 101, 242, 255)).save(buf, format="PNG")
+    return buf.getvalue()
+
+def _render_cards(count: int) -> None:
+    request = CardRequest(
+        avatar=_fake_avatar(),
+        top_text="Welcome benchmark-user!",
+        bottom_text="Welcome to Benchmark Guild!",
+        background_path=str(ROOT / "src" / "assets" / "icon" / "memberalerts.png"),
+    )
+    for _ in range(count):
+        render_card(request)
+
+def _sample_cpu(seconds: float) -> None:
+    psutil.cpu_percent(interval=seconds)
+
+def _write_json(path: Path, megabytes: int) -> None:
+    row = {"id": 123456789012345678, "name": "member", "roles": list(range(20)), "joined": "2024-01-01T00:00:00+00:00"}
+    rows = max(megabytes * 1024 * 1024 // len(json.dumps(row)), 1)
+    path.write_text(json.dumps({"members": [row] * rows}), encoding="utf-8")
+
+async def _detection(args: argparse.Namespace) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp) / "big_config.json"
+        _write_json(config, args.json_mb)
+        blockers = [
+            ("welcome-card", "render_card", lambda: _render_cards(args.cards)),
+            ("botinfo", "_sample_cpu", lambda: _sample_cpu(0.4)),
+            ("config-reload", "load", lambda: JsonLoader(str(config)).load()),
+            ("sleepy", "<lambda>", lambda: time.sleep(0.5)),
+        ]
+        monitor = LoopMonitor()
+        monitor.start()
+        await asyncio.sleep(1.0)
+        results = []
+        for name, expected, call in blockers:
+            async def blocker() -> float:
+                started = time.perf_counter()
+                call()
+                return time.perf_counter() - started
+            stalls_before = len(monitor._recent)
+            actual = await asyncio.create_task(blocker(), name=name)
+            await asyncio.sleep(1.0)  # let the ticker file the stall
+            stalls = list(monitor._recent)[stalls_before:]
+            worst = max(stalls, key=lambda stall: stall["blocked_ms"], default=None)
+            results.append({
+                "part": "detection",
+                "blocker": name,
+                "actual_ms": round(actual * 1000, 1),
+                "measured_ms": worst["blocked_ms"] if worst else None,
+                "site": worst["site"] if worst else None,
+                "task": worst["task"] if worst else None,
+                "attributed": bool(worst and worst["site"].endswith(f" in {expected}") and worst["task"].startswith(name)),
+            })
+        report = monitor.report()
+        await monitor.close()
+    results.append({
+        "part": "report",
+        "stalls": report["stalls"],
+        "lag_p50_ms": report["lag"]["p50_ms"],
+        "lag_max_ms": report["lag"]["max_ms"],
+        "hot_paths": [(path["site"], path["count"], path["blocked_ms"]) for path in report["hot_paths"]],
+    })
+    return results
+
+async def _throughput(seconds: float, monitor: LoopMonitor = None) -> float:
+    if monitor is not None:
+        monitor.start()
+    switches = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal switches
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(0)
+            switches += 1
+
+    await asyncio.gather(*(worker() for _ in range(50)))
+    if monitor is not None:
+        await monitor.close()
+    return switches / seconds
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the event-loop monitor.")
+    parser.add_argument("--cards", type=int, default=5, help="Welcome cards rendered inline in one go (default: 5)")
+    parser.add_argument("--json-mb", type=int, default=20, help="Size of the JSON file JsonLoader parses (default: 20)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each throughput run (default: 3)")
+    args = parser.parse_args()
+
+    for result in asyncio.run(_detection(args)):
+        print(json.dumps(result))
+
+    baseline = asyncio.run(_throughput(args.seconds))
+    for label, monitor in (("off", None), ("tick_250ms", LoopMonitor()), ("tick_10ms", LoopMonitor(interval=0.01, threshold=0.02))):
+        rate = baseline if monitor is None else asyncio.run(_throughput(args.seconds, monitor))
+        print(json.dumps({
+            "part": "overhead",
+            "monitor": label,
+            "switches_per_s": round(rate),
+            "overhead_pct": round((baseline - rate) / baseline * 100, 2),
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Member cache budget: startup chunking, memory, lookup hit rate and latency, census cost.
+
+Boots `Bot` in a child process against `_fake_discord.py` (guilds of
+`--members` members each, all large, so the members intent chunks them)
+in two modes:
+
+  full     – `MemberCache` disabled: every guild chunked at startup and
+             every member kept, as before
+  budgeted – only the first guild opted in (chunked and pinned); members of
+             the others are looked up on demand into a `--budget` MB LRU
+
+Per run: chunk requests at startup, connect-to-ready time, members cached,
+their estimated bytes and the child's RSS; then `--lookups` Zipf-distributed
+`member_cache.get()` calls over the other guilds' members (hit rate, p50/p99
+latency, chunk requests, and the REST lookups taken once discord.py's
+gateway send limit is spent) after two `census()` calls on a guild that is
+not opted in (the first chunks it without caching, the second is served
+from the count cache). Finally, the full-mode child builds `--sample` Members
+under tracemalloc and compares their allocated bytes with `member_bytes()`.
+
+Usage: python benchmarks/member_cache_bench.py --guilds 20 --members 5000 --budget 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = ("full", "budgeted")
+
+def _guilds(count: int, members: int) -> List[Dict[str, Any]]:
+    guilds = []
+    for k in range(count):
+        guild_id = str((k + 1) << 22)
+        guilds.append({
+            "id": guild_id, "name": f"guild {k}", "owner_id": "42", "unavailable": False,
+            "member_count": members, "features": [], "emojis": [], "stickers": [], "members": [], "threads": [],
+            "presences": [], "voice_states": [],
+            "roles": [{"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(int(guild_id) + 1), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        })
+    return guilds
+
+def _lookups(guild_ids: List[int], members: int, count: int, skew: float, seed: int) -> List[tuple]:
+    """Seeded (guild id, user id) lookups, Zipf(`skew`) over a shuffled ranking of the guilds' members."""
+    rng = random.Random(seed)
+    population = [(guild_id, guild_id * 1000 + i) for guild_id in guild_ids for i in range(members)]
+    rng.shuffle(population)
+    cum_weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(len(population))))
+    return rng.choices(population, cum_weights=cum_weights, k=count)
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def _estimator(bot, sample: int) -> Dict[str, Any]:
+    """Bytes tracemalloc attributes to `sample` Members parsed from gateway JSON vs. `member_bytes()`."""
+    import discord
+    from benchmarks._fake_discord import FakeDiscord
+    from src.modules.member_cache import member_bytes
+
+    guild = bot.guilds[0]
+    # ids past every fake guild's members, so every Member gets a fresh User
+    raw = json.dumps([FakeDiscord.member_payload({"id": str(10 ** 12)}, i) for i in range(sample)])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    members = {}
+    for payload in json.loads(raw):
+        member = discord.Member(data=payload, guild=guild, state=bot._connection)
+        members[member.id] = member
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    estimated = sum(member_bytes(member) for member in members.values())
+    return {"members": len(members), "traced_per_member": round(traced / len(members)), "estimated_per_member": round(estimated / len(members))}
+
+# ---------- child: one bot process ----------
+async def _child(args: argparse.Namespace) -> None:
+    import bot as bot_module
+    from benchmarks._fake_discord import patch_discord
+    from src.modules.load_config import ConfigService
+    from src.modules.startup import rss_bytes
+
+    patch_discord(args.url)
+    first_guild = 1 << 22
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config.update({
+        "Storage": {"Backend": "sqlite", "Path": str(Path(args.tmp) / "bot.sqlite3"), "FlushInterval": 0.1},
+        "Startup": {"ReportPath": str(Path(args.tmp) / "startup_report.json"), "SyncHashPath": str(Path(args.tmp) / "tree.sha256")},
+        "Metrics": {},
+        "LazyExtensions": {"Enabled": False},
+        "RobloxWatchlist": {"Path": ":memory:"},
+        "GatewaySession": {"Enabled": False},
+        "MemberCache": {"Enabled": args.mode == "budgeted", "BudgetMB": args.budget, "Guilds": [first_guild], "FetchTimeout": 5},
+    })
+    bot = bot_module.Bot(config)
+    report = lambda event, **data: os.write(args.report_fd, (json.dumps({"event": event, **data}) + "\n").encode())
+    marks: Dict[str, float] = {}
+
+    async def on_connect() -> None:
+        marks.setdefault("connect", time.perf_counter())
+
+    bot.add_listener(on_connect)
+    runner = asyncio.create_task(bot.start("bench-token"))
+    await asyncio.create_task(bot.wait_until_ready())
+    cache = bot.member_cache
+    rows = cache.report(bot.guilds)
+    report(
+        "ready",
+        connect_to_ready_ms=round((time.perf_counter() - marks["connect"]) * 1000, 1),
+        members_cached=sum(len(guild._members) for guild in bot.guilds),
+        estimated_bytes=sum(row["bytes"] for row in rows),
+        rss_bytes=rss_bytes(),
+    )
+
+    # Census first: once the lookups spend the gateway's send budget, chunk requests wait for the next window
+    others = [guild.id for guild in bot.guilds if guild.id != first_guild]
+    census_ms = []
+    for _ in range(2):
+        started = time.perf_counter()
+        humans, bots = await cache.census(bot.get_guild(others[0]))
+        census_ms.append(round((time.perf_counter() - started) * 1000, 2))
+    latencies = []
+    for guild_id, user_id in _lookups(others, args.members, args.lookups, args.skew, args.seed):
+        started = time.perf_counter()
+        await cache.get(bot.get_guild(guild_id), user_id)
+        latencies.append((time.perf_counter() - started) * 1000)
+    stats = cache.stats()
+    report(
+        "done",
+        lookups=len(latencies),
+        hit_rate=stats["hit_rate"] if cache.enabled else 1.0,
+        lookup_chunk_requests=stats["fetches"],
+        lookup_rest_fetches=stats["rest_fetches"],
+        p50_ms=round(_percentile(latencies, 0.5), 3),
+        p99_ms=round(_percentile(latencies, 0.99), 3),
+        evictions=stats["evictions"],
+        cache_bytes=sum(row["bytes"] for row in cache.report(bot.guilds)),
+        census=[humans, bots],
+        census_first_ms=census_ms[0],
+        census_cached_ms=census_ms[1],
+        census_chunk_requests=stats["censuses"],
+        rss_bytes=rss_bytes(),
+        estimator=_estimator(bot, args.sample) if args.mode == "full" else None,
+    )
+    await bot.close()
+    await runner
+
+# ---------- parent ----------
+async def _read_event(reader: asyncio.StreamReader, proc: asyncio.subprocess.Process, timeout: float) -> Dict[str, Any]:
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        raise RuntimeError(f"child exited with {await proc.wait()}")
+    return json.loads(line)
+
+async def _boot(args: argparse.Namespace, fake, mode: str) -> Dict[str, Any]:
+    read_fd, write_fd = os.pipe()
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, __file__, "--child", "--mode", mode, "--url", fake.url, "--tmp", tmp,
+            "--members", str(args.members), "--budget", str(args.budget), "--lookups", str(args.lookups),
+            "--skew", str(args.skew), "--seed", str(args.seed), "--sample", str(args.sample),
+            "--report-fd", str(write_fd), pass_fds=(write_fd,), cwd=ROOT,
+            stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+            stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+        )
+        os.close(write_fd)
+        reader = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(read_fd, "rb"))
+        chunks_before = fake.gateway_ops[8]
+        try:
+            ready = await _read_event(reader, proc, args.timeout)
+            done = await _read_event(reader, proc, args.timeout)
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            transport.close()
+    chunk_requests = fake.gateway_ops[8] - chunks_before
+    ready.pop("event"), done.pop("event")
+    return {
+        "mode": mode,
+        "startup_chunk_requests": chunk_requests - done["lookup_chunk_requests"] - done["census_chunk_requests"],
+        **ready,
+        **{key: value for key, value in done.items() if key not in ("rss_bytes", "estimator")},
+        "rss_after_bytes": done["rss_bytes"],
+        **({"estimator": done["estimator"]} if done["estimator"] else {}),
+    }
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from benchmarks._fake_discord import FakeDiscord
+
+    results = []
+    async with FakeDiscord(guilds=_guilds(args.guilds, args.members), heartbeat_interval=30.0, ack_delay=0.0) as fake:
+        for _ in range(args.runs):
+            for mode in MODES:
+                results.append(await _boot(args, fake, mode))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the memory-budgeted member cache against caching every member.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="budgeted", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--tmp", help=argparse.SUPPRESS)
+    parser.add_argument("--report-fd", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--guilds", type=int, default=20, help="Guilds (default: 20)")
+    parser.add_argument("--members", type=int, default=5000, help="Members per guild (default: 5000)")
+    parser.add_argument("--budget", type=float, default=8.0, help="MemberCache BudgetMB in budgeted mode (default: 8)")
+    parser.add_argument("--lookups", type=int, default=5000, help="member_cache.get() calls (default: 5000)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of the lookups (default: 1.1)")
+    parser.add_argument("--seed", type=int, default=7, help="Lookup seed (default: 7)")
+    parser.add_argument("--sample", type=int, default=5000, help="Members built for the estimator check (default: 5000)")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per mode (default: 1)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-step timeout in seconds (default: 300)")
+    parser.add_argument("--verbose", action="store_true", help="Show the children's output")
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args))
+        return
+
+    results = asyncio.run(_run(args))
+    for result in results:
+        print(json.dumps(result))
+    if args.runs > 1:
+        for mode in MODES:
+            runs = [result for result in results if result["mode"] == mode]
+            print(json.dumps({
+                "mode": mode,
+                "runs": len(runs),
+                **{key: statistics.median(run[key] for run in runs) for key in ("connect_to_ready_ms", "members_cached", "rss_bytes", "hit_rate", "p50_ms", "p99_ms")},
+            }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Command metrics: histogram accuracy/footprint, per-invocation overhead and an end-to-end scrape.
+
+  histogram – HdrHistogram percentiles vs. exact ones over a log-normal
+              latency sample, its fixed size vs. keeping raw samples, and
+              the cost of one record().
+  commands  – prefix commands run through `Bot.process_commands` against
+              the fake Discord: a `work` command (CPU + one reply) and a
+              `fail` command. Reports the overhead of the timed invoke and
+              checks what `/metrics` reports against what actually
+              happened (calls, errors, Discord wait vs. CPU).
+
+Usage: python benchmarks/metrics_bench.py --invocations 300 --latency 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import socket
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import aiohttp
+import discord
+from discord.ext import commands
+
+from benchmarks._fake_discord import FakeDiscord
+from src.modules.metrics import HdrHistogram
+
+CHANNEL = 700
+AUTHOR = {"id": "42", "username": "bench-user", "discriminator": "0001", "avatar": None}
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (-?[0-9.e+]+)$')
+
+def _histogram(args: argparse.Namespace) -> dict:
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-3.5, 1.2) for _ in range(args.samples)]
+    histogram = HdrHistogram()
+    started = time.perf_counter()
+    for value in samples:
+        histogram.record(value)
+    record_ns = (time.perf_counter() - started) / len(samples) * 1e9
+    samples.sort()
+    errors = {}
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = samples[max(int(q * len(samples)) - 1, 0)]
+        errors[f"p{q * 100:g}".replace(".", "")] = round(abs(histogram.quantile(q) - exact) / exact * 100, 2)
+    return {
+        "part": "histogram",
+        "samples": len(samples),
+        "record_ns": round(record_ns),
+        "quantile_error_pct": errors,
+        "histogram_bytes": histogram.counts.itemsize * len(histogram.counts),
+        "raw_samples_bytes": sys.getsizeof(samples) + len(samples) * sys.getsizeof(1.0),
+    }
+
+def _message(bot: discord.Client, content: str, message_id: int, channel_id: int = CHANNEL) -> discord.Message:
+    data = {
+        "id": str(message_id), "channel_id": str(channel_id), "author": AUTHOR, "content": content,
+        "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None, "tts": False,
+        "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+        "embeds": [], "pinned": False, "type": 0, "flags": 0,
+    }
+    return discord.Message(state=bot._connection, channel=bot.get_partial_messageable(channel_id), data=data)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def _commands(args: argparse.Namespace) -> dict:
+    import bot as bot_module
+    from src.cogs.metrics import BotMetrics
+
+    port = _free_port()
+    async with FakeDiscord(latency=args.latency / 1000) as fake:
+        fake.patch_discord()
+        bot = bot_module.Bot({"Prefix": "!", "Storage": {"Backend": "memory"}, "Metrics": {"Port": port}})
+
+        @bot.command(name="work")
+        async def work(ctx: commands.Context):
+            deadline = time.thread_time() + args.cpu / 1000
+            while time.thread_time() < deadline:
+                pass
+            await bot.outbound.send(ctx, "done", coalesce=False)
+
+        @bot.command(name="fail")
+        async def fail(ctx: commands.Context):
+            raise RuntimeError("boom")
+
+        bot.setup_hook = lambda: asyncio.sleep(0)  # no extension loading, just login
+        await bot.login("bench-token")
+        await bot.add_cog(BotMetrics(bot))
+        await bot.metrics.start()
+
+        # Overhead: the timed invoke vs. discord.py's own, on a command that does nothing
+        @bot.command(name="noop")
+        async def noop(ctx: commands.Context):
+            pass
+
+        ctx = await bot.get_context(_message(bot, "!noop", 1))
+        timings = {}
+        for mode, invoke in (("plain", lambda: commands.Bot.invoke(bot, ctx)), ("timed", lambda: bot.invoke(ctx))):
+            started = time.perf_counter()
+            for _ in range(args.invocations * 10):
+                await invoke()
+            timings[mode] = (time.perf_counter() - started) / (args.invocations * 10) * 1e6
+        await asyncio.sleep(0.05)
+        bot.metrics.commands.clear()
+
+        failures = max(args.invocations // 10, 1)
+        for i in range(args.invocations):
+            # A channel each, so replies never wait on the 5-per-5s message bucket
+            await bot.process_commands(_message(bot, "!work", 10_000 + i, CHANNEL + i))
+        for i in range(failures):
+            await bot.process_commands(_message(bot, "!fail", 20_000 + i))
+        await asyncio.sleep(0.1)  # let the completion/error listeners run
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                content_type = response.headers["Content-Type"]
+                text = await response.text()
+        await bot.close()
+
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#") or not line:
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"not valid exposition format: {line!r}"
+        samples[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    work = 'command="work",kind="prefix"'
+    assert samples[f"bot_command_calls_total{{{work}}}"] == args.invocations, samples
+    assert samples[f'bot_command_errors_total{{command="fail",kind="prefix",error="RuntimeError"}}'] == failures, samples
+    calls = args.invocations
+    mean = lambda metric: samples[f"{metric}_sum{{{work}}}"] / calls * 1000
+    return {
+        "part": "commands",
+        "invocations": calls,
+        "failures": failures,
+        "invoke_overhead_us": round(timings["timed"] - timings["plain"], 1),
+        "content_type": content_type,
+        "exposition_lines": len(text.splitlines()),
+        "work_mean_ms": round(mean("bot_command_duration_seconds"), 2),
+        "work_discord_wait_mean_ms": round(mean("bot_command_discord_wait_seconds"), 2),
+        "work_cpu_mean_ms": round(mean("bot_command_cpu_seconds"), 2),
+        "work_p99_ms": round(samples[f'bot_command_duration_seconds{{{work},quantile="0.99"}}'] * 1000, 2),
+        "expected": {"discord_wait_ms": args.latency, "cpu_ms": args.cpu},
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the command metrics subsystem.")
+    parser.add_argument("--samples", type=int, default=1_000_000, help="Samples for the histogram part (default: 1000000)")
+    parser.add_argument("--invocations", type=int, default=300, help="work command invocations (default: 300)")
+    parser.add_argument("--cpu", type=float, default=2.0, help="CPU ms burned by the work command (default: 2)")
+    parser.add_argument("--latency", type=float, default=20.0, help="Fake Discord REST latency in ms (default: 20)")
+    args = parser.parse_args()
+
+    print(json.dumps(_histogram(args)))
+    print(json.dumps(asyncio.run(_commands(args))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Direct `channel.send` / `add_reaction` vs. the `Outbound` dispatcher against a rate-limited fake Discord.
+
+The fake REST server enforces Discord's per-channel buckets (5 messages /
+5 s, 1 reaction / 0.25 s) and answers 429 past them; discord.py then sleeps
+and retries as it would in production. Scenarios:
+  burst     – 25 replies (from separate commands, so never merged) to one
+              busy channel at once
+  lanes     – a moderation notice issued while fun traffic (embed sends
+              and three tic-tac-toe boards' reactions) floods the channel;
+              reports when the notice reached the server
+  commands  – tictactoe's 9 reactions, getbadge's 2 messages (one
+              invocation, as `Bot.invoke` runs it, so they may merge), warn's
+              notice + DM
+Reports upstream requests, 429s and wall/priority latency per mode.
+
+Usage: python benchmarks/outbound_bench.py --latency 40
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import discord
+
+from benchmarks._fake_discord import FakeDiscord
+from src.modules.metrics import Metrics
+from src.modules.outbound import Outbound
+
+CHANNEL, DM_CHANNEL = 500, 501
+DIGITS = [f"{i}⃣" for i in range(1, 10)]
+
+def _requests(fake: FakeDiscord) -> int:
+    return sum(n for path, n in fake.hits.items() if "/channels/" in path)
+
+async def _burst(client: discord.Client, fake: FakeDiscord, outbound: Outbound, mode: str, args: argparse.Namespace) -> dict:
+    channel = client.get_partial_messageable(CHANNEL)
+    texts = [f"reply {i}" for i in range(args.burst)]
+    if mode == "direct":
+        messages = await asyncio.gather(*(channel.send(text) for text in texts))
+    else:
+        messages = await asyncio.gather(*(outbound.send(channel, text) for text in texts))
+    return {"delivered": len({m.id for m in messages}), "all_answered": len(messages) == len(texts)}
+
+async def _lanes(client: discord.Client, fake: FakeDiscord, outbound: Outbound, mode: str, args: argparse.Namespace) -> dict:
+    channel = client.get_partial_messageable(CHANNEL)
+    boards = [channel.get_partial_message(900 + i) for i in range(3)]
+    if mode == "direct":
+        fun = [channel.send(embed=discord.Embed(title=f"meme {i}")) for i in range(args.fun)]
+        fun += [board.add_reaction(digit) for board in boards for digit in DIGITS]
+    else:
+        fun = [outbound.send(channel, embed=discord.Embed(title=f"meme {i}"), lane="fun", coalesce=False) for i in range(args.fun)]
+        fun += [outbound.react(board, DIGITS, lane="fun") for board in boards]
+    fun_tasks = [asyncio.ensure_future(call) for call in fun]
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    if mode == "direct":
+        await channel.send("Member warned.")
+    else:
+        await outbound.send(channel, "Member warned.", lane="moderation")
+    await asyncio.gather(*fun_tasks)
+    # When it reached Discord; discord.py itself may hold the call open while it sleeps out the bucket
+    return {"moderation_delivered_ms": round((fake.received_at["Member warned."] - started) * 1000, 1)}
+
+async def _commands(client: discord.Client, fake: FakeDiscord, outbound: Outbound, mode: str, args: argparse.Namespace) -> dict:
+    channel, dm = client.get_partial_messageable(CHANNEL), client.get_partial_messageable(DM_CHANNEL)
+    timings = {}
+    started = time.perf_counter()
+    if mode == "direct":
+        board = await channel.send("board")
+        for digit in DIGITS:
+            await board.add_reaction(digit)
+    else:
+        board = await outbound.send(channel, "board", lane="fun", coalesce=False)
+        await outbound.react(board, DIGITS, lane="fun")
+    timings["tictactoe_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    await asyncio.sleep(5.0)  # let the message window reset between commands
+    started = time.perf_counter()
+    lines = ["To get the Active Developer Badge, follow this link:", "https://discord.com/developers/active-developer"]
+    if mode == "direct":
+        for line in lines:
+            await channel.send(line)
+    else:
+        async def getbadge() -> None:
+            await asyncio.gather(*(outbound.send(channel, line) for line in lines))
+
+        await Metrics().track("getbadge", "prefix", getbadge())
+    timings["getbadge_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    if mode == "direct":
+        await channel.send(embed=discord.Embed(title="Member Warned"))
+        await dm.send("You have been warned.")
+    else:
+        await asyncio.gather(
+            outbound.send(channel, embed=discord.Embed(title="Member Warned"), lane="moderation"),
+            outbound.send(dm, "You have been warned.", lane="moderation"),
+        )
+    timings["warn_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+SCENARIOS = {"burst": _burst, "lanes": _lanes, "commands": _commands}
+
+async def _run(args: argparse.Namespace, scenario: str, mode: str) -> dict:
+    async with FakeDiscord(latency=args.latency / 1000) as fake:
+        fake.patch_discord()
+        client = discord.Client(intents=discord.Intents.none())
+        await client.login("bench-token")
+        fake.hits.clear()
+        outbound = Outbound()
+        started = time.perf_counter()
+        result = await SCENARIOS[scenario](client, fake, outbound, mode, args)
+        wall_ms = (time.perf_counter() - started) * 1000
+        await client.close()
+    report = {
+        "scenario": scenario,
+        "mode": mode,
+        "requests": _requests(fake),
+        "rate_limited": sum(fake.rate_limited.values()),
+        "wall_ms": round(wall_ms, 1),
+        **result,
+    }
+    if mode == "outbound":
+        stats = outbound.stats()
+        report["outbound"] = {key: stats[key] for key in ("requests", "coalesced", "max_depth", "wait")}
+    return report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the outbound dispatcher against a rate-limited fake Discord.")
+    parser.add_argument("--burst", type=int, default=25, help="Concurrent replies in the burst scenario (default: 25)")
+    parser.add_argument("--fun", type=int, default=10, help="Fun embed sends in the lanes scenario (default: 10)")
+    parser.add_argument("--latency", type=float, default=40.0, help="Fake REST latency in ms (default: 40)")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    args = parser.parse_args()
+
+    for scenario in SCENARIOS if args.scenario == "all" else [args.scenario]:
+        for mode in ("direct", "outbound"):
+            print(json.dumps(asyncio.run(_run(args, scenario, mode))))
+
+if __name__ == "__main__":
+    main()
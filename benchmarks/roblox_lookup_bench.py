@@ -0,0 +1,145 @@
+"""Upstream requests made by concurrent `rblxfollowers` lookups under each coalescing layer.
+
+Runs the RobloxFollowers cog's lookup path against a local stub of the
+roproxy/roblox endpoints and counts the requests it receives, with no
+coalescing, with single-flight only, and with single-flight plus
+micro-batched avatar/username calls. A burst of commands for one popular
+creator must cost exactly one request per lookup kind when coalescing is on.
+
+Usage: python benchmarks/roblox_lookup_bench.py --burst 500 --ids 200
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiohttp import web
+
+from benchmarks._stub import StubServer
+from src.cogs.rblxfollowercount import RobloxFollowers
+from src.modules.http_client import HttpClient
+from src.modules.storage import MemoryBackend, Storage
+
+async def roblox_stub(request: web.Request) -> web.Response:
+    """Answer the friends/users/thumbnails endpoints for any host prefix."""
+    parts = request.path.strip("/").split("/")
+    if request.method == "POST":
+        ids = (await request.json())["userIds"]
+        return web.json_response({"data": [{"id": i, "name": f"creator{i}", "displayName": f"creator{i}"} for i in ids]})
+    if "followers" in parts:
+        return web.json_response({"count": int(parts[-3]) * 7})
+    if "thumbnails" in parts:
+        ids = [int(i) for i in request.query["userIds"].split(",")]
+        return web.json_response({"data": [{"targetId": i, "state": "Completed", "imageUrl": f"https://tr.rbxcdn.com/{i}.png"} for i in ids]})
+    return web.json_response({"id": int(parts[-1]), "name": f"creator{parts[-1]}"})
+
+def point_at(cog: RobloxFollowers, url: str) -> None:
+    """Route the cog's roproxy and roblox URLs to the stub, keeping the two hosts distinguishable by path."""
+    for attr in vars(cog).copy():
+        if attr.endswith("_api"):
+            template = getattr(cog, attr)
+            host, path = template.split("://", 1)[1].split("/", 1)
+            upstream, service = ("roproxy" if "roproxy" in host else "roblox"), host.split(".", 1)[0]
+            setattr(cog, attr, f"{url}/{upstream}/{service}/{path}")
+
+def make_cog(url: str, client: HttpClient, config: Optional[dict] = None) -> RobloxFollowers:
+    config = {"RobloxWatchlist": {"Path": ":memory:"}, **(config or {})}
+    cog = RobloxFollowers(SimpleNamespace(_config=config, http_client=client, storage=Storage(MemoryBackend()), shard_bus=None))
+    point_at(cog, url)
+    return cog
+
+class _NoCoalescing:
+    """Stand-in for SingleFlight that runs every call on its own."""
+
+    async def do(self, key, factory):
+        return await factory()
+
+class _Unbatched:
+    """Stand-in for MicroBatcher that sends one request per key, as before batching."""
+
+    def __init__(self, fetch_many) -> None:
+        self.fetch_many = fetch_many
+
+    async def load(self, key):
+        return (await self.fetch_many([key])).get(key)
+
+    async def close(self) -> None:
+        pass
+
+def _by_kind(hits) -> dict:
+    kinds = {"count": 0, "avatar": 0, "username": 0}
+    for path, n in hits.items():
+        kind = "count" if "followers" in path else "avatar" if "thumbnails" in path else "username"
+        kinds[kind] += n
+    return kinds
+
+async def _lookup(cog: RobloxFollowers, user_id: int) -> tuple:
+    return await asyncio.gather(cog.get_follower_count(user_id), cog.get_roblox_avatar_url(user_id), cog.get_roblox_username(user_id))
+
+async def _run(args: argparse.Namespace, mode: str) -> dict:
+    async with StubServer(roblox_stub, latency=args.latency / 1000) as stub:
+        client = HttpClient(limit_per_host=100)
+        cog = make_cog(stub.url, client)
+        if mode == "uncoalesced":
+            cog.flights = _NoCoalescing()
+        if mode != "single-flight+batching":
+            cog.avatar_batcher = _Unbatched(cog._fetch_avatar_urls)
+            cog.username_batcher = _Unbatched(cog._fetch_usernames)
+
+        # Burst: everyone asks about the same popular creator at once
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_lookup(cog, 1) for _ in range(args.burst)))
+        burst_ms = (time.perf_counter() - started) * 1000
+        burst = _by_kind(stub.hits)
+        assert all(result == results[0] for result in results), "callers saw different answers"
+        assert results[0] == [7, "https://tr.rbxcdn.com/1.png", "creator1"], results[0]
+
+        # Mixed: a burst spread over many creators, none cached yet
+        stub.hits.clear()
+        ids = [random.randrange(2, 2 + args.ids) for _ in range(args.burst)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_lookup(cog, user_id) for user_id in ids))
+        mixed_ms = (time.perf_counter() - started) * 1000
+        mixed = _by_kind(stub.hits)
+        assert all(result[2] == f"creator{user_id}" for user_id, result in zip(ids, results)), "batched results fanned out to the wrong callers"
+        await cog.cog_unload()
+        await client.close()
+
+    distinct = len(set(ids))
+    if mode != "uncoalesced":
+        assert sum(burst.values()) == 3, f"expected one request per lookup kind, got {burst}"
+        assert mixed["count"] == distinct, f"expected {distinct} count requests, got {mixed['count']}"
+    if mode == "single-flight+batching":
+        batches = math.ceil(distinct / cog.avatar_batcher.max_batch)
+        assert mixed["avatar"] == mixed["username"] == batches, f"expected {batches} batched requests per kind, got {mixed}"
+    return {
+        "mode": mode,
+        "burst": args.burst,
+        "upstream_requests_burst": sum(burst.values()),
+        "burst_ms": round(burst_ms, 1),
+        "distinct_ids_mixed": distinct,
+        "upstream_requests_mixed": mixed,
+        "mixed_ms": round(mixed_ms, 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-flight and micro-batching of Roblox lookups.")
+    parser.add_argument("--burst", type=int, default=500, help="Concurrent rblxfollowers calls (default: 500)")
+    parser.add_argument("--ids", type=int, default=200, help="Distinct creators in the mixed burst (default: 200)")
+    parser.add_argument("--latency", type=float, default=50.0, help="Stub latency in ms (default: 50)")
+    args = parser.parse_args()
+
+    for mode in ("uncoalesced", "single-flight", "single-flight+batching"):
+        print(json.dumps(asyncio.run(_run(args, mode))))
+
+if __name__ == "__main__":
+    main()
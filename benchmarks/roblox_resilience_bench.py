@@ -0,0 +1,137 @@
+"""`rblxfollowers` latency through roproxy outages and 429s: old retry loop vs. circuit breakers + stale-while-revalidate.
+
+A local stub plays both upstreams and walks through a scripted timeline:
+healthy, roproxy returning 503, roproxy rate limiting with Retry-After,
+both hosts down, healthy again. Commands arrive at a steady rate for a
+rotating set of creators; cache TTLs are shortened so entries expire
+during the run. Reports per-phase latency and failed lookups.
+
+Usage: python benchmarks/roblox_resilience_bench.py --rate 20 --phase 3
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks._stub import StubServer
+from benchmarks.roblox_lookup_bench import make_cog, roblox_stub
+from src.modules.http_client import HttpClient
+
+PHASES = (
+    ("healthy", {"roproxy": "ok", "roblox": "ok"}),
+    ("roproxy-503", {"roproxy": "503", "roblox": "ok"}),
+    ("roproxy-429", {"roproxy": "429", "roblox": "ok"}),
+    ("both-down", {"roproxy": "503", "roblox": "503"}),
+    ("recovered", {"roproxy": "ok", "roblox": "ok"}),
+)
+
+async def _legacy_fetch_json(cog, url: str, retries: int = 3, json_body: Optional[dict] = None) -> Optional[dict]:
+    """The pre-breaker retry loop: up to 3 tries per URL with 1 s / 2 s / 4 s sleeps."""
+    for attempt in range(retries):
+        try:
+            request = cog.bot.http_client.get(url) if json_body is None else cog.bot.http_client.post(url, json=json_body)
+            async with request as response:
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    await asyncio.sleep(float(retry_after) if retry_after else 1.0 * (2 ** attempt))
+                    continue
+                if 200 <= response.status < 300:
+                    return await response.json()
+                if 500 <= response.status < 600:
+                    await asyncio.sleep(1.0 * (2 ** attempt))
+                    continue
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            await asyncio.sleep(1.0 * (2 ** attempt))
+    return None
+
+def _use_legacy_chain(cog) -> None:
+    async def fetch_json(roproxy_url: str, roblox_url: str, *, json_body: Optional[dict] = None) -> Optional[dict]:
+        data = await _legacy_fetch_json(cog, roproxy_url, json_body=json_body)
+        if not data:
+            data = await _legacy_fetch_json(cog, roblox_url, json_body=json_body)
+        return data
+
+    cog._fetch_json = fetch_json
+    for cache in (cog.counts, cog.avatars, cog.usernames):
+        cache.stale_ttl = 0.0
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    pick = lambda p: round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1)
+    return {"p50_ms": pick(0.5), "p99_ms": pick(0.99), "max_ms": round(values[-1] * 1000, 1)}
+
+async def _run(args: argparse.Namespace, mode: str) -> dict:
+    state = dict(PHASES[0][1])
+
+    async def handler(request: web.Request) -> web.Response:
+        upstream = request.path.strip("/").split("/", 1)[0]
+        if state[upstream] == "503":
+            return web.json_response({"errors": []}, status=503)
+        if state[upstream] == "429":
+            return web.json_response({"errors": []}, status=429, headers={"Retry-After": "1"})
+        return await roblox_stub(request)
+
+    async with StubServer(handler, latency=args.latency / 1000) as stub:
+        client = HttpClient(limit_per_host=100)
+        cog = make_cog(stub.url, client)
+        if mode == "retry-loop":
+            _use_legacy_chain(cog)
+        for cache in (cog.counts, cog.avatars, cog.usernames):
+            cache.ttl = args.ttl
+        for breaker in cog.breakers.values():
+            breaker.reset_timeout = args.phase / 2
+
+        results: Dict[str, dict] = {name: {"latencies": [], "failed": 0} for name, _ in PHASES}
+
+        async def command(phase: str, user_id: int) -> None:
+            started = time.perf_counter()
+            count, _, _ = await asyncio.gather(
+                cog.get_follower_count(user_id), cog.get_roblox_avatar_url(user_id), cog.get_roblox_username(user_id)
+            )
+            results[phase]["latencies"].append(time.perf_counter() - started)
+            if count is None:
+                results[phase]["failed"] += 1
+
+        tasks = []
+        for name, upstreams in PHASES:
+            state.update(upstreams)
+            phase_end = time.perf_counter() + args.phase
+            while time.perf_counter() < phase_end:
+                tasks.append(asyncio.create_task(command(name, random.randrange(args.ids))))
+                await asyncio.sleep(1 / args.rate)
+        await asyncio.gather(*tasks)
+        await cog.cog_unload()
+        await client.close()
+        upstream_requests = {host: sum(n for path, n in stub.hits.items() if path.startswith(f"/{host}/")) for host in ("roproxy", "roblox")}
+
+    return {
+        "mode": mode,
+        "phases": {name: {"commands": len(r["latencies"]), "failed": r["failed"], **_percentiles(r["latencies"])} for name, r in results.items()},
+        "upstream_requests": upstream_requests,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Roblox lookups through upstream outages and rate limits.")
+    parser.add_argument("--rate", type=float, default=20, help="rblxfollowers commands per second (default: 20)")
+    parser.add_argument("--phase", type=float, default=3.0, help="Seconds per timeline phase (default: 3)")
+    parser.add_argument("--ids", type=int, default=30, help="Distinct creators (default: 30)")
+    parser.add_argument("--ttl", type=float, default=1.0, help="Shortened cache TTL in seconds (default: 1)")
+    parser.add_argument("--latency", type=float, default=30.0, help="Stub latency in ms (default: 30)")
+    args = parser.parse_args()
+
+    for mode in ("retry-loop", "breaker+swr"):
+        print(json.dumps(asyncio.run(_run(args, mode))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Sharded launch against a local fake gateway: identify pacing, cross-worker state and per-shard stats.
+
+Runs the real `ShardOrchestrator` with `bot.run_shard_worker` workers (each
+a full `ShardedBot` loading every cog) against `_fake_discord.py`, which
+enforces one IDENTIFY per max_concurrency bucket per `--identify-interval`
+(Discord's 5 s, scaled down) and answers violations with INVALID_SESSION.
+
+  identify – time until every shard is READY and identify violations, with
+             the parent's identify gate vs. no gate (interval 0), for
+             max_concurrency 1 and 4
+  relay    – a `!note` written through a shard in one worker, then read by
+             `!notes` through a shard in another worker that had already
+             cached the empty value; and an owner `!setstatus` in one
+             worker reaching every shard's gateway connection
+  events   – MESSAGE_CREATE traffic on every shard with 1 worker vs.
+             `--workers`; the events/s and heartbeat latency each worker
+             reported to the parent vs. what the fake gateway sent
+
+Usage: python benchmarks/sharding_bench.py --shards 8 --workers 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import bot as bot_module
+from benchmarks._fake_discord import FakeDiscord, message_create, patch_discord
+from src.modules.load_config import ConfigService
+from src.modules.sharding import ShardOrchestrator
+
+def _worker_init(url: str, verbose: bool) -> None:
+    patch_discord(url)
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")  # keep cog load chatter out of the JSON output
+        sys.stderr = open(os.devnull, "w")
+
+def _guilds(shard_count: int, per_shard: int) -> List[Dict[str, Any]]:
+    guilds = []
+    for k in range(shard_count * per_shard):
+        guild_id = str((k << 22) + 1)  # (id >> 22) % shard_count picks the shard
+        guilds.append({
+            "id": guild_id, "name": f"guild {k}", "owner_id": "42", "unavailable": False, "large": False,
+            "member_count": 1, "features": [], "emojis": [], "stickers": [], "members": [], "threads": [],
+            "presences": [], "voice_states": [],
+            "roles": [{"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(int(guild_id) + 1), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        })
+    return guilds
+
+def _config(tmp: str) -> Dict[str, Any]:
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config.update({
+        "Storage": {"Backend": "sqlite", "Path": str(Path(tmp) / "bot.sqlite3"), "FlushInterval": 0.1},
+        "Startup": {"ReportPath": str(Path(tmp) / "startup_report.json"), "SyncHashPath": str(Path(tmp) / "tree.sha256")},
+        "Metrics": {},
+        "LazyExtensions": {"Enabled": False},
+        "RobloxWatchlist": {"Path": ":memory:"},
+    })
+    return config
+
+async def _wait(predicate, timeout: float, step: float = 0.05) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(step)
+    return predicate()
+
+class _Cluster:
+    """Fake Discord + orchestrator running in this process, workers in child processes."""
+
+    def __init__(self, args: argparse.Namespace, *, shards: int, workers: int, max_concurrency: int = 1, gated: bool = True, events_per_second: float = 0.0) -> None:
+        self.args = args
+        self.shards = shards
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.gated = gated
+        self.events_per_second = events_per_second
+
+    async def __aenter__(self) -> "_Cluster":
+        self._tmp = tempfile.TemporaryDirectory()
+        self.fake = FakeDiscord(
+            guilds=_guilds(self.shards, 2),
+            shard_count=self.shards,
+            max_concurrency=self.max_concurrency,
+            identify_interval=self.args.identify_interval,
+            heartbeat_interval=1.0,
+            ack_delay=0.02,
+            events_per_second=self.events_per_second,
+        )
+        await self.fake.__aenter__()
+        self.fake.patch_discord()
+        self.orchestrator = ShardOrchestrator(
+            _config(self._tmp.name),
+            "bench-token",
+            bot_module.run_shard_worker,
+            shard_count=self.shards,
+            workers=self.workers,
+            identify_interval=self.args.identify_interval if self.gated else 0.0,
+            stats_interval=1.0,
+            initializer=_worker_init,
+            initargs=(self.fake.url, self.args.verbose),
+        )
+        self.started = time.perf_counter()
+        self.task = asyncio.create_task(self.orchestrator.serve())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.orchestrator.stop()
+        await self.task
+        await self.fake.__aexit__(*exc)
+        self._tmp.cleanup()
+
+    def all_ready(self) -> bool:
+        return len(self.fake.ready_times) == self.shards
+
+    async def command(self, shard_id: int, content: str) -> None:
+        guild = self.fake.shard_guilds([shard_id, self.shards])[0]
+        self.message_id = getattr(self, "message_id", 0) + 1
+        await self.fake.dispatch(shard_id, "MESSAGE_CREATE", message_create(guild["id"], guild["channels"][0]["id"], content, 900_000 + self.message_id))
+
+async def _identify(args: argparse.Namespace, max_concurrency: int, gated: bool) -> dict:
+    async with _Cluster(args, shards=args.shards, workers=args.workers, max_concurrency=max_concurrency, gated=gated) as cluster:
+        ready = await _wait(cluster.all_ready, args.timeout)
+        first = min(cluster.fake.identify_times.values(), default=cluster.started)
+        identifies = sorted(cluster.fake.identify_times.values())
+        result = {
+            "part": "identify",
+            "gate": "parent" if gated else "none",
+            "max_concurrency": max_concurrency,
+            "shards": args.shards,
+            "workers": args.workers,
+            "all_ready": ready,
+            "ready_shards": len(cluster.fake.ready_times),
+            "first_identify_to_all_ready_s": round(max(cluster.fake.ready_times.values()) - first, 2) if ready else None,
+            "identify_violations": cluster.fake.identify_violations,
+            "identify_sessions": cluster.fake.gateway_ops[2],
+            "expected_min_s": round((-(-args.shards // max_concurrency) - 1) * args.identify_interval, 2),
+            "span_s": round(identifies[-1] - identifies[0], 2) if identifies else None,
+        }
+    return result
+
+async def _relay(args: argparse.Namespace) -> dict:
+    async with _Cluster(args, shards=2, workers=2) as cluster:
+        await _wait(cluster.all_ready, args.timeout)
+        await _wait(lambda: len(cluster.orchestrator.shards) == 2, args.timeout)
+        notes = lambda: [m for m in cluster.fake.messages if m["embeds"] and m["embeds"][0].get("title") == "Your Notes"]
+
+        await cluster.command(1, "!notes")  # worker 1 caches "no notes" for this user
+        await _wait(lambda: len(notes()) == 1, 10)
+        await cluster.command(0, "!note written through shard 0")  # worker 0 writes it
+        await _wait(lambda: any(m["embeds"] and m["embeds"][0].get("title") == "Note Added" for m in cluster.fake.messages), 10)
+        written = time.perf_counter()
+        seen = None
+        while time.perf_counter() - written < 10:
+            await cluster.command(1, "!notes")
+            count = len(notes())
+            await _wait(lambda: len(notes()) > count, 5)
+            if "written through shard 0" in (notes()[-1]["embeds"][0].get("description") or ""):
+                seen = time.perf_counter() - written
+                break
+            await asyncio.sleep(0.05)
+
+        presence_before = cluster.fake.gateway_ops[3]
+        await cluster.command(0, "!setstatus watching the shards")  # the fake's application owner
+        await _wait(lambda: cluster.fake.gateway_ops[3] - presence_before >= 2, 10)
+        return {
+            "part": "relay",
+            "note_visible_in_other_worker": seen is not None,
+            "note_visible_after_ms": round(seen * 1000, 1) if seen is not None else None,
+            "presence_updates_sent": cluster.fake.gateway_ops[3] - presence_before,
+            "shards": 2,
+            "relayed_events": cluster.orchestrator.relayed,
+        }
+
+async def _events(args: argparse.Namespace, workers: int) -> dict:
+    async with _Cluster(args, shards=args.shards, workers=workers, events_per_second=args.events) as cluster:
+        await _wait(cluster.all_ready, args.timeout)
+        await asyncio.sleep(2.0)  # past the first stats reports
+        sent_before = sum(cluster.fake.events_sent.values())
+        reported_before = sum(stats["events"] for stats in cluster.orchestrator.shards.values())
+        started = time.perf_counter()
+        await asyncio.sleep(args.seconds)
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(1.2)  # one more report covering the window
+        shards = cluster.orchestrator.shards
+        latencies = [stats["latency_ms"] for stats in shards.values() if stats.get("latency_ms") is not None]
+        status = cluster.orchestrator.status()
+        return {
+            "part": "events",
+            "workers": workers,
+            "shards": args.shards,
+            "sent_per_s": round((sum(cluster.fake.events_sent.values()) - sent_before) / elapsed),
+            "reported_per_s": round((sum(stats["events"] for stats in shards.values()) - reported_before) / (elapsed + 1.2)),
+            "shards_reporting": len(shards),
+            "heartbeat_latency_p50_ms": statistics.median(latencies) if latencies else None,
+            "heartbeat_latency_max_ms": max(latencies) if latencies else None,
+            "worker_loop_lag_p99_ms": [worker["loop_lag_p99_ms"] for worker in status["workers"]],
+        }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process shard orchestrator against a fake gateway.")
+    parser.add_argument("--shards", type=int, default=8, help="Shard count (default: 8)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--identify-interval", type=float, default=0.5, help="Per-bucket identify spacing, Discord's 5 s scaled down (default: 0.5)")
+    parser.add_argument("--events", type=float, default=200.0, help="MESSAGE_CREATE events per second per shard (default: 200)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement window of the events part (default: 5)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Give up waiting for READY after this long (default: 60)")
+    parser.add_argument("--verbose", action="store_true", help="Let workers print their logs")
+    parser.add_argument("--part", choices=["identify", "relay", "events", "all"], default="all")
+    args = parser.parse_args()
+
+    def run(coro) -> None:
+        # The orchestrator's own status lines go to stdout too; keep them out unless asked
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            result = asyncio.run(coro)
+        print(json.dumps(result), flush=True)
+
+    print(json.dumps({"part": "host", "cpus": os.cpu_count()}), flush=True)
+    if args.part in ("identify", "all"):
+        for max_concurrency in (1, 4):
+            for gated in (False, True):
+                run(_identify(args, max_concurrency, gated))
+    if args.part in ("relay", "all"):
+        run(_relay(args))
+    if args.part in ("events", "all"):
+        for workers in (1, args.workers):
+            run(_events(args, workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Cold-start cost of bot.py against a local fake Discord (no network, no token).
+
+Every run boots `Bot` in a fresh interpreter started with `-X importtime`
+and records the time until `setup_hook()` completes and until READY, the
+per-extension import/setup times from the startup report, and peak RSS.
+Per-cog import time is the cumulative time to import the cog module,
+including the dependencies it was first to pull in (extensions are
+imported one at a time by default so this attribution is exact); the
+`-X importtime` log adds the heaviest top-level imports. The median over
+all runs is written as JSON so two versions can be diffed.
+
+Usage: python benchmarks/startup_bench.py --runs 5 --output startup.json
+"""
+import time
+
+PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+async def _boot(args: argparse.Namespace, tmp: str) -> dict:
+    started = time.perf_counter()
+    import bot as bot_module
+    from benchmarks._fake_discord import FakeDiscord
+    from src.modules.load_config import ConfigService
+    import_bot_ms = (time.perf_counter() - started) * 1000
+
+    config = dict(ConfigService.shared(str(ROOT / "config.json")).snapshot)
+    config["Storage"] = {"Backend": "memory"}
+    config["Startup"] = {
+        "ImportWorkers": args.import_workers,
+        "ReportPath": str(Path(tmp) / "startup_report.json"),
+        "SyncHashPath": str(Path(tmp) / "command_tree.sha256"),
+    }
+    config["LazyExtensions"] = {**config.get("LazyExtensions", {}), "Enabled": args.lazy}
+
+    async with FakeDiscord() as fake:
+        fake.patch_discord()
+        bot = bot_module.Bot(config)
+        marks: Dict[str, float] = {}
+        setup_hook = bot.setup_hook
+
+        async def timed_setup_hook() -> None:
+            marks["setup_hook_start"] = time.perf_counter()
+            await setup_hook()
+            marks["setup_hook_done"] = time.perf_counter()
+
+        bot.setup_hook = timed_setup_hook
+        runner = asyncio.create_task(bot.start("bench-token"))
+        ready_wait = asyncio.create_task(bot.wait_until_ready())
+        await asyncio.wait({runner, ready_wait}, timeout=60, return_when=asyncio.FIRST_COMPLETED)
+        if not ready_wait.done():
+            ready_wait.cancel()
+            await bot.close()
+            raise RuntimeError(f"bot did not reach READY: {runner.exception() if runner.done() else 'timeout'}")
+        ready = time.perf_counter()  # includes discord.py's guild_ready_timeout wait (2 s by default)
+        await bot.close()
+        await asyncio.gather(runner, return_exceptions=True)
+
+    since_start = lambda t: round((t - PROCESS_START) * 1000, 1)
+    return {
+        "import_bot_ms": round(import_bot_ms, 1),
+        "setup_hook_ms": round((marks["setup_hook_done"] - marks["setup_hook_start"]) * 1000, 1),
+        "to_setup_hook_done_ms": since_start(marks["setup_hook_done"]),
+        "to_ready_ms": since_start(ready),
+        "peak_rss_mb": _peak_rss_mb(),
+        "phases_ms": bot.startup_report.phases,
+        "extensions": bot.startup_report.extensions,
+        "rest_calls": dict(fake.hits),
+    }
+
+def _top_level_imports(log: str) -> Dict[str, float]:
+    """Cumulative `-X importtime` (ms) of every top-level import, i.e. what each first import pulled in."""
+    totals: Dict[str, float] = {}
+    for line in log.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None or match.group(3) != " ":
+            continue
+        totals[match.group(4)] = totals.get(match.group(4), 0.0) + int(match.group(2)) / 1000
+    return totals
+
+def _median(runs: List[dict], key: str) -> float:
+    return round(statistics.median(run[key] for run in runs), 1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark bot.py cold start against a fake Discord.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to boot (default: 5)")
+    parser.add_argument("--import-workers", type=int, default=1,
+                        help="Startup.ImportWorkers; per-cog import times are exact only with 1 (default: 1)")
+    parser.add_argument("--lazy", action="store_true", help="Enable the LazyExtensions manifest")
+    parser.add_argument("--top", type=int, default=15, help="Heaviest top-level imports to keep (default: 15)")
+    parser.add_argument("--output", default="startup_bench.json", help="JSON results file (default: startup_bench.json)")
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(asyncio.run(_boot(args, tmp))))
+        return
+
+    command = [sys.executable, "-X", "importtime", __file__, "--child", "--import-workers", str(args.import_workers)]
+    if args.lazy:
+        command.append("--lazy")
+    runs, top_imports = [], []
+    for _ in range(args.runs):
+        proc = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.exit(proc.stderr[-2000:])
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        top_imports.append(_top_level_imports(proc.stderr))
+
+    names = sorted({name for run in runs for name in run["extensions"]})
+    result = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import_workers": args.import_workers,
+        "lazy": args.lazy,
+        **{key: _median(runs, key) for key in ("import_bot_ms", "setup_hook_ms", "to_setup_hook_done_ms", "to_ready_ms", "peak_rss_mb")},
+        "phases_ms": {phase: round(statistics.median(run["phases_ms"].get(phase, 0) for run in runs), 1) for phase in runs[0]["phases_ms"]},
+        "rest_calls": runs[0]["rest_calls"],
+        "top_imports_ms": dict(sorted(
+            ((name, round(statistics.median(run.get(name, 0.0) for run in top_imports), 1))
+             for name in {name for run in top_imports for name in run}),
+            key=lambda item: -item[1],
+        )[:args.top]),
+        "extensions": {
+            name: {
+                field: round(statistics.median(run["extensions"].get(name, {}).get(field, 0.0) for run in runs), 2)
+                for field in ("import_ms", "setup_ms", "lazy_load_ms")
+                if field in runs[0]["extensions"].get(name, {})
+            }
+            for name in names
+        },
+    }
+    Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(json.dumps({key: result[key] for key in ("to_setup_hook_done_ms", "to_ready_ms", "setup_hook_ms", "peak_rss_mb")}))
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
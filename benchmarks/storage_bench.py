@@ -0,0 +1,93 @@
+"""Throughput of warnings/notes writes through the write-behind storage layer.
+
+Compares the command path (cache update + queued write) with committing every
+write to SQLite directly, then reopens the database to check nothing was lost.
+
+Usage: python benchmarks/storage_bench.py --writes 50000 --users 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.modules.storage import SQLiteBackend, Storage
+
+async def _write_behind(path: str, writes: int, users: int) -> dict:
+    storage = Storage(SQLiteBackend(path))
+    warnings, notes = storage.namespace("warnings"), storage.namespace("notes")
+    latencies = []
+    started = time.perf_counter()
+    for i in range(writes):
+        ns = warnings if i % 2 else notes
+        user = random.randrange(users)
+        t = time.perf_counter()
+        items = await ns.get(user, [])
+        items.append(f"entry {i}")
+        await ns.set(user, items)
+        latencies.append(time.perf_counter() - t)
+        if i % 256 == 0:
+            await asyncio.sleep(0)  # let the flusher run, as it would between commands
+    command_s = time.perf_counter() - started
+    await storage.close()
+    durable_s = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "mode": "write-behind",
+        "writes": writes,
+        "command_writes_per_s": round(writes / command_s),
+        "durable_writes_per_s": round(writes / durable_s),
+        "latency_p50_us": round(latencies[len(latencies) // 2] * 1e6, 1),
+        "latency_p99_us": round(latencies[int(len(latencies) * 0.99)] * 1e6, 1),
+        **{k: v for k, v in storage.stats().items() if k in ("flushes", "rows_flushed")},
+    }
+
+def _sync_commit(path: str, writes: int, users: int) -> dict:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS kv (namespace TEXT, key TEXT, value TEXT, PRIMARY KEY (namespace, key))")
+    started = time.perf_counter()
+    for i in range(writes):
+        ns = "warnings" if i % 2 else "notes"
+        key = str(random.randrange(users))
+        row = conn.execute("SELECT value FROM kv WHERE namespace = ? AND key = ?", (ns, key)).fetchone()
+        items = json.loads(row[0]) if row else []
+        items.append(f"entry {i}")
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (ns, key, json.dumps(items)))
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return {"mode": "commit-per-write", "writes": writes, "durable_writes_per_s": round(writes / elapsed)}
+
+async def _count_after_restart(path: str) -> int:
+    storage = Storage(SQLiteBackend(path))
+    total = 0
+    for name in ("warnings", "notes"):
+        total += sum(len(items) for _, items in await storage.namespace(name).items())
+    await storage.close()
+    return total
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark persistent cog storage throughput.")
+    parser.add_argument("--writes", type=int, default=50000, help="Warnings + notes to write (default: 50000)")
+    parser.add_argument("--users", type=int, default=2000, help="Distinct users (default: 2000)")
+    parser.add_argument("--baseline-writes", type=int, default=5000, help="Writes for the commit-per-write baseline (default: 5000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bench.sqlite3")
+        result = asyncio.run(_write_behind(path, args.writes, args.users))
+        result["entries_after_restart"] = asyncio.run(_count_after_restart(path))
+        assert result["entries_after_restart"] == args.writes, "writes were lost across restart"
+        print(json.dumps(result))
+        print(json.dumps(_sync_commit(str(Path(tmp) / "baseline.sqlite3"), args.baseline_writes, args.users)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Upstream Tenor calls and `meme` latency with and without the result-page cache.
+
+Drives the Meme cog's fetch path against a local Tenor stub with a skewed
+(Zipf-like) mix of search queries. TTLs are shortened so expiry and
+background prefetching happen within the run.
+
+Usage: python benchmarks/tenor_cache_bench.py --rate 100 --seconds 6
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from aiohttp import web
+
+from benchmarks._stub import StubServer
+from src.cogs.meme import Meme
+from src.modules.http_client import HttpClient
+
+async def _tenor(request: web.Request) -> web.Response:
+    query, limit = request.query["q"], int(request.query["limit"])
+    results = [{"media": [{"gif": {"url": f"https://media.tenor.com/{query}/{i}.gif"}}]} for i in range(limit)]
+    return web.json_response({"results": results})
+
+def _percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 2)
+
+async def _run(args: argparse.Namespace, cached: bool) -> dict:
+    queries = [f"query{i}" for i in range(args.queries)]
+    weights = [1 / (rank + 1) for rank in range(args.queries)]
+    hot = set(queries[:args.hot])
+    config = {"TenorCache": {"Ttl": args.ttl, "PrefetchBefore": args.ttl / 2, "PrefetchMinHits": 3, "PrefetchInterval": args.ttl / 8}}
+
+    async with StubServer(_tenor, latency=args.latency / 1000) as stub:
+        Meme.TENOR_SEARCH_API = f"{stub.url}/v1/search"
+        client = HttpClient()
+        cog = Meme(SimpleNamespace(_config=config, http_client=client, shard_bus=None))
+        await cog.cog_load()
+
+        async def fetch(query: str) -> str:
+            if cached:
+                return await cog.gifs.next_gif(query)
+            return (await cog._fetch_page(query))[0]  # the old path: full page, first result only
+
+        latencies: Dict[str, List[float]] = {"hot": [], "hot_warm": [], "all": []}
+        served: Dict[str, set] = {}
+
+        async def command(query: str) -> None:
+            started = time.perf_counter()
+            gif = await fetch(query)
+            elapsed = time.perf_counter() - started
+            latencies["all"].append(elapsed)
+            if query in hot:
+                latencies["hot"].append(elapsed)
+                if started > warm_after:
+                    latencies["hot_warm"].append(elapsed)
+            served.setdefault(query, set()).add(gif)
+
+        tasks = []
+        deadline = time.perf_counter() + args.seconds
+        warm_after = time.perf_counter() + args.ttl  # past the first fetch of every hot query
+        while time.perf_counter() < deadline:
+            tasks.append(asyncio.create_task(command(random.choices(queries, weights)[0])))
+            await asyncio.sleep(1 / args.rate)
+        await asyncio.gather(*tasks)
+        await cog.cog_unload()
+        await client.close()
+
+    result = {
+        "mode": "page-cache" if cached else "uncached",
+        "commands": len(latencies["all"]),
+        "upstream_calls": stub.total,
+        "hot_p50_ms": _percentile(latencies["hot"], 0.5),
+        "hot_p99_ms": _percentile(latencies["hot"], 0.99),
+        "hot_p99_after_warmup_ms": _percentile(latencies["hot_warm"], 0.99),
+        "all_p99_ms": _percentile(latencies["all"], 0.99),
+        "distinct_gifs_top_query": len(served.get(queries[0], ())),
+    }
+    if cached:
+        result.update({k: v for k, v in cog.gifs.stats().items() if k in ("hits", "misses", "coalesced", "prefetches")})
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Tenor result-page cache.")
+    parser.add_argument("--rate", type=float, default=100, help="meme commands per second (default: 100)")
+    parser.add_argument("--seconds", type=float, default=6.0, help="Run length (default: 6)")
+    parser.add_argument("--queries", type=int, default=40, help="Distinct search queries (default: 40)")
+    parser.add_argument("--hot", type=int, default=5, help="Most popular queries reported as hot (default: 5)")
+    parser.add_argument("--ttl", type=float, default=2.0, help="Cache TTL in seconds (default: 2)")
+    parser.add_argument("--latency", type=float, default=80.0, help="Stub Tenor latency in ms (default: 80)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_run(args, cached=False))))
+    print(json.dumps(asyncio.run(_run(args, cached=True))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Memory/CPU of 100k pending timers: one sleeping coroutine each vs. the TimerService heap.
+
+Also measures re-arming every persisted timer after a restart and how fast a
+burst of due timers is dispatched.
+
+Usage: python benchmarks/timer_bench.py --timers 100000 --idle 3
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.modules.storage import SQLiteBackend, Storage
+from src.modules.timers import TimerService
+
+class _FakeContext:
+    """Stands in for the ctx/member/role/message objects each old coroutine kept alive."""
+
+    def __init__(self, i: int) -> None:
+        self.guild_id = 1
+        self.member_id = i
+        self.role_id = 2
+        self.channel_id = 3
+        self.duration = "30d"
+
+def _payload(i: int) -> dict:
+    return {"guild_id": 1, "member_id": i, "role_id": 2, "channel_id": 3, "duration": "30d"}
+
+async def _idle_cpu(seconds: float) -> float:
+    started = time.process_time()
+    await asyncio.sleep(seconds)
+    return time.process_time() - started
+
+async def _coroutines(count: int, idle: float) -> dict:
+    async def temprole(ctx: _FakeContext) -> None:
+        await asyncio.sleep(30 * 86400)
+
+    gc.collect()
+    tracemalloc.start()
+    tasks = [asyncio.create_task(temprole(_FakeContext(i))) for i in range(count)]
+    await asyncio.sleep(0)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    cpu = await _idle_cpu(idle)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"mode": "coroutine-per-timer", "timers": count, "memory_mb": round(memory / 2**20, 1), "idle_cpu_s": round(cpu, 3)}
+
+async def _service(path: str, count: int, idle: float) -> dict:
+    storage = Storage(SQLiteBackend(path), max_pending=10000)
+    timers = TimerService(storage)
+    timers.register("temprole", lambda data: asyncio.sleep(0))
+    await timers.start()
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(count):
+        await timers.schedule("temprole", 30 * 86400, _payload(i), timer_id=f"temprole:1:{i}:2")
+    schedule_s = time.perf_counter() - started
+    await storage.flush()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    cpu = await _idle_cpu(idle)
+    await timers.close()
+    await storage.close()
+    return {
+        "mode": "timer-service",
+        "timers": count,
+        "memory_mb": round(memory / 2**20, 1),
+        "idle_cpu_s": round(cpu, 3),
+        "schedule_per_s": round(count / schedule_s),
+    }
+
+async def _restart(path: str, burst: int) -> dict:
+    storage = Storage(SQLiteBackend(path), max_pending=10000)
+    timers = TimerService(storage)
+    fired = asyncio.Event()
+
+    async def handler(data: dict) -> None:
+        if timers.fired + 1 >= burst:
+            fired.set()
+
+    timers.register("temprole", handler)
+    started = time.perf_counter()
+    await timers.start()
+    rearm_s = time.perf_counter() - started
+    rearmed = timers.stats()["pending"]
+
+    started = time.perf_counter()
+    for i in range(burst):
+        await timers.schedule("temprole", 0, _payload(i), timer_id=f"burst:{i}")
+    await asyncio.wait_for(fired.wait(), 60)
+    burst_s = time.perf_counter() - started
+    await timers.close()
+    await storage.close()
+    return {"rearmed_after_restart": rearmed, "rearm_s": round(rearm_s, 2), "burst": burst, "burst_fired_per_s": round(burst / burst_s)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark durable timers against per-command sleeping coroutines.")
+    parser.add_argument("--timers", type=int, default=100000, help="Pending timers (default: 100000)")
+    parser.add_argument("--idle", type=float, default=3.0, help="Seconds to sample idle CPU (default: 3)")
+    parser.add_argument("--burst", type=int, default=10000, help="Due timers fired at once (default: 10000)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_coroutines(args.timers, args.idle))))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "timers.sqlite3")
+        print(json.dumps(asyncio.run(_service(path, args.timers, args.idle))))
+        print(json.dumps(asyncio.run(_restart(path, args.burst))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Memory of the Roblox lookup caches after 1M distinct user ids.
+
+Compares the old unbounded `{"count:<id>": {"value": ..., "ts": ...}}` dict
+with TTLCache sized to hold everything and with TTLCache at its configured
+bound. Every id gets a follower count, avatar URL and username, as one
+`rblxfollowers` call would store.
+
+Usage: python benchmarks/ttl_cache_bench.py --ids 1000000 --bound 50000
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.modules.ttl_cache import TTLCache
+
+AVATAR = "https://tr.rbxcdn.com/30DAY-AvatarHeadshot-{:032X}-Png/150/150/AvatarHeadshot/Png/noFilter"
+
+def _values(i: int) -> tuple:
+    return i % 100000, AVATAR.format(i), f"user{i}"
+
+def _baseline(ids: int) -> dict:
+    cache = {}
+    started = time.perf_counter()
+    for i in range(ids):
+        count, avatar, username = _values(i)
+        now = time.monotonic()
+        cache[f"count:{i}"] = {"value": count, "ts": now}
+        cache[f"avatar:{i}"] = {"value": avatar, "ts": now}
+        cache[f"username:{i}"] = {"value": username, "ts": now}
+    elapsed = time.perf_counter() - started
+    return {"entries": len(cache), "elapsed": elapsed, "keep": cache}
+
+def _ttl_caches(ids: int, max_size: int) -> dict:
+    counts, avatars, usernames = (TTLCache(max_size=max_size, ttl=300) for _ in range(3))
+    started = time.perf_counter()
+    for i in range(ids):
+        count, avatar, username = _values(i)
+        counts.set(i, count)
+        avatars.set(i, avatar)
+        usernames.set(i, username)
+    elapsed = time.perf_counter() - started
+    hits = sum(counts.get(i) is not None for i in range(ids - 1000, ids))
+    return {"entries": len(counts) + len(avatars) + len(usernames), "elapsed": elapsed, "keep": (counts, avatars, usernames),
+            "recent_hits": hits, "evictions": counts.evictions + avatars.evictions + usernames.evictions}
+
+def _measure(mode: str, run, *args) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    result = run(*args)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    result.pop("keep")
+    elapsed = result.pop("elapsed")
+    return {"mode": mode, **result, "memory_mb": round(memory / 2**20, 1), "writes_per_s": round(3 * args[0] / elapsed)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark memory of the Roblox lookup caches.")
+    parser.add_argument("--ids", type=int, default=1000000, help="Distinct Roblox user ids (default: 1000000)")
+    parser.add_argument("--bound", type=int, default=50000, help="Bounded cache size per lookup (default: 50000, as in config.json)")
+    args = parser.parse_args()
+
+    print(json.dumps(_measure("dict-of-dicts", _baseline, args.ids)))
+    print(json.dumps(_measure("ttl-cache-unbounded", _ttl_caches, args.ids, args.ids)))
+    print(json.dumps(_measure("ttl-cache-bounded", _ttl_caches, args.ids, args.bound)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare per-member welcome sends with adaptive batching during a join flood.
+
+Sends go through a simulated per-channel rate limit (5 messages / 5 s, like
+Discord's channel message bucket), so the report shows API calls made and how
+long the last member waited for their welcome.
+
+Usage: python benchmarks/welcome_batching_bench.py --joins 300 --rate 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.modules.join_batcher import JoinBatcher
+
+class ChannelBucket:
+    """Allow `limit` sends per `per` seconds; extra sends wait, like a 429 retry would."""
+
+    def __init__(self, limit: int = 5, per: float = 5.0) -> None:
+        self.limit = limit
+        self.per = per
+        self._sent: list = []
+        self._lock = asyncio.Lock()
+        self.calls = 0
+
+    async def send(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._sent = [t for t in self._sent if now - t < self.per]
+            if len(self._sent) >= self.limit:
+                await asyncio.sleep(self.per - (now - self._sent[0]))
+                self._sent.pop(0)
+            self._sent.append(time.monotonic())
+            self.calls += 1
+
+async def _run(batched: bool, joins: int, rate: float, scale: float) -> dict:
+    bucket = ChannelBucket(per=5.0 * scale)
+    latencies: list = []
+
+    async def send_single(joined_at: float) -> None:
+        await bucket.send()
+        latencies.append(time.monotonic() - joined_at)
+
+    async def send_batch(batch: list) -> None:
+        await bucket.send()
+        done = time.monotonic()
+        latencies.extend(done - joined_at for joined_at in batch)
+
+    batcher = JoinBatcher(
+        send_single,
+        send_batch,
+        rate_threshold=2.0 / scale if batched else float("inf"),
+        rate_window=10.0 * scale,
+        window=3.0 * scale,
+        target_latency=5.0 * scale,
+    )
+    started = time.monotonic()
+    tasks = []
+    for i in range(joins):
+        delay = started + i / rate - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(batcher.submit(time.monotonic())))
+    await asyncio.gather(*tasks)
+    await batcher.close()
+
+    latencies.sort()
+    return {
+        "mode": "batched" if batched else "per-member",
+        "joins": joins,
+        "api_calls": bucket.calls,
+        "drain_s": round((time.monotonic() - started) / scale, 2),
+        "latency_p50_s": round(latencies[len(latencies) // 2] / scale, 2),
+        "latency_max_s": round(latencies[-1] / scale, 2),
+        **{k: v for k, v in batcher.stats().items() if k in ("batches", "calls_saved")},
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark welcome batching under a join flood.")
+    parser.add_argument("--joins", type=int, default=300, help="Members joining (default: 300)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Joins per second (default: 100)")
+    parser.add_argument("--scale", type=float, default=0.1, help="Time compression for rate limits/windows (default: 0.1)")
+    args = parser.parse_args()
+    for batched in (False, True):
+        print(json.dumps(asyncio.run(_run(batched, args.joins, args.rate * (1 / args.scale), args.scale))))
+
+if __name__ == "__main__":
+    main()
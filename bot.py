@@ -1,73 +1,188 @@
 import os
+import time
+import asyncio
 import discord
 from discord.ext import commands
-from discord.gateway import DiscordWebSocket
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import Dict, Any, List, Callable, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Mapping, Tuple, Optional
 
 try:
-    from src.modules.load_config import JsonLoader
+    from src.modules.gateway_session import GatewaySessions
+    from src.modules.http_client import HttpClient
+    from src.modules.intents import IntentPlanner, legacy_intents
+    from src.modules.lazy_extensions import LazyExtensions
+    from src.modules.load_config import ConfigService
+    from src.modules.loop_monitor import LoopMonitor
+    from src.modules.member_cache import MemberCache
+    from src.modules.metrics import Metrics, MetricsTree
+    from src.modules.outbound import Outbound
     from src.modules.set_identify import GetIdentify
+    from src.modules.sharding import ShardBus, ShardOrchestrator, WorkerSpec
+    from src.modules.startup import StartupReport, command_tree_hash, read_synced_hash, timed_import, write_synced_hash
+    from src.modules.storage import Storage
+    from src.modules.timers import TimerService
 except ImportError:
-    from modules.load_config import JsonLoader
+    from modules.gateway_session import GatewaySessions
+    from modules.http_client import HttpClient
+    from modules.intents import IntentPlanner, legacy_intents
+    from modules.lazy_extensions import LazyExtensions
+    from modules.load_config import ConfigService
+    from modules.loop_monitor import LoopMonitor
+    from modules.member_cache import MemberCache
+    from modules.metrics import Metrics, MetricsTree
+    from modules.outbound import Outbound
     from modules.set_identify import GetIdentify
+    from modules.sharding import ShardBus, ShardOrchestrator, WorkerSpec
+    from modules.startup import StartupReport, command_tree_hash, read_synced_hash, timed_import, write_synced_hash
+    from modules.storage import Storage
+    from modules.timers import TimerService
 
 class Bot(commands.Bot):
     """Refactored bot class with clearer responsibilities and reduced redundancy."""
 
-    def __init__(self, config: Dict) -> Any:
-        self._is_mobile: bool = True
-        self._jsonloader: JsonLoader = JsonLoader()
-        self._prefix: str = config.get("Prefix") or self._jsonloader.load().get("Prefix")
-        self._config: Dict[str, Any] = config
+    shard_bus: Optional[ShardBus] = None  # set by ShardedBot in a sharded launch
 
-        self._intents: discord.Intents = discord.Intents.default()
-        self._intents.message_content: bool = True
-        self._intents.typing: bool = True
-        self._intents.presences: bool = True
-        self._intents.members: bool = True
+    def __init__(self, config: Mapping[str, Any], **options: Any) -> Any:
+        self._config_service: ConfigService = ConfigService.shared()
+        self._prefix: str = config.get("Prefix") or self._config_service.get("Prefix")
+        self._config: Mapping[str, Any] = config
+        self.storage: Storage = Storage.from_config(config)
+        self.timers: TimerService = TimerService(
+            self.storage,
+            wait_ready=self.wait_until_ready,
+            owner=self.shard_bus.index if self.shard_bus else None,
+            owners=self.shard_bus.workers if self.shard_bus else 1,
+        )
+        self.http_client: HttpClient = HttpClient.from_config(config)
+        self.outbound: Outbound = Outbound.from_config(config)
+        self.metrics: Metrics = Metrics.from_config(config)
+        self.loop_monitor: LoopMonitor = LoopMonitor.from_config(config)
+        self.identify: GetIdentify = GetIdentify.from_config(config)
+        self.gateway_sessions: GatewaySessions = GatewaySessions.from_config(config, self.storage)
+        self.member_cache: MemberCache = MemberCache.from_config(config)
+
+        self.intent_planner: IntentPlanner = IntentPlanner.from_config(config)
+
+        # Narrowed in setup_hook() to what the loaded extensions declare, before the gateway connects
+        self._intents: discord.Intents = legacy_intents()
 
-        super().__init__(command_prefix=self._prefix, intents=self._intents)
+        super().__init__(command_prefix=self._prefix, intents=self._intents, tree_cls=MetricsTree, **options)
+
+        # Every REST call is charged to the command whose task made it
+        self.http.request = self.metrics.timed_request(self.http.request)
+        self.metrics.add_source("outbound", lambda: {key: value for key, value in self.outbound.stats().items() if key != "busiest_routes"})
+        self.metrics.add_source("loop", self.loop_monitor.stats)
+        self.metrics.add_source("gateway", self.gateway_sessions.stats)
+        self.metrics.add_source("intents", self.intent_planner.stats)
+        self.metrics.add_source("member_cache", self.member_cache.stats)
+        self.metrics.add_source("http", lambda: {key: value for key, value in self.http_client.stats().items() if key != "hosts"})
+        self.metrics.add_source("http_host", lambda: self.http_client.stats()["hosts"], label="host")
 
         self.remove_command("help")
-        DiscordWebSocket.identify: Callable[[], Dict[str, Any]] = self._get_identify()
+        self._config_service.subscribe(self._on_config_reload)
+        self.identify.install()
+        GatewaySessions.install()  # RESUME from the last checkpoint after a crash instead of identifying
 
     # ---------- internal helpers ----------
-    def _get_identify(self) -> bool:
-        return (
-            GetIdentify.set_identify_to_mobile
-            if self._is_mobile
-            else GetIdentify.set_identify_to_pc
-        )
+    def _on_config_reload(self, config: Mapping[str, Any]) -> None:
+        """Pick up a hot-reloaded config.json (new prefix applies to the next message)."""
+        self._config = config
+        self._prefix = config.get("Prefix") or self._prefix
+        self.command_prefix = self._prefix
 
     # ---------- public async api ----------
     async def setup_hook(self) -> Any:
+        # Watch the loop from the start, so extension setup that blocks it shows up too
+        self.loop_monitor.start()
         base: Path = Path(__file__).parent
         src: Path = base / "src"
-        await self._load_extensions(src, src / "cogs")
-        await self._load_extensions(src, src / "events")
+        startup: Mapping[str, Any] = self._config.get("Startup") or {}
+        self.startup_report: StartupReport = StartupReport()
 
-        try:
-            synced = await self.tree.sync()
-            print(f"Synced {len(synced)} slash command(s)")
-        except Exception as e:
-            print(f"Failed to sync slash commands: {e}")
+        names: List[str] = self._discover_extensions(src, src / "cogs") + self._discover_extensions(src, src / "events")
+        self.lazy_extensions: Optional[LazyExtensions] = LazyExtensions.from_config(self, self._config, self.startup_report)
+        if self.lazy_extensions is not None:
+            names = self.lazy_extensions.split(names)
 
-    async def _load_extensions(self, base: Path, path: Path) -> Optional[str]:
+        phase_start = time.perf_counter()
+        await self._import_extensions(names, workers=startup.get("ImportWorkers", 8))
+        self.startup_report.phase("import", time.perf_counter() - phase_start)
+
+        phase_start = time.perf_counter()
+        await self._load_extensions(names)
+        if self.lazy_extensions is not None:
+            self.lazy_extensions.install()
+        self.startup_report.phase("setup", time.perf_counter() - phase_start)
+        self._intents = self.intent_planner.apply(self, self.lazy_extensions.deferred() if self.lazy_extensions is not None else None)
+        self.member_cache.install(self)
+
+        # Cogs have registered their timer handlers; re-arm timers persisted before the restart
+        await self.timers.start()
+        await self.metrics.start()
+        self._config_service.start_watching(self._config.get("ConfigReloadInterval", 5.0))
+
+        phase_start = time.perf_counter()
+        await self._sync_tree(startup)
+        self.startup_report.phase("sync", time.perf_counter() - phase_start)
+
+        for line in self.startup_report.summary():
+            print(f"Startup: {line}")
+        print(f"Startup phases (ms): {self.startup_report.phases}")
+        self.startup_report.write(startup.get("ReportPath", "data/startup_report.json"))
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        """Run the command as a timed invocation; the metrics listeners record its outcome."""
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        key = ctx.interaction.id if ctx.interaction else ctx.message.id
+        await self.metrics.track(key, "prefix", super().invoke(ctx))
+
+    async def close(self) -> None:
+        self._config_service.stop_watching()
+        await self.metrics.close()
+        await self.loop_monitor.close()
+        await super().close()
+        await self.gateway_sessions.discard()  # the close above ended the sessions (code 1000)
+        await self.timers.close()
+        await self.http_client.close()
+        await self.storage.close()
+
+    def _discover_extensions(self, base: Path, path: Path) -> List[str]:
         if not path.exists():
             print(f"Directory {path} not found – skipped.")
-            return None
+            return []
+        return [f"{base.name}.{path.name}.{file.stem}" for file in sorted(path.glob("*.py"))]
+
+    async def _import_extensions(self, names: List[str], *, workers: int) -> None:
+        """Import every extension module concurrently in a thread pool (no loop registration yet)."""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ext-import") as pool:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, timed_import, name) for name in names),
+                return_exceptions=True,
+            )
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                self.startup_report.record(name, import_ms=0.0, error=repr(result))
+            else:
+                self.startup_report.record(name, import_ms=round(result * 1000, 2))
 
+    async def _load_extensions(self, names: List[str]) -> None:
+        """Register the (already imported) extensions on the loop, one at a time."""
         loaded: List[str] = []
         failed: List[Tuple[str, Exception]] = []
 
-        for file in path.glob("*.py"):
+        for name in names:
+            started = time.perf_counter()
             try:
-                await self.load_extension(f"{base.name}.{path.name}.{file.stem}")
-                loaded.append(file.stem)
+                await self.load_extension(name)
+                loaded.append(name.rsplit(".", 1)[-1])
             except Exception as exc:
-                failed.append((file.stem, exc))
+                failed.append((name.rsplit(".", 1)[-1], exc))
+                self.startup_report.record(name, error=repr(exc))
+            self.startup_report.record(name, setup_ms=round((time.perf_counter() - started) * 1000, 2))
 
         for name in loaded:
             print(f"Loaded extension: {name}")
@@ -75,14 +190,123 @@ class Bot(commands.Bot):
         for name, exc in failed:
             print(f"Failed to load extension {name}: {exc}")
 
+    async def _sync_tree(self, startup: Mapping[str, Any]) -> None:
+        """Sync slash commands only when the command tree differs from the last synced one."""
+        hash_path: str = startup.get("SyncHashPath", "data/command_tree.sha256")
+        digest: str = command_tree_hash(self.tree, self.application_id)
+        if not startup.get("ForceSync", False) and read_synced_hash(hash_path) == digest:
+            self.startup_report.tree_synced = False
+            print("Slash commands unchanged since last sync – skipped tree.sync().")
+            return
+
+        try:
+            synced = await self.tree.sync()
+            write_synced_hash(hash_path, digest)
+            self.startup_report.tree_synced = True
+            print(f"Synced {len(synced)} slash command(s)")
+        except Exception as e:
+            print(f"Failed to sync slash commands: {e}")
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """One worker of a sharded launch: an AutoShardedBot over the shard range the orchestrator assigned."""
+
+    def __init__(self, config: Mapping[str, Any], bus: ShardBus, **options: Any) -> Any:
+        self.shard_bus = bus
+        self._event_marks: Dict[int, Tuple[int, int, float]] = {}  # shard id -> (last sequence, events, at)
+        super().__init__(config, **options)
+        self._hooks["after_identify"] = self.after_identify_hook  # called by GetIdentify once the payload is sent
+
+    async def setup_hook(self) -> Any:
+        await self.shard_bus.connect()
+        self.shard_bus.subscribe("stop", lambda _: asyncio.create_task(self.close()))
+        self.shard_bus.subscribe("presence", self._apply_presence)
+        self.shard_bus.subscribe("storage", self._apply_storage)
+        self.storage.on_flush(self._broadcast_flush)
+        self.shard_bus.start_reporting(self._shard_stats)
+        await super().setup_hook()
+
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        # The parent spaces identifies per max_concurrency bucket across every worker
+        await self.shard_bus.acquire_identify(shard_id or 0)
+
+    async def after_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        await self.shard_bus.identified(shard_id or 0)
+
+    async def _sync_tree(self, startup: Mapping[str, Any]) -> None:
+        if self.shard_bus.index == 0:  # the command tree is global; one worker syncs it
+            await super()._sync_tree(startup)
+
+    async def change_presence(self, *, activity: Optional[discord.BaseActivity] = None, status: Optional[discord.Status] = None, shard_id: Optional[int] = None, relay: bool = True) -> None:
+        await super().change_presence(activity=activity, status=status, shard_id=shard_id)
+        if relay and shard_id is None:
+            await self.shard_bus.broadcast("presence", {
+                "activity": activity.to_dict() if activity is not None else None,
+                "status": str(status) if status is not None else None,
+            })
+
+    async def _apply_presence(self, data: Mapping[str, Any]) -> None:
+        await self.change_presence(
+            activity=discord.activity.create_activity(data["activity"], self._connection),
+            status=discord.Status(data["status"]) if data["status"] else None,
+            relay=False,
+        )
+
+    def _broadcast_flush(self, keys: List[Tuple[str, str]]) -> None:
+        # Gateway checkpoints belong to this worker's shards; no other worker reads them
+        keys = [key for key in keys if key[0] != "gateway"]
+        if keys:
+            asyncio.create_task(self.shard_bus.broadcast("storage", keys))
+
+    def _apply_storage(self, keys: List[List[str]]) -> None:
+        for namespace, key in keys:
+            self.storage.invalidate(namespace, key)
+
+    def _shard_stats(self) -> Dict[str, Any]:
+        """Per-shard heartbeat latency, guilds and events/s since the last report."""
+        now = time.monotonic()
+        guilds = {}
+        for guild in self.guilds:
+            guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+        shards = {}
+        for shard_id, info in self.shards.items():
+            # Dispatch events carry a per-session sequence number, so its growth is the event count
+            sequence = info._parent.ws.sequence or 0
+            last, total, at = self._event_marks.get(shard_id, (0, 0, now))
+            delta = sequence - last if sequence >= last else sequence  # a new session restarts at 1
+            total += delta
+            self._event_marks[shard_id] = (sequence, total, now)
+            latency = info.latency
+            shards[str(shard_id)] = {
+                "latency_ms": round(latency * 1000, 1) if latency == latency and latency != float("inf") else None,
+                "events": total,
+                "events_per_s": round(delta / (now - at), 1) if now > at else 0.0,
+                "guilds": guilds.get(shard_id, 0),
+                "closed": info.is_closed(),
+            }
+        return {"shards": shards, "loop_lag_p99_ms": self.loop_monitor.stats()["lag_p99_ms"]}
+
+    async def close(self) -> None:
+        await super().close()
+        await self.shard_bus.close()
+
+def run_shard_worker(spec: WorkerSpec) -> None:
+    """Entry point of one worker process in a sharded launch."""
+    if spec.initializer is not None:
+        spec.initializer(*spec.initargs)
+    config = dict(spec.config)
+    metrics = config.get("Metrics") or {}
+    if metrics.get("Port"):
+        config["Metrics"] = {**metrics, "Port": metrics["Port"] + spec.index}  # one endpoint per worker
+    bot = ShardedBot(config, ShardBus(spec), shard_ids=list(spec.shard_ids), shard_count=spec.shard_count)
+    bot.run(spec.token)
+
 class Launcher:
     """Handles environment setup and bot startup."""
 
     def __init__(self) -> Any:
         load_dotenv()
         
-        self._jsonloader: JsonLoader = JsonLoader()
-        self._config: Dict[str, Any] = self._jsonloader.load()
+        self._config: Mapping[str, Any] = ConfigService.shared().snapshot
         self._token: str | None = os.getenv("TOKEN")
 
     def _validate_token(self) -> bool:
@@ -91,6 +315,9 @@ class Launcher:
         return self._token
 
     def run(self) -> Any:
+        if (self._config.get("Sharding") or {}).get("Enabled", False):
+            ShardOrchestrator.from_config(self._config, self._validate_token(), run_shard_worker).run()
+            return
         bot: Bot = Bot(self._config)
         try:
             bot.run(self._validate_token())
@@ -3,12 +3,12 @@ import pytz
 import discord
 from discord.ext import commands
 from datetime import datetime
-from src.modules.load_config import JsonLoader
+from src.modules.load_config import ConfigService
 
 class BotInfoSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.config = JsonLoader("config.json").load()
+        self.config = ConfigService.shared()
         self.est_tz = pytz.timezone('US/Eastern')
 
     def _get_system_stats(self) -> dict:
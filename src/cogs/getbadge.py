@@ -1,3 +1,4 @@
+import asyncio
 from discord.ext import commands
 
 class Getbadge(commands.Cog):
@@ -11,8 +12,8 @@ class Getbadge(commands.Cog):
             "To get the Active Developer Badge, follow this link:",
             "https://discord.com/developers/active-developer"
         ]
-        for msg in messages:
-            await ctx.send(msg)
+        # Queued together, so the dispatcher delivers them as one message
+        await asyncio.gather(*(self.bot.outbound.send(ctx, msg) for msg in messages))
         
 async def setup(bot: commands.Bot):
     await bot.add_cog(Getbadge(bot))
\ No newline at end of file
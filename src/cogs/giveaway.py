@@ -1,13 +1,14 @@
-import asyncio
 import random
 import re
+import time
 import discord
 from discord.ext import commands
 
 class Giveaway(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.active_giveaways = {}
+        self.active_giveaways = bot.storage.namespace("giveaways")  # message id -> giveaway info, persisted
+        self.bot.timers.register("giveaway", self._end_giveaway)
 
     @commands.command(name="giveaway", aliases=["gw"], help="Start a giveaway. Duration format: 1d, 2h, 30m (days/hours/minutes).")
     @commands.has_permissions(manage_messages=True)
@@ -52,47 +53,61 @@ class Giveaway(commands.Cog):
         embed.set_footer(text=f"Hosted by {ctx.author.name}")
         
         # Send embed and add reaction
-        message = await ctx.send(embed=embed)
-        await message.add_reaction("🎉")
+        message = await self.bot.outbound.send(ctx, embed=embed, coalesce=False)
+        await self.bot.outbound.react(message, ["🎉"])
         
         # Store giveaway info
-        self.active_giveaways[message.id] = {
+        await self.active_giveaways.set(message.id, {
             "prize": prize,
             "host": ctx.author.id,
-            "end_time": asyncio.get_event_loop().time() + seconds
-        }
-        
-        # Wait for specified time
-        await asyncio.sleep(seconds)
+            "channel_id": ctx.channel.id,
+            "end_time": time.time() + seconds
+        })
         
+        # The bot's timer service ends the giveaway, even across restarts
+        await self.bot.timers.schedule(
+            "giveaway", seconds, {"message_id": message.id}, timer_id=f"giveaway:{message.id}"
+        )
+
+    async def _end_giveaway(self, data: dict) -> None:
+        """Timer handler: draw a winner for a finished giveaway."""
+        await self._finish(data["message_id"])
+
+    async def _finish(self, message_id: int) -> None:
+        info = await self.active_giveaways.get(message_id)
+        if info is None:
+            return
+        channel = self.bot.get_channel(info["channel_id"])
+        if channel is None:
+            await self.active_giveaways.delete(message_id)
+            return
+        prize = info["prize"]
+
         # Fetch message to get updated reactions
         try:
-            message = await ctx.channel.fetch_message(message.id)
+            message = await channel.fetch_message(message_id)
         except discord.NotFound:
             # Message was deleted, cleanup
-            if message.id in self.active_giveaways:
-                del self.active_giveaways[message.id]
+            await self.active_giveaways.delete(message_id)
             return
         
         # Get list of users who reacted (excluding bot)
-        users = [user async for user in message.reactions[0].users() if not user.bot]
+        users = [user async for user in message.reactions[0].users() if not user.bot] if message.reactions else []
         
         if len(users) == 0:
-            await ctx.send("No one entered the giveaway 😔")
+            await channel.send("No one entered the giveaway 😔")
             # Remove from active giveaways
-            if message.id in self.active_giveaways:
-                del self.active_giveaways[message.id]
+            await self.active_giveaways.delete(message_id)
             return
             
         # Select winner
         winner = random.choice(users)
         
         # Send winner announcement
-        await ctx.send(f"🎉 Congratulations {winner.mention}! You won: **{prize}**!")
+        await channel.send(f"🎉 Congratulations {winner.mention}! You won: **{prize}**!")
         
         # Remove from active giveaways
-        if message.id in self.active_giveaways:
-            del self.active_giveaways[message.id]
+        await self.active_giveaways.delete(message_id)
 
     @commands.command(name="giveawayreroll", aliases=["reroll"], help="Reroll a giveaway winner by message ID.")
     @commands.has_permissions(manage_messages=True)
@@ -135,14 +150,14 @@ class Giveaway(commands.Cog):
             return
         
         # Check if it's an active giveaway
-        if message_id not in self.active_giveaways:
+        if not await self.active_giveaways.contains(message_id):
             await ctx.send("This giveaway is not active or has already ended!")
             return
         
-        # Remove from active giveaways to trigger early end
-        del self.active_giveaways[message_id]
-        
+        # Cancel the pending timer and draw the winner now
+        await self.bot.timers.cancel(f"giveaway:{message_id}")
         await ctx.send("Giveaway ended early!")
+        await self._finish(message_id)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Giveaway(bot))
\ No newline at end of file
@@ -5,7 +5,7 @@ from discord import app_commands
 from typing import Dict, List, Optional
 
 try:
-    from src.modules.load_config import JsonLoader
+    from src.modules.load_config import ConfigService
 except ImportError:
     raise
 
@@ -27,8 +27,11 @@ _CMD = {
     "joke": ("Fetches a random meme.", "fun"),
     "kick": ("Kicks a member from the server.", "moderation"),
     "lockdown": ("Locks/unlocks the channel so that no one/everyone can send messages.", "moderation"),
+    "loophealth": ("Shows event-loop lag and the code paths that blocked it.", "owner"),
+    "membercache": ("Shows the member cache's memory per guild against its budget.", "owner"),
     "membercount": ("Displays the number of members in the server.", "utility"),
     "meme": ("Fetches a random meme.", "fun"),
+    "metrics": ("Shows per-command latency, error and Discord-wait metrics.", "owner"),
     "modmail": ("Send/reply to a message to/from the moderators via DM.", "admin"),
     "note": ("Adds a personal note.", "utility"),
     "notes": ("Displays your personal notes.", "utility"),
@@ -36,11 +39,17 @@ _CMD = {
     "purge": ("Purges a specified number of messages from the channel.", "moderation"),
     "replymodmail": ("Reply to a message sent to the moderators via DM.", "moderation"),
     "rblxfollowercount": ("Fetches the Roblox follower count for a given user ID.", "utility"),
+    "rblxfollowersbulk": ("Fetches the Roblox follower counts for several user IDs at once.", "utility"),
+    "rblxgrowth": ("Shows follower growth for a watched Roblox user over a range (e.g. 24h, 7d, 30d).", "utility"),
+    "rblxunwatch": ("Removes a Roblox user ID from the follower-count watchlist.", "admin"),
+    "rblxwatch": ("Adds Roblox user IDs to the follower-count watchlist.", "admin"),
+    "rblxwatchlist": ("Lists watched Roblox users with their 24h follower change.", "utility"),
     "roll": ("Rolls a die with a specified number of sides.", "fun"),
     "rps": ("Play a game of rock-paper-scissors. Choices: rock, paper, scissors.", "fun"),
     "say": ("Make the bot say something in the specified channel.", "admin"),
     "serverinfo": ("Displays information about the server.", "utility"),
     "setstatus": ("Sets the bot's status message.", "owner"),
+    "shards": ("Shows every shard's latency and event rate in a sharded launch.", "owner"),
     "shutdown": ("Shuts down the bot. (Owner only)", "owner"),
     "slowmode": ("Sets slowmode for the channel in seconds, minutes, or hours.", "moderation"),
     "tempRole": ("Assigns a temporary role to a user for a specified duration (e.g., 10m, 1h).", "admin"),
@@ -157,8 +166,8 @@ class HelpCog(commands.Cog):
     # ------------------------------------------------------------------
     @staticmethod
     def _get_prefix() -> str:
-        """Load prefix from config once per invocation."""
-        return JsonLoader().load()["Prefix"]
+        """Read the prefix from the shared in-memory config snapshot (hot-reloaded on change)."""
+        return ConfigService.shared()["Prefix"]
 
     @staticmethod
     def _chunk_items(items: List[tuple], chunk_size: int = 5) -> List[List[tuple]]:
@@ -2,7 +2,7 @@ import random
 from discord.ext import commands
 
 try:
-    from src.modules.load_config import JsonLoader
+    from src.modules.load_config import ConfigService
 except ImportError:
     # fallback or re-raise as needed
     raise
@@ -10,9 +10,15 @@ except ImportError:
 class Joke(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.jsonloader = JsonLoader()
-        self.config = self.jsonloader.load()
+        self.config = ConfigService.shared()
         self.jokes = self.config["jokes"]
+        self._unsubscribe = self.config.subscribe(self._on_config_reload)
+
+    def _on_config_reload(self, config) -> None:
+        self.jokes = config["jokes"]
+
+    async def cog_unload(self) -> None:
+        self._unsubscribe()
 
     @commands.command(name="joke", help="Sends a random joke.")
     async def joke(self, ctx: commands.Context):
@@ -1,35 +1,55 @@
-import aiohttp
+import asyncio
 import os
+import aiohttp
 import discord
 from discord.ext import commands
+from typing import List
+
+try:
+    from src.modules.tenor_cache import TenorCache
+except ImportError:
+    from modules.tenor_cache import TenorCache
 
 class Meme(commands.Cog):
+    TENOR_SEARCH_API = "https://g.tenor.com/v1/search"
+    PAGE_SIZE = 20
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.tenor_key = os.getenv("TENOR_KEY")  # Replace with your actual Tenor API key
-    
+        self.gifs = TenorCache.from_config(bot._config, self._fetch_page)
+
+    async def cog_load(self):
+        # In a sharded launch one worker keeps popular pages warm, the way TimerService stamps one owner
+        if self.bot.shard_bus is None or self.bot.shard_bus.index == 0:
+            self.gifs.start()
+
+    async def cog_unload(self):
+        await self.gifs.close()
+
+    async def _fetch_page(self, search: str) -> List[str]:
+        """Fetch one page of Tenor results and keep only the GIF URLs."""
+        params = {"q": search, "key": self.tenor_key or "", "limit": self.PAGE_SIZE}
+        async with self.bot.http_client.get(self.TENOR_SEARCH_API, params=params) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return [gif["media"][0]["gif"]["url"] for gif in data.get("results", []) if gif.get("media")]
+
     @commands.command(name="meme", help="Fetch a GIF from Tenor based on search query.")
     async def meme(self, ctx: commands.Context, *, search: str = "random"):
         """Fetch a GIF from Tenor based on search query."""
-        limit = 20
-        url = f"https://g.tenor.com/v1/search?q={search}&key={self.tenor_key}&limit={limit}"
+        try:
+            gif_url = await self.gifs.next_gif(search)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return await ctx.send("Could not fetch GIF at the moment.")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return await ctx.send("Could not fetch GIF at the moment.")
-                data = await resp.json()
-
-        if not data["results"]:
+        if gif_url is None:
             return await ctx.send("No GIFs found for that search term.")
 
-        gif = data["results"][0]
-        gif_url = gif["media"][0]["gif"]["url"]
-
         embed = discord.Embed(title=f"GIF for: {search}", color=discord.Color.purple())
         embed.set_image(url=gif_url)
         embed.set_footer(text="Powered by Tenor")
         await ctx.send(embed=embed)
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Meme(bot))
\ No newline at end of file
+    await bot.add_cog(Meme(bot))
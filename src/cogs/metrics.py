@@ -0,0 +1,181 @@
+import asyncio
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import Optional
+
+class BotMetrics(commands.Cog):
+    """Files every command invocation with `bot.metrics` and shows the numbers (and loop health) to the owner."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.metrics = bot.metrics
+
+    @staticmethod
+    def _key(ctx: commands.Context) -> int:
+        return ctx.interaction.id if ctx.interaction else ctx.message.id
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx: commands.Context):
+        self.metrics.finish(self._key(ctx), ctx.command.qualified_name)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
+        if ctx.command is None:
+            self.metrics.unknown_commands += 1
+            return
+        self.metrics.finish(self._key(ctx), ctx.command.qualified_name, getattr(error, "original", error))
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command: app_commands.Command):
+        self.metrics.finish(interaction.id, command.qualified_name)
+
+    @commands.command(name="metrics", help="Shows per-command latency, error and Discord-wait metrics.", aliases=["cmdstats"])
+    @commands.is_owner()
+    async def metrics_command(self, ctx: commands.Context, command: Optional[str] = None):
+        rows = self.metrics.summary()
+        if command is not None:
+            rows = [row for row in rows if row["command"] == command]
+            if not rows:
+                await ctx.send(f"No metrics recorded for `{command}` yet.")
+                return
+            embed = discord.Embed(title=f"Metrics: {command}", color=discord.Color.blue())
+            for row in rows:
+                latency = row["latency"]
+                embed.add_field(
+                    name=row["kind"],
+                    value=(
+                        f"**Calls:** {row['calls']} ({row['errors']} failed)\n"
+                        f"**p50/p90/p99/p99.9:** {latency['p50_ms']} / {latency['p90_ms']} / {latency['p99_ms']} / {latency['p999_ms']} ms\n"
+                        f"**Max:** {latency['max_ms']} ms\n"
+                        f"**Waiting on Discord:** {row['discord_wait_ms']} ms total\n"
+                        f"**CPU:** {row['cpu_ms']} ms total\n"
+                        f"**Errors:** {', '.join(f'{name} ×{n}' for name, n in row['error_types'].items()) or 'none'}"
+                    ),
+                    inline=False,
+                )
+            await ctx.send(embed=embed)
+            return
+
+        if not rows:
+            await ctx.send("No commands have run yet.")
+            return
+        lines = ["command              calls  err    p50    p99  discord%"]
+        for row in rows[:20]:
+            total_ms = row["latency"]["mean_ms"] * row["calls"] if row["latency"]["mean_ms"] else 0
+            share = f"{row['discord_wait_ms'] / total_ms * 100:.0f}%" if total_ms else "-"
+            lines.append(
+                f"{(row['command'] + ('/' if row['kind'] == 'slash' else ''))[:20]:<20} {row['calls']:>5} {row['errors']:>4} "
+                f"{row['latency']['p50_ms']:>6} {row['latency']['p99_ms']:>6} {share:>9}"
+            )
+        embed = discord.Embed(title="Command Metrics", description="```\n" + "\n".join(lines) + "\n```", color=discord.Color.blue())
+        hosts = sorted(self.bot.http_client.stats()["hosts"].items(), key=lambda item: item[1]["requests"], reverse=True)
+        if hosts:
+            http_lines = ["host                  reqs    p99  peak  pool waits"]
+            for host, row in hosts[:10]:
+                http_lines.append(
+                    f"{host[:20]:<20} {row['requests']:>5} {row['latency']['p99_ms'] or '-':>6} {row['max_in_flight']:>5} "
+                    f"{row['pool_waits']:>4} ({row['pool_wait_ms']:.0f} ms)"
+                )
+            embed.add_field(name="Outbound HTTP", value="```\n" + "\n".join(http_lines)[:1000] + "\n```", inline=False)
+        welcome = self.bot.get_cog("OnMemberJoinedAndRemoved")
+        if welcome is not None and welcome.welcome_batchers:
+            batching = welcome.batcher_stats()
+            embed.add_field(
+                name="Welcome cards",
+                value=f"{batching['items']} joins in {batching['guilds']} guild(s) · {batching['api_calls']} API calls ({batching['calls_saved']} saved by digests)",
+                inline=False,
+            )
+        endpoint = f"http://{self.metrics.host}:{self.metrics.port}/metrics" if self.metrics.port else "disabled"
+        embed.set_footer(text=f"Latency in ms · {self.metrics.in_flight} in flight · {self.metrics.unknown_commands} unknown · Prometheus: {endpoint}")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="loophealth", help="Shows event-loop lag and the code paths that blocked it.", aliases=["looplag"])
+    @commands.is_owner()
+    async def loophealth(self, ctx: commands.Context, minutes: Optional[float] = None):
+        monitor = self.bot.loop_monitor
+        if not monitor.enabled:
+            await ctx.send("The loop monitor is disabled (`LoopMonitor.Enabled` in config.json).")
+            return
+        report = monitor.report(minutes, top=8)
+        lag = report["lag"]
+        embed = discord.Embed(
+            title="Event Loop Health",
+            description=(
+                f"**Lag p50/p99/p99.9:** {lag['p50_ms']} / {lag['p99_ms']} / {lag['p999_ms']} ms (max {lag['max_ms']} ms)\n"
+                f"**Stalls over {monitor.threshold * 1000:.0f} ms:** {report['stalls']} ({report['blocked_ms']} ms blocked)\n"
+                f"**Window:** last {report['span_s'] / 60:.1f} min, {lag['count']} ticks"
+            ),
+            color=discord.Color.green() if not report["stalls"] else discord.Color.orange(),
+        )
+        if report["hot_paths"]:
+            lines = [f"{'n':>4} {'total':>8} {'max':>7}  site"]
+            for path in report["hot_paths"]:
+                lines.append(f"{path['count']:>4} {path['blocked_ms']:>8.0f} {path['max_ms']:>7.0f}  {path['site'][-60:]}")
+            embed.add_field(name="Hot paths (ms)", value="```\n" + "\n".join(lines)[:1000] + "\n```", inline=False)
+            worst = report["hot_paths"][0]
+            if worst["stack"]:
+                stack = "\n".join(worst["stack"][-8:])
+                embed.add_field(name=f"Worst stack · {worst['task'] or 'callback'}"[:256], value="```\n" + stack[-1000:] + "\n```", inline=False)
+        embed.set_footer(text=f"{monitor.unsampled} stall(s) too short to sample · Lifetime: {monitor.stalls} stalls, {monitor.blocked:.1f} s blocked")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="membercache", help="Shows the member cache's memory per guild against its budget.", aliases=["memcache"])
+    @commands.is_owner()
+    async def membercache(self, ctx: commands.Context):
+        cache = self.bot.member_cache
+        rows = cache.report(self.bot.guilds)
+        stats = cache.stats()
+        lines = ["guild                  cached   members      KiB"]
+        for row in rows[:20]:
+            name = ("* " if row["opted_in"] else "") + row["name"]
+            lines.append(f"{name[:20]:<20} {row['cached']:>8} {row['member_count']:>9} {row['bytes'] / 1024:>8.0f}")
+        total = sum(row["bytes"] for row in rows)
+        if not cache.enabled:
+            summary = f"**Budget:** off, every member is kept ({total / 1024 / 1024:.1f} MiB)"
+        else:
+            summary = (
+                f"**Budget:** {stats['bytes'] / 1024 / 1024:.1f} / {cache.budget / 1024 / 1024:.0f} MiB "
+                f"({stats['pinned']} pinned, {stats['lru']} in the LRU)\n"
+                f"**Lookups:** {stats['hits']} hits, {stats['misses']} misses · {stats['fetches']} chunk requests, "
+                f"{stats['rest_fetches']} REST · {stats['evictions']} evicted"
+            )
+        embed = discord.Embed(
+            title="Member Cache",
+            description=summary + "\n```\n" + "\n".join(lines)[:3500] + "\n```",
+            color=discord.Color.blue(),
+        )
+        embed.set_footer(text=f"* opted in (MemberCache.Guilds) · {len(rows)} guild(s) · sizes are estimates")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="shards", help="Shows every shard's latency and event rate in a sharded launch.")
+    @commands.is_owner()
+    async def shards(self, ctx: commands.Context):
+        if self.bot.shard_bus is None:
+            await ctx.send(f"Not running sharded (single process, gateway latency {self.bot.latency * 1000:.0f} ms).")
+            return
+        try:
+            status = await asyncio.wait_for(self.bot.shard_bus.cluster_status(), 5.0)
+        except (ConnectionError, asyncio.TimeoutError):
+            await ctx.send("❌ The shard orchestrator is not answering.")
+            return
+        lines = ["shard wrk  latency  events/s  guilds"]
+        for shard_id, shard in list(status["shards"].items())[:40]:
+            latency = f"{shard['latency_ms']:.0f}" if shard["latency_ms"] is not None else "-"
+            lines.append(f"{shard_id:>5} {shard['worker']:>3} {latency:>8} {shard['events_per_s']:>9} {shard['guilds']:>7}")
+        workers = "\n".join(
+            f"**#{worker['index']}** shards {worker['shards']} · pid {worker['pid']} · "
+            f"{'up' if worker['alive'] else 'down'} · {worker['restarts']} restart(s) · loop p99 {worker['loop_lag_p99_ms']} ms"
+            for worker in status["workers"]
+        )
+        embed = discord.Embed(
+            title=f"Shards ({status['shard_count']}, max_concurrency {status['max_concurrency']})",
+            description="```\n" + "\n".join(lines)[:3900] + "\n```",
+            color=discord.Color.blue(),
+        )
+        embed.add_field(name="Workers", value=workers[:1024] or "none", inline=False)
+        embed.set_footer(text=f"This is worker {self.bot.shard_bus.index} · {status['identifies']} identifies · {status['relayed']} relayed events")
+        await ctx.send(embed=embed)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(BotMetrics(bot))
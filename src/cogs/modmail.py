@@ -1,13 +1,16 @@
 import discord
 from discord.ext import commands
-from src.modules.load_config import JsonLoader
+from src.modules.load_config import ConfigService
 
 class ModMail(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.jsonloader = JsonLoader()
-        self.config = self.jsonloader.load()
-        self.mod_channel_id = self.config["ModChannelID"]  # Channel ID where moderators will receive messages
+        self.config = ConfigService.shared()
+
+    @property
+    def mod_channel_id(self) -> int:
+        """Channel ID where moderators will receive messages (follows config hot-reloads)."""
+        return self.config["ModChannelID"]
 
     @commands.command(name="modmail", help="Send a message to the moderators via DM.")
     async def modmail(self, ctx: commands.Context, *, message: str):
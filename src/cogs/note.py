@@ -4,14 +4,14 @@ from discord.ext import commands
 class NoteCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.notes = {}
+        self.notes = bot.storage.namespace("notes")  # user id -> list of notes, persisted
 
     @commands.command(name="note", help="Adds a personal note.")
     async def note(self, ctx: commands.Context, *, content: str):
         """Adds a personal note."""
-        if ctx.author.id not in self.notes:
-            self.notes[ctx.author.id] = []
-        self.notes[ctx.author.id].append(content)
+        user_notes = await self.notes.get(ctx.author.id, [])
+        user_notes.append(content)
+        await self.notes.set(ctx.author.id, user_notes)
         embed = discord.Embed(
             title="Note Added",
             description=f"**{content}**",
@@ -22,7 +22,8 @@ class NoteCog(commands.Cog):
     @commands.command(name="notes", help="Displays your personal notes.")
     async def notes(self, ctx: commands.Context):
         """Displays your personal notes."""
-        if ctx.author.id not in self.notes or not self.notes[ctx.author.id]:
+        user_notes = await self.notes.get(ctx.author.id, [])
+        if not user_notes:
             embed = discord.Embed(
                 title="Your Notes",
                 description="You have no notes.",
@@ -30,7 +31,6 @@ class NoteCog(commands.Cog):
             )
             await ctx.send(embed=embed)
         else:
-            user_notes = self.notes[ctx.author.id]
             notes_list = "\n".join(f"{idx + 1}. {note}" for idx, note in enumerate(user_notes))
             embed = discord.Embed(
                 title="Your Notes",
@@ -42,7 +42,7 @@ class NoteCog(commands.Cog):
     @commands.command(name="clearnotes", help="Clears all your personal notes.")
     async def clearnotes(self, ctx: commands.Context):
         """Clears all your personal notes."""
-        self.notes[ctx.author.id] = []
+        await self.notes.delete(ctx.author.id)
         embed = discord.Embed(
             title="Notes Cleared",
             description="All your notes have been cleared.",
@@ -1,9 +1,42 @@
 import asyncio
+import re
 import time
+from collections import deque
 import aiohttp
 import discord
 from discord.ext import commands
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from src.modules.circuit_breaker import CircuitBreaker
+    from src.modules.follower_series import FollowerSeries
+    from src.modules.micro_batcher import MicroBatcher
+    from src.modules.single_flight import SingleFlight
+    from src.modules.ttl_cache import TTLCache
+except ImportError:
+    from modules.circuit_breaker import CircuitBreaker
+    from modules.follower_series import FollowerSeries
+    from modules.micro_batcher import MicroBatcher
+    from modules.single_flight import SingleFlight
+    from modules.ttl_cache import TTLCache
+
+SPARK = "▁▂▃▄▅▆▇█"
+RANGE_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+def parse_range(text: str) -> Optional[int]:
+    """`30m`, `12h`, `7d` -> seconds; None if the format is wrong."""
+    match = re.fullmatch(r"(\d+)([dhm])", text.lower())
+    return int(match.group(1)) * RANGE_UNITS[match.group(2)] if match else None
+
+def format_change(delta: Dict[str, Any]) -> str:
+    percent = f" ({delta['percent']:+.2f}%)" if delta["percent"] is not None else ""
+    return f"{delta['change']:+,}{percent}"
+
+def sparkline(values: List[int]) -> str:
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK[0] * len(values)
+    return "".join(SPARK[(v - low) * (len(SPARK) - 1) // (high - low)] for v in values)
 
 class RobloxFollowers(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -11,88 +44,192 @@ class RobloxFollowers(commands.Cog):
         self.roproxy_followers_count_api = "https://friends.roproxy.com/v1/users/{}/followers/count"
         self.roproxy_user_api = "https://users.roproxy.com/v1/users/{}"
         self.roproxy_avatar_api = "https://thumbnails.roproxy.com/v1/users/avatar?userIds={}&size=150x150&format=Png&isCircular=false"
+        self.roproxy_users_batch_api = "https://users.roproxy.com/v1/users"
         self.roblox_followers_count_api = "https://friends.roblox.com/v1/users/{}/followers/count"
         self.roblox_user_api = "https://users.roblox.com/v1/users/{}"
         self.roblox_avatar_api = "https://thumbnails.roblox.com/v1/users/avatar?userIds={}&size=150x150&format=Png&isCircular=false"
-        self.timeout = aiohttp.ClientTimeout(total=10)
-        self.session = aiohttp.ClientSession(timeout=self.timeout)
-        self.cache = {}
+        self.roblox_users_batch_api = "https://users.roblox.com/v1/users"
+        section = bot._config.get("RobloxCache")
+        resilience = bot._config.get("RobloxResilience") or {}
+        stale_ttl = resilience.get("StaleTtl", 600.0)
+        # Bounded per-lookup caches keyed by the Roblox user id; expired entries stay servable for stale_ttl
+        self.counts = TTLCache.from_config(section, ttl=60, stale_ttl=stale_ttl)
+        self.avatars = TTLCache.from_config(section, ttl=300, stale_ttl=stale_ttl)
+        self.usernames = TTLCache.from_config(section, ttl=300, stale_ttl=stale_ttl)
+        # One breaker per upstream; an open one is skipped instead of waited on
+        self.breakers = {name: CircuitBreaker.from_config(name, resilience) for name in ("roproxy", "roblox")}
+        self.request_timeout = aiohttp.ClientTimeout(total=resilience.get("RequestTimeout", 3.0))
+        self._refreshes: set = set()
+        # Concurrent misses for the same (lookup, user id) share one upstream request
+        self.flights = SingleFlight()
+        # Avatar and username lookups arriving within a few ms share one batched request
+        batching = bot._config.get("RobloxBatching") or {}
+        window, max_batch = batching.get("Window", 0.005), batching.get("MaxBatch", 100)
+        self.max_ids_per_command = batching.get("MaxIdsPerCommand", 10)
+        self.avatar_batcher = MicroBatcher(self._fetch_avatar_urls, window=window, max_batch=max_batch)
+        self.username_batcher = MicroBatcher(self._fetch_usernames, window=window, max_batch=max_batch)
+        # Watched users are polled in the background and answered from their local history
+        watchlist = bot._config.get("RobloxWatchlist") or {}
+        self.poll_interval = watchlist.get("PollInterval", 300)
+        self.poll_batch = watchlist.get("BatchSize", 10)
+        self.poll_rate = watchlist.get("RequestsPerSecond", 5)
+        self.max_watched = watchlist.get("MaxWatched", 200)
+        self.series = FollowerSeries.from_config(bot._config)
+        self.watchlist = bot.storage.namespace("rblx_watchlist")  # user id -> {"added_by", "added_at"}
+        self.watched: set = set()
+        self._poller: Optional[asyncio.Task] = None
+        self.polls = 0
+
+    async def cog_load(self):
+        for cache in (self.counts, self.avatars, self.usernames):
+            cache.start()
+        await self.series.load()
+        self.watched = {int(user_id) for user_id, _ in await self.watchlist.items()}
+        self._poller = asyncio.create_task(self._poll_loop())
 
     async def cog_unload(self):
-        await self.session.close()
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        for cache in (self.counts, self.avatars, self.usernames):
+            cache.close()
+        await self.avatar_batcher.close()
+        await self.username_batcher.close()
+        for task in list(self._refreshes):
+            task.cancel()
+        await self.series.close()
 
-    async def _fetch_json(self, url: str, retries: int = 3) -> Optional[dict]:
-        for attempt in range(retries):
+    async def _poll_loop(self):
+        # In a sharded launch only worker 0 polls Roblox; the others re-read the shared history it writes
+        polling = self.bot.shard_bus is None or self.bot.shard_bus.index == 0
+        while True:
+            started = time.monotonic()
             try:
-                async with self.session.get(url) as response:
+                # Other workers' rblxwatch/rblxunwatch reach us as storage invalidations
+                self.watched = {int(user_id) for user_id, _ in await self.watchlist.items()}
+                if polling:
+                    await self.poll(sorted(self.watched))
+                else:
+                    await self.series.flush()  # points from this worker's own lookups, before the reload drops them from memory
+                    await self.series.load()
+            except Exception as e:
+                print(f"Watchlist poll failed: {e}")
+            await asyncio.sleep(max(self.poll_interval - (time.monotonic() - started), 1.0))
+
+    async def poll(self, user_ids: List[int], attempts: int = 3):
+        """Refresh watched counts in batches paced to `poll_rate` requests per second.
+
+        Before each batch the poller waits out any open circuit, so a 429's
+        Retry-After or an outage pauses polling instead of burning requests;
+        ids that failed while a circuit was open go back on the queue.
+        """
+        queue = deque((user_id, attempts) for user_id in user_ids)
+        while queue:
+            wait = min(breaker.retry_in() for breaker in self.breakers.values())
+            if wait > 0:
+                await asyncio.sleep(wait)
+            batch = [queue.popleft() for _ in range(min(self.poll_batch, len(queue)))]
+            started = time.monotonic()
+            counts = await asyncio.gather(*(self.flights.do(("count", user_id), lambda user_id=user_id: self._load_follower_count(user_id)) for user_id, _ in batch))
+            tripped = any(breaker.state != "closed" for breaker in self.breakers.values())
+            for (user_id, left), count in zip(batch, counts):
+                if count is None and tripped and left > 1:
+                    queue.append((user_id, left - 1))
+            await self.series.flush()
+            await asyncio.sleep(max(len(batch) / self.poll_rate - (time.monotonic() - started), 0))
+        self.polls += 1
+
+    async def _fetch_json(self, roproxy_url: str, roblox_url: str, *, json_body: Optional[dict] = None) -> Optional[dict]:
+        """Try roproxy then roblox.com once each, skipping any upstream whose circuit is open."""
+        for upstream, url in (("roproxy", roproxy_url), ("roblox", roblox_url)):
+            breaker = self.breakers[upstream]
+            if not breaker.allow():
+                continue
+            try:
+                client = self.bot.http_client
+                request = client.get(url, timeout=self.request_timeout) if json_body is None else client.post(url, json=json_body, timeout=self.request_timeout)
+                async with request as response:
                     if response.status == 429:
                         retry_after = response.headers.get("Retry-After")
-                        delay = float(retry_after) if retry_after else 1.0 * (2 ** attempt)
-                        await asyncio.sleep(delay)
+                        breaker.record_failure(float(retry_after) if retry_after else None)
+                        continue
+                    if response.status >= 500:
+                        breaker.record_failure()
                         continue
+                    breaker.record_success()
                     if 200 <= response.status < 300:
                         return await response.json()
-                    if 500 <= response.status < 600:
-                        await asyncio.sleep(1.0 * (2 ** attempt))
-                        continue
-                    return None
+                    return None  # e.g. unknown user; the fallback host would answer the same
             except (aiohttp.ClientError, asyncio.TimeoutError):
-                await asyncio.sleep(1.0 * (2 ** attempt))
+                breaker.record_failure()
             except Exception as e:
+                breaker.record_failure()
                 print(f"Request failure: {e}")
-                return None
         return None
 
+    async def _cached(self, cache: TTLCache, kind: str, user_id: int, loader: Callable[[int], Awaitable]):
+        """Serve fresh or stale cache entries immediately; stale ones are refreshed in the background."""
+        value, fresh = cache.peek(user_id)
+        if value is None:
+            return await self.flights.do((kind, user_id), lambda: loader(user_id))
+        if not fresh:
+            task = asyncio.create_task(self.flights.do((kind, user_id), lambda: loader(user_id)))
+            self._refreshes.add(task)
+            task.add_done_callback(self._refreshes.discard)
+        return value
+
     async def get_follower_count(self, user_id: int) -> Optional[int]:
-        cache_key = f"count:{user_id}"
-        cached = self.cache.get(cache_key)
-        if cached and time.monotonic() - cached.get("ts", 0) < 60:
-            return cached.get("value")
-        data = await self._fetch_json(self.roproxy_followers_count_api.format(user_id))
-        if not data:
-            data = await self._fetch_json(self.roblox_followers_count_api.format(user_id))
+        if user_id in self.watched:
+            latest = self.series.latest(user_id)
+            if latest is not None and time.time() - latest[0] <= 2 * self.poll_interval:
+                return latest[1]
+        return await self._cached(self.counts, "count", user_id, self._load_follower_count)
+
+    async def _load_follower_count(self, user_id: int) -> Optional[int]:
+        data = await self._fetch_json(self.roproxy_followers_count_api.format(user_id), self.roblox_followers_count_api.format(user_id))
         if not data:
             return None
         value = data.get("count")
-        self.cache[cache_key] = {"value": value, "ts": time.monotonic()}
+        if value is not None:
+            self.counts.set(user_id, value)
+            if user_id in self.watched:
+                self.series.append(user_id, value)
         return value
 
     async def get_roblox_avatar_url(self, user_id: int) -> Optional[str]:
-        cache_key = f"avatar:{user_id}"
-        cached = self.cache.get(cache_key)
-        if cached and time.monotonic() - cached.get("ts", 0) < 300:
-            return cached.get("value")
-        data = await self._fetch_json(self.roproxy_avatar_api.format(user_id))
-        if not data:
-            data = await self._fetch_json(self.roblox_avatar_api.format(user_id))
-        if not data:
-            return None
-        image_url = None
-        try:
-            arr = data.get("data")
-            if isinstance(arr, list) and arr:
-                image_url = arr[0].get("imageUrl")
-        except Exception:
-            image_url = None
+        return await self._cached(self.avatars, "avatar", user_id, self._load_avatar_url)
+
+    async def _load_avatar_url(self, user_id: int) -> Optional[str]:
+        image_url = await self.avatar_batcher.load(user_id)
         if image_url:
-            self.cache[cache_key] = {"value": image_url, "ts": time.monotonic()}
+            self.avatars.set(user_id, image_url)
         return image_url
 
+    async def _fetch_avatar_urls(self, user_ids: List[int]) -> Dict[int, str]:
+        """One thumbnails request for a whole batch of user ids."""
+        ids = ",".join(map(str, user_ids))
+        data = await self._fetch_json(self.roproxy_avatar_api.format(ids), self.roblox_avatar_api.format(ids))
+        if not data or not isinstance(data.get("data"), list):
+            return {}
+        return {item["targetId"]: item["imageUrl"] for item in data["data"] if item.get("targetId") is not None and item.get("imageUrl")}
+
     async def get_roblox_username(self, user_id: int) -> Optional[str]:
-        cache_key = f"username:{user_id}"
-        cached = self.cache.get(cache_key)
-        if cached and time.monotonic() - cached.get("ts", 0) < 300:
-            return cached.get("value")
-        data = await self._fetch_json(self.roproxy_user_api.format(user_id))
-        if not data:
-            data = await self._fetch_json(self.roblox_user_api.format(user_id))
-        if not data:
-            return None
-        name = data.get("name")
+        return await self._cached(self.usernames, "username", user_id, self._load_username)
+
+    async def _load_username(self, user_id: int) -> Optional[str]:
+        name = await self.username_batcher.load(user_id)
         if name:
-            self.cache[cache_key] = {"value": name, "ts": time.monotonic()}
+            self.usernames.set(user_id, name)
         return name
 
+    async def _fetch_usernames(self, user_ids: List[int]) -> Dict[int, str]:
+        """One `POST /v1/users` request for a whole batch of user ids."""
+        body = {"userIds": user_ids, "excludeBannedUsers": False}
+        data = await self._fetch_json(self.roproxy_users_batch_api, self.roblox_users_batch_api, json_body=body)
+        if not data or not isinstance(data.get("data"), list):
+            return {}
+        return {item["id"]: item["name"] for item in data["data"] if item.get("id") is not None and item.get("name")}
+
     @commands.command(name="rblxfollowers", help="Displays the Roblox follower count for the specified user ID.", aliases=["rfcount", "rfc"])
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def followers(self, ctx: commands.Context, user_id: int):
@@ -113,16 +250,139 @@ class RobloxFollowers(commands.Cog):
             embed.set_footer(text="Powered by RoProxy/Roblox API")
             if avatar_url:
                 embed.set_thumbnail(url=avatar_url)
+            growth = self._growth_summary(user_id)
+            if growth:
+                embed.add_field(name="Growth", value=growth, inline=False)
             await ctx.send(embed=embed)
         except Exception as e:
             print(f"Command error: {e}")
             error_embed = discord.Embed(title="Error", description="An error occurred while fetching the follower count.", color=discord.Color.red())
             await ctx.send(embed=error_embed)
 
+    @commands.command(name="rblxfollowersbulk", help="Displays the Roblox follower counts for several user IDs at once.", aliases=["rfcbulk", "rfcs"])
+    @commands.cooldown(1, 10, commands.BucketType.user)
+    async def followers_bulk(self, ctx: commands.Context, *user_ids: int):
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            await ctx.send("Give at least one Roblox user ID.")
+            return
+        if len(user_ids) > self.max_ids_per_command:
+            await ctx.send(f"You can look up at most {self.max_ids_per_command} users at once.")
+            return
+        try:
+            async with ctx.typing():
+                counts, usernames = await asyncio.gather(
+                    asyncio.gather(*(self.get_follower_count(user_id) for user_id in user_ids)),
+                    asyncio.gather(*(self.get_roblox_username(user_id) for user_id in user_ids)),
+                )
+            embed = discord.Embed(title="Roblox Follower Counts", color=discord.Color.green())
+            for user_id, count, username in zip(user_ids, counts, usernames):
+                value = f"**{count}** followers" if count is not None else "Could not retrieve follower count."
+                embed.add_field(name=username or str(user_id), value=f"{value}\nhttps://www.roblox.com/users/{user_id}/profile", inline=False)
+            embed.set_footer(text="Powered by RoProxy/Roblox API")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            print(f"Command error: {e}")
+            error_embed = discord.Embed(title="Error", description="An error occurred while fetching the follower counts.", color=discord.Color.red())
+            await ctx.send(embed=error_embed)
+
+    def _growth_summary(self, user_id: int) -> Optional[str]:
+        """24h/7d/30d changes for a watched user, from local history only."""
+        if user_id not in self.watched:
+            return None
+        lines = []
+        for label, seconds in (("24h", 86400), ("7d", 7 * 86400), ("30d", 30 * 86400)):
+            delta = self.series.delta(user_id, seconds)
+            if delta is None:
+                return None
+            lines.append(f"**{label}:** {format_change(delta)}{' (since tracking began)' if delta['partial'] else ''}")
+        return "\n".join(lines)
+
+    @commands.command(name="rblxwatch", help="Adds Roblox user IDs to the follower-count watchlist.", aliases=["rfwatch"])
+    @commands.has_permissions(manage_guild=True)
+    async def watch(self, ctx: commands.Context, *user_ids: int):
+        new_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in self.watched]
+        if not user_ids:
+            await ctx.send("Give at least one Roblox user ID.")
+            return
+        if len(self.watched) + len(new_ids) > self.max_watched:
+            await ctx.send(f"The watchlist is limited to {self.max_watched} users.")
+            return
+        for user_id in new_ids:
+            self.watched.add(user_id)
+            await self.watchlist.set(user_id, {"added_by": ctx.author.id, "added_at": int(time.time())})
+        async with ctx.typing():
+            await self.poll(new_ids)
+        embed = discord.Embed(
+            title="Watchlist Updated",
+            description=f"Now watching **{len(new_ids)}** new user(s); counts refresh every {self.poll_interval // 60 or 1} minute(s).",
+            color=discord.Color.green(),
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="rblxunwatch", help="Removes a Roblox user ID from the follower-count watchlist.", aliases=["rfunwatch"])
+    @commands.has_permissions(manage_guild=True)
+    async def unwatch(self, ctx: commands.Context, user_id: int):
+        if user_id not in self.watched:
+            await ctx.send("That user is not on the watchlist.")
+            return
+        self.watched.discard(user_id)
+        await self.watchlist.delete(user_id)
+        self.series.forget(user_id)
+        await ctx.send(embed=discord.Embed(title="Watchlist Updated", description=f"Stopped watching **{user_id}**.", color=discord.Color.red()))
+
+    @commands.command(name="rblxwatchlist", help="Lists watched Roblox users with their 24h follower change.", aliases=["rfwatchlist"])
+    async def watchlist_command(self, ctx: commands.Context):
+        if not self.watched:
+            await ctx.send("The watchlist is empty.")
+            return
+        user_ids = sorted(self.watched)[:25]  # embed field limit
+        usernames = await asyncio.gather(*(self.get_roblox_username(user_id) for user_id in user_ids))
+        embed = discord.Embed(title="Roblox Watchlist", color=discord.Color.blue())
+        for user_id, username in zip(user_ids, usernames):
+            delta = self.series.delta(user_id, 86400)
+            value = f"**{delta['end']:,}** followers, {format_change(delta)} in 24h" if delta else "No data yet."
+            embed.add_field(name=username or str(user_id), value=value, inline=False)
+        if len(self.watched) > len(user_ids):
+            embed.set_footer(text=f"Showing {len(user_ids)} of {len(self.watched)} watched users")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="rblxgrowth", help="Shows follower growth for a watched Roblox user over a range (e.g. 24h, 7d, 30d).", aliases=["rfgrowth"])
+    async def growth(self, ctx: commands.Context, user_id: int, time_range: str = "7d"):
+        seconds = parse_range(time_range)
+        if seconds is None:
+            await ctx.send("Invalid range format! Use: `30m`, `12h`, or `7d` for minutes/hours/days.")
+            return
+        delta = self.series.delta(user_id, seconds)
+        if delta is None:
+            await ctx.send(f"No history for that user. Add them with `rblxwatch {user_id}` first.")
+            return
+        now = time.time()
+        samples = [self.series.at(user_id, now - seconds + seconds * i / 23) for i in range(24)]
+        values = [point[1] for point in samples if point is not None]
+        days = max((delta["end_ts"] - delta["start_ts"]) / 86400, 1 / 24)
+        username = await self.get_roblox_username(user_id)
+        embed = discord.Embed(title=f"Follower Growth: {username or user_id}", color=discord.Color.green() if delta["change"] >= 0 else discord.Color.red())
+        embed.add_field(name="From", value=f"**{delta['start']:,}** (<t:{delta['start_ts']}:R>)")
+        embed.add_field(name="To", value=f"**{delta['end']:,}** (<t:{delta['end_ts']}:R>)")
+        embed.add_field(name="Change", value=f"{format_change(delta)}\n{delta['change'] / days:+,.1f}/day")
+        if len(values) > 1:
+            embed.add_field(name=f"Last {time_range}", value=f"`{sparkline(values)}`", inline=False)
+        if delta["partial"]:
+            embed.set_footer(text="History starts inside this range; showing change since tracking began.")
+        await ctx.send(embed=embed)
+
     @followers.error
+    @followers_bulk.error
     async def followers_error(self, ctx: commands.Context, error):
         if isinstance(error, commands.CommandOnCooldown):
             await ctx.send(f"This command is on cooldown. Try again in {round(error.retry_after, 1)}s.")
 
+    @watch.error
+    @unwatch.error
+    async def watch_error(self, ctx: commands.Context, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need the Manage Server permission to change the watchlist.")
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(RobloxFollowers(bot))
\ No newline at end of file
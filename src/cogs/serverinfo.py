@@ -1,7 +1,10 @@
+import asyncio
 import discord
 from discord.ext import commands
 
 class ServerInfo(commands.Cog):
+    gateway_intents = ("members",)  # counts humans and bots through member chunk requests
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         
@@ -25,13 +28,16 @@ class ServerInfo(commands.Cog):
         embed.add_field(name="Owner", value=guild.owner.mention if guild.owner else "Unknown", inline=True)
         embed.add_field(name="Boost Tier", value=f"Level {guild.premium_tier}", inline=True)
 
-        # Member stats
+        # Member stats (counted from a chunk of the guild unless its members are all cached)
         total = guild.member_count
-        humans = sum(1 for m in guild.members if not m.bot)
-        bots = total - humans
+        try:
+            humans, bots = await self.bot.member_cache.census(guild)
+            breakdown = f"{humans} humans\n{bots} bots"
+        except asyncio.TimeoutError:
+            breakdown = "humans/bots unavailable"
         embed.add_field(
             name="Members",
-            value=f"{total} total\n{humans} humans\n{bots} bots",
+            value=f"{total} total\n{breakdown}",
             inline=True
         )
 
@@ -17,6 +17,9 @@ class Shutdown(commands.Cog):
             color=discord.Color.purple()
         )
         await ctx.send(embed=embed)
+        if getattr(self.bot, "shard_bus", None) is not None:
+            # Sharded launch: the orchestrator stops every worker and won't restart this one
+            await self.bot.shard_bus.request_shutdown()
         await self.bot.close()
         # Forcefully terminate the entire Python process
         os.kill(os.getpid(), signal.SIGTERM)
@@ -1,4 +1,3 @@
-import asyncio
 import re
 import discord
 from discord.ext import commands
@@ -6,6 +5,7 @@ from discord.ext import commands
 class TempRole(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.bot.timers.register("temprole", self._expire_role)
 
     def _parse_duration(self, duration_str: str) -> int:
         """Convert a duration string like '1h30m' or '2d' to seconds."""
@@ -43,10 +43,36 @@ class TempRole(commands.Cog):
         await member.add_roles(role)
         await ctx.send(f"Assigned {role.mention} to {member.mention} for {duration}.")
 
-        await asyncio.sleep(duration_seconds)
+        # Removal is handled by the bot's timer service, so it survives restarts
+        await self.bot.timers.schedule(
+            "temprole",
+            duration_seconds,
+            {
+                "guild_id": ctx.guild.id,
+                "member_id": member.id,
+                "role_id": role.id,
+                "channel_id": ctx.channel.id,
+                "duration": duration,
+            },
+            timer_id=f"temprole:{ctx.guild.id}:{member.id}:{role.id}",
+        )
+
+    async def _expire_role(self, data: dict) -> None:
+        """Timer handler: remove the temporary role and announce it."""
+        guild = self.bot.get_guild(data["guild_id"])
+        if guild is None:
+            return
+        role = guild.get_role(data["role_id"])
+        if role is None:
+            return
+        member = await self.bot.member_cache.get(guild, data["member_id"])
+        if member is None:
+            return
 
         await member.remove_roles(role)
-        await ctx.send(f"Removed {role.mention} from {member.mention} after {duration}.")
+        channel = guild.get_channel(data["channel_id"])
+        if channel is not None:
+            await channel.send(f"Removed {role.mention} from {member.mention} after {data['duration']}.")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(TempRole(bot))
\ No newline at end of file
@@ -4,7 +4,11 @@ from discord.ext import commands
 class TicTacToe(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.games = {}
+        self.games = bot.storage.namespace("tictactoe")  # message id -> game state, persisted
+        self.active: set = set()  # message ids of running games, so other reactions never touch storage
+
+    async def cog_load(self):
+        self.active = {int(message_id) for message_id, _ in await self.games.items()}
 
     def format_board(self, board: list[str]):
         rows = [board[i:i+3] for i in range(0, 9, 3)]
@@ -31,28 +35,35 @@ class TicTacToe(commands.Cog):
         )
         embed.set_footer(text=f"Turn: {players[turn].display_name}")
 
-        game_message = await ctx.send(embed=embed)
-
-        for i in range(9):
-            await game_message.add_reaction(f"{i+1}\u20e3")
+        game_message = await self.bot.outbound.send(ctx, embed=embed, lane="fun", coalesce=False)
 
-        self.games[game_message.id] = {
+        # Only ids are stored so the game survives a restart
+        self.active.add(game_message.id)
+        await self.games.set(game_message.id, {
             "board": board,
-            "players": players,
+            "players": [player.id for player in players],
             "turn": turn,
-            "message": game_message
-        }
+            "channel_id": ctx.channel.id
+        })
+
+        # Paced to the channel's reaction bucket instead of running into 429s
+        await self.bot.outbound.react(game_message, [f"{i+1}\u20e3" for i in range(9)], lane="fun")
 
+    # Raw event so moves on games started before a restart (uncached messages) still register
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.Member):
-        if user.bot or reaction.message.id not in self.games:
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if payload.message_id not in self.active or payload.member is None or payload.member.bot:
             return
 
-        game = self.games[reaction.message.id]
-        if user not in game["players"] or user != game["players"][game["turn"]]:
+        game = await self.games.get(payload.message_id)
+        if game is None:
             return
 
-        emoji = reaction.emoji
+        user = payload.member
+        if user.id not in game["players"] or user.id != game["players"][game["turn"]]:
+            return
+
+        emoji = str(payload.emoji)
         if emoji not in [f"{i+1}\u20e3" for i in range(9)]:
             return
 
@@ -60,31 +71,39 @@ class TicTacToe(commands.Cog):
         if game["board"][index] != "⬜":
             return
 
-        symbol = "❌" if game["players"].index(user) == 0 else "⭕"
+        symbol = "❌" if game["players"].index(user.id) == 0 else "⭕"
         game["board"][index] = symbol
         game["turn"] = 1 - game["turn"]
+        await self.games.set(payload.message_id, game)
 
+        next_player = user.guild.get_member(game["players"][game["turn"]])
         embed = discord.Embed(
             title="🎮 Tic-Tac-Toe",
-            description=f"{game['players'][0].mention} vs {game['players'][1].mention}\n\n{self.format_board(game['board'])}",
+            description=f"<@{game['players'][0]}> vs <@{game['players'][1]}>\n\n{self.format_board(game['board'])}",
             color=discord.Color.blue()
         )
-        embed.set_footer(text=f"Turn: {game['players'][game['turn']].display_name}")
+        embed.set_footer(text=f"Turn: {next_player.display_name if next_player else game['players'][game['turn']]}")
 
-        await reaction.message.edit(embed=embed)
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        message = channel.get_partial_message(payload.message_id)
+        await self.bot.outbound.edit(message, embed=embed, lane="fun")
 
         winner = self.check_winner(game["board"])
         if winner:
-            await reaction.message.channel.send(f"{winner} wins!")
-            del self.games[reaction.message.id]
+            await self.bot.outbound.send(channel, f"{winner} wins!", lane="fun")
+            self.active.discard(payload.message_id)
+            await self.games.delete(payload.message_id)
             return
 
         if "⬜" not in game["board"]:
-            await reaction.message.channel.send("It's a draw!")
-            del self.games[reaction.message.id]
+            await self.bot.outbound.send(channel, "It's a draw!", lane="fun")
+            self.active.discard(payload.message_id)
+            await self.games.delete(payload.message_id)
             return
 
-        await reaction.remove(user)
+        await self.bot.outbound.remove_reaction(message, payload.emoji, user, lane="fun")
 
     def check_winner(self, board: list[str]):
         lines = [
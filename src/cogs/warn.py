@@ -1,11 +1,11 @@
+import asyncio
 import discord
 from discord.ext import commands
-from collections import defaultdict
 
 class WarnSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.warnings = defaultdict(list)  # Stores warnings in memory
+        self.warnings = bot.storage.namespace("warnings")  # member id -> list of reasons, persisted
 
     @commands.command(name="warn", aliases=["warning"], help="Warns a member and records the reason.")
     @commands.has_permissions(manage_messages=True)
@@ -19,25 +19,33 @@ class WarnSystem(commands.Cog):
             await ctx.send("You cannot warn the server owner!")
             return
 
-        self.warnings[member.id].append(reason)
+        reasons = await self.warnings.get(member.id, [])
+        reasons.append(reason)
+        await self.warnings.set(member.id, reasons)
         embed = discord.Embed(
             title="Member Warned",
             description=f"{member.mention} has been warned reason: {reason}",
             color=discord.Color.red()
         )
-        await ctx.send(embed=embed)
-
-        # Optionally, DM the user about the warning
-        try:
-            await member.send(f"You have been warned in **{ctx.guild.name}** for: {reason}")
-        except discord.Forbidden:
-            await ctx.send(f"Could not DM {member.mention} about their warning.")
+        # The channel notice and the DM go out on different routes, so they are sent side by side
+        notice, dm = await asyncio.gather(
+            self.bot.outbound.send(ctx, embed=embed, lane="moderation"),
+            self.bot.outbound.send(member, f"You have been warned in **{ctx.guild.name}** for: {reason}", lane="moderation"),
+            return_exceptions=True,
+        )
+        if isinstance(notice, Exception):
+            raise notice
+        if isinstance(dm, discord.Forbidden):
+            await self.bot.outbound.send(ctx, f"Could not DM {member.mention} about their warning.", lane="moderation")
+        elif isinstance(dm, Exception):
+            raise dm
 
     @commands.command(name="warnings", aliases=["warns"])
     @commands.has_permissions(manage_messages=True)
     async def warnings(self, ctx: commands.Context, member: discord.Member):
         """Displays all warnings for a member."""
-        if member.id not in self.warnings or not self.warnings[member.id]:
+        reasons = await self.warnings.get(member.id, [])
+        if not reasons:
             await ctx.send(f"{member.mention} has no warnings.")
             return
 
@@ -45,7 +53,7 @@ class WarnSystem(commands.Cog):
             title=f"Warnings for {member}",
             color=discord.Color.orange()
         )
-        for idx, reason in enumerate(self.warnings[member.id], 1):
+        for idx, reason in enumerate(reasons, 1):
             embed.add_field(name=f"Warning {idx}", value=reason, inline=False)
 
         await ctx.send(embed=embed)
@@ -54,8 +62,7 @@ class WarnSystem(commands.Cog):
     @commands.has_permissions(manage_messages=True)
     async def clear_warnings(self, ctx: commands.Context, member: discord.Member):
         """Clears all warnings for a member."""
-        if member.id in self.warnings:
-            self.warnings[member.id].clear()
+        await self.warnings.delete(member.id)
         await ctx.send(f"Cleared all warnings for {member.mention}.")
 
 # Add the cog to the bot
@@ -1,9 +1,14 @@
 from discord.ext import commands
 
+try:
+    from src.modules.load_config import ConfigService
+except ImportError:
+    from modules.load_config import ConfigService
+
 class OnCommandError(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self._bot = bot
-        self._config = bot._config
+        self._config = ConfigService.shared()  # live view, follows hot-reloads
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
@@ -1,10 +1,20 @@
-import os
-import random
+import asyncio
+import aiohttp
 import discord
 from discord.ext import commands
 from io import BytesIO
-from PIL import Image, ImageDraw
-from easy_pil import Canvas, Editor, Font, load_image_async
+from typing import Any, Dict, List
+
+try:
+    from src.modules.avatar_cache import AvatarCache
+    from src.modules.card_assets import get_assets, warm_assets
+    from src.modules.card_renderer import CardQueueFull, CardRenderer, CardRequest, DigestRequest
+    from src.modules.join_batcher import JoinBatcher
+except ImportError:
+    from modules.avatar_cache import AvatarCache
+    from modules.card_assets import get_assets, warm_assets
+    from modules.card_renderer import CardQueueFull, CardRenderer, CardRequest, DigestRequest
+    from modules.join_batcher import JoinBatcher
 
 # Cog that sends a stylized welcome/goodbye card whenever a member joins or leaves the server.
 class OnMemberJoinedAndRemoved(commands.Cog):
@@ -14,6 +24,26 @@ class OnMemberJoinedAndRemoved(commands.Cog):
         self.bot = bot
         self.channel_id = channel_id
         self.backgrounds_dir = backgrounds_dir
+        self.assets = get_assets(backgrounds_dir)
+        self.renderer = CardRenderer.from_config(bot._config, backgrounds_dir=backgrounds_dir)
+        self.avatars = AvatarCache.from_config(bot._config, client=bot.http_client)
+
+        # During join floods, welcome cards are coalesced into digests ("grid" or "attachments"),
+        # one batcher per guild so a digest never mixes servers
+        self.batch_mode = (bot._config.get("WelcomeBatching") or {}).get("Mode", "grid")
+        self.welcome_batchers: Dict[int, JoinBatcher] = {}
+
+    # Decode and pre-scale every background (and load fonts) once, off the event loop
+    async def cog_load(self) -> None:
+        self.bot.metrics.add_source("welcome", self.batcher_stats)
+        await asyncio.to_thread(warm_assets, self.backgrounds_dir)
+
+    async def cog_unload(self) -> None:
+        self.bot.metrics.remove_source("welcome")
+        for batcher in self.welcome_batchers.values():
+            await batcher.close()
+        self.renderer.shutdown()
+        await self.avatars.close()
 
     # Retrieve the target text channel, first from cache then via API; returns None if unavailable
     async def _resolve_channel(self) -> discord.TextChannel | None:
@@ -25,72 +55,52 @@ class OnMemberJoinedAndRemoved(commands.Cog):
         except Exception:
             return None
 
-    # Pick a random background image from self.backgrounds_dir; returns None if folder is empty/missing
+    # Pick a random cached background from self.backgrounds_dir; returns None if folder is empty/missing.
+    # The folder is only re-scanned when its mtime changes.
     def _pick_background(self) -> str | None:
-        if not os.path.isdir(self.backgrounds_dir):
-            return None
-        files = [f for f in os.listdir(self.backgrounds_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        return os.path.join(self.backgrounds_dir, random.choice(files)) if files else None
-
-    # Build a 1000×300 PNG card: avatar + welcome/goodbye text centered horizontally
-    async def _build_card(self, member: discord.Member, *, welcome: bool) -> discord.File:
-        # Choose background or fallback to blank canvas
-        bg_path = self._pick_background()
-        if bg_path:
-            background = Editor(Image.open(bg_path).convert("RGBA")).resize((1000, 300))
-        else:
-            background = Editor(Canvas((1000, 300)))
-
-        # Download and circular-crop member avatar
-        avatar = Editor(
-            await load_image_async(str(member.display_avatar.url))
-        ).resize((150, 150)).circle_image()
-
-        # Font setup
-        font_big = Font.poppins(size=35, variant="bold")
-        font_small = Font.poppins(size=40, variant="regular")
-        text_color = "white"
-
-        # Avatar placement (centered horizontally, 30 px from top)
-        avatar_x = (1000 - 150) // 2
-        avatar_y = 30
+        return self.assets.pick()
+
+    # Build a 1000×300 PNG card: avatar + welcome/goodbye text centered horizontally.
+    # Only the (cached) avatar download runs on the loop; PIL work is handed to the renderer pool.
+    async def _build_card(self, member: discord.Member | discord.User, guild: discord.Guild, *, welcome: bool) -> discord.File:
+        avatar = await self.avatars.fetch(str(member.display_avatar.with_size(256).url))
 
         # Text content
         top_text = f"Welcome {member.display_name}!" if welcome else f"Goodbye {member.display_name}!"
-        bottom_text = f"Welcome to {member.guild.name}!" if welcome else f"Left {member.guild.name}!"
-
-        # Measure text widths for horizontal centering
-        draw = ImageDraw.Draw(background.image)
-        top_bbox = draw.textbbox((0, 0), top_text, font=font_big)
-        bottom_bbox = draw.textbbox((0, 0), bottom_text, font=font_small)
-        top_w = top_bbox[2] - top_bbox[0]
-        bottom_w = bottom_bbox[2] - bottom_bbox[0]
-
-        top_x = (1000 - top_w) // 2
-        bottom_x = (1000 - bottom_w) // 2
-
-        # Composite layers: avatar first, then text lines below it
-        background.paste(avatar.image, (avatar_x, avatar_y))
-        background.text((top_x, avatar_y + 150 + 10), top_text, font=font_big, color=text_color)
-        background.text((bottom_x, avatar_y + 150 + 10 + 40 + 10), bottom_text, font=font_small, color=text_color)
+        bottom_text = f"Welcome to {guild.name}!" if welcome else f"Left {guild.name}!"
 
-        # Export to PNG bytes
-        buf = BytesIO()
-        background.image.save(buf, format="PNG")
-        buf.seek(0)
-        return discord.File(fp=buf, filename="card.png")
+        data = await self.renderer.render(CardRequest(
+            avatar=avatar,
+            top_text=top_text,
+            bottom_text=bottom_text,
+            background_path=self._pick_background(),
+        ))
+        return discord.File(fp=BytesIO(data), filename="card.png")
 
     # Shorthand for welcome variant
     async def _build_welcome_card(self, member: discord.Member) -> discord.File:
-        return await self._build_card(member, welcome=True)
-
-    # Shorthand for goodbye variant
-    async def _build_removal_card(self, member: discord.Member) -> discord.File:
-        return await self._build_card(member, welcome=False)
-
-    # Event: fires when a new member joins the guild
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member) -> None:
+        return await self._build_card(member, member.guild, welcome=True)
+
+    # Shorthand for goodbye variant; the leaver may be a plain User when they weren't in the member cache
+    async def _build_removal_card(self, member: discord.Member | discord.User, guild: discord.Guild) -> discord.File:
+        return await self._build_card(member, guild, welcome=False)
+
+    # Build one composite card with a grid of avatars for a batch of new members
+    async def _build_digest_card(self, members: List[discord.Member]) -> discord.File:
+        results = await asyncio.gather(
+            *(self.avatars.fetch(str(m.display_avatar.with_size(128).url)) for m in members),
+            return_exceptions=True,
+        )
+        data = await self.renderer.render_digest(DigestRequest(
+            avatars=tuple(r for r in results if isinstance(r, bytes)),
+            top_text=f"Welcome {len(members)} new members!",
+            bottom_text=f"Welcome to {members[0].guild.name}!",
+            background_path=self._pick_background(),
+        ))
+        return discord.File(fp=BytesIO(data), filename="welcome_digest.png")
+
+    # Send a single welcome card (normal traffic)
+    async def _send_welcome(self, member: discord.Member) -> None:
         channel = await self._resolve_channel()
         if not channel:
             print(f"Welcome channel {self.channel_id} not found; skipping message.")
@@ -98,19 +108,71 @@ class OnMemberJoinedAndRemoved(commands.Cog):
         try:
             file = await self._build_welcome_card(member)
             await channel.send(file=file)
+        except (CardQueueFull, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Skipping card for {member}: {e}")
         except (discord.Forbidden, discord.HTTPException):
             pass
 
-    # Event: fires when a member leaves the guild
+    # Send one message for a whole batch of joins (join flood)
+    async def _send_welcome_digest(self, members: List[discord.Member]) -> None:
+        channel = await self._resolve_channel()
+        if not channel:
+            print(f"Welcome channel {self.channel_id} not found; skipping digest.")
+            return
+        names = ", ".join(m.display_name for m in members)
+        content = discord.utils.escape_mentions(f"Welcome {names}!")[:2000]
+        try:
+            if self.batch_mode == "attachments":
+                results = await asyncio.gather(*(self._build_welcome_card(m) for m in members), return_exceptions=True)
+                files = [r for r in results if isinstance(r, discord.File)]
+                await channel.send(content=content, files=files)
+            else:
+                await channel.send(content=content, file=await self._build_digest_card(members))
+        except (CardQueueFull, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Skipping welcome digest for {len(members)} members: {e}")
+        except (discord.Forbidden, discord.HTTPException):
+            pass
+
+    # Event: fires when a new member joins the guild; batched automatically during join floods
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        await self._welcome_batcher(member.guild.id).submit(member)
+
+    # Welcome batching summed over every guild: joins seen, API calls made and calls saved by digests
+    def batcher_stats(self) -> Dict[str, Any]:
+        totals: Dict[str, Any] = {"guilds": len(self.welcome_batchers), "items": 0, "api_calls": 0, "batches": 0, "calls_saved": 0, "pending": 0, "max_latency_ms": 0.0}
+        for batcher in self.welcome_batchers.values():
+            stats = batcher.stats()
+            for key in ("items", "api_calls", "batches", "calls_saved", "pending"):
+                totals[key] += stats[key]
+            totals["max_latency_ms"] = max(totals["max_latency_ms"], stats["max_latency_ms"])
+        return totals
+
+    # The guild's welcome batcher, created on its first join
+    def _welcome_batcher(self, guild_id: int) -> JoinBatcher:
+        batcher = self.welcome_batchers.get(guild_id)
+        if batcher is None:
+            batcher = self.welcome_batchers[guild_id] = JoinBatcher.from_config(self.bot._config, self._send_welcome, self._send_welcome_digest)
+            if self.batch_mode == "attachments":
+                batcher.max_batch = min(batcher.max_batch, 10)  # Discord's attachment limit
+        return batcher
+
+    # Event: fires when a member leaves the guild. The raw event, because on_member_remove
+    # only fires for members still in the (memory-budgeted) member cache
     @commands.Cog.listener()
-    async def on_member_remove(self, member: discord.Member) -> None:
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent) -> None:
+        guild = self.bot.get_guild(payload.guild_id)
+        if guild is None:
+            return
         channel = await self._resolve_channel()
         if not channel:
             print(f"Removal channel {self.channel_id} not found; skipping message.")
             return
         try:
-            file = await self._build_removal_card(member)
+            file = await self._build_removal_card(payload.user, guild)
             await channel.send(file=file)
+        except (CardQueueFull, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Skipping card for {payload.user}: {e}")
         except (discord.Forbidden, discord.HTTPException):
             pass
 
@@ -0,0 +1,113 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+
+try:
+    from src.modules.http_client import HttpClient
+except ImportError:
+    from modules.http_client import HttpClient
+
+class AvatarCache:
+    """Byte-bounded LRU of downloaded avatar images sharing one pooled HTTP session.
+
+    Entries are keyed by the avatar hash in the CDN URL (plus the requested size),
+    so a member who leaves and rejoins with the same avatar is served from memory.
+    Concurrent requests for the same key share a single in-flight download.
+    """
+
+    def __init__(self, *, max_bytes: int = 32 * 1024 * 1024, timeout: float = 10.0, client: Optional[HttpClient] = None) -> None:
+        self.max_bytes = max_bytes
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.client = client  # the bot's shared pool; a private session is used without one
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], client: Optional[HttpClient] = None) -> "AvatarCache":
+        """Build a cache from the optional `AvatarCache` section of config.json."""
+        section = config.get("AvatarCache") or {}
+        return cls(
+            max_bytes=section.get("MaxBytes", 32 * 1024 * 1024),
+            timeout=section.get("Timeout", 10.0),
+            client=client,
+        )
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """Derive `<hash>:<size>` from a Discord asset URL such as `/avatars/<id>/<hash>.png?size=256`."""
+        parts = urlsplit(url)
+        name = parts.path.rsplit("/", 1)[-1]
+        avatar_hash = name.split(".", 1)[0] or url
+        size = parse_qs(parts.query).get("size", [""])[0]
+        return f"{avatar_hash}:{size}"
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.client is not None:
+            return self.client.session
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self._session
+
+    async def fetch(self, url: str) -> bytes:
+        """Return the avatar bytes for `url`, downloading only on a cache miss."""
+        key = self.cache_key(url)
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._download(key, url))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled waiter does not abort the download for the others
+        return await asyncio.shield(task)
+
+    async def _download(self, key: str, url: str) -> bytes:
+        async with self._get_session().get(url, timeout=self.timeout) as response:
+            response.raise_for_status()
+            data = await response.read()
+        self._store(key, data)
+        return data
+
+    def _store(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
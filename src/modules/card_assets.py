@@ -0,0 +1,115 @@
+import os
+import random
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image, ImageFont
+from easy_pil import Font
+
+CARD_SIZE = (1000, 300)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+class CardAssets:
+    """Pre-decoded, pre-scaled card backgrounds and resident fonts for one directory.
+
+    Backgrounds are opened, converted to RGBA and resized to the card size once,
+    then reused for every card. The directory is only re-scanned when its mtime
+    changes, so the steady-state cost of `pick()` is a single `os.stat`.
+    """
+
+    def __init__(self, backgrounds_dir: str) -> None:
+        self.backgrounds_dir = backgrounds_dir
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = -1.0  # never matches, forces the first load
+        self._backgrounds: Dict[str, Image.Image] = {}
+        self._fonts: Optional[Tuple[ImageFont.FreeTypeFont, ImageFont.FreeTypeFont]] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def refresh(self) -> bool:
+        """Reload every background if the directory changed; returns True if it reloaded."""
+        try:
+            mtime = os.stat(self.backgrounds_dir).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            backgrounds: Dict[str, Image.Image] = {}
+            if mtime is not None:
+                for name in sorted(os.listdir(self.backgrounds_dir)):
+                    if not name.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    path = os.path.join(self.backgrounds_dir, name)
+                    try:
+                        with Image.open(path) as img:
+                            backgrounds[path] = img.convert("RGBA").resize(CARD_SIZE)
+                    except OSError as e:
+                        print(f"Skipping unreadable card background {path}: {e}")
+            self._backgrounds = backgrounds
+            self._mtime = mtime
+            self.reloads += 1
+            return True
+
+    def pick(self) -> Optional[str]:
+        """Return the path of a random background, or None if the folder is empty/missing."""
+        self.refresh()
+        paths = list(self._backgrounds)
+        return random.choice(paths) if paths else None
+
+    def background(self, path: Optional[str]) -> Optional[Image.Image]:
+        """Return a private copy of the pre-scaled background for `path`, or None."""
+        if not path:
+            return None
+        image = self._backgrounds.get(path)
+        if image is None:
+            self.misses += 1
+            self.refresh()
+            image = self._backgrounds.get(path)
+            if image is None:
+                return None
+        else:
+            self.hits += 1
+        return image.copy()
+
+    def fonts(self) -> Tuple[ImageFont.FreeTypeFont, ImageFont.FreeTypeFont]:
+        """Return the (title, subtitle) fonts, loading them on first use."""
+        if self._fonts is None:
+            self._fonts = (
+                Font.poppins(size=35, variant="bold"),
+                Font.poppins(size=40, variant="regular"),
+            )
+        return self._fonts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backgrounds": len(self._backgrounds),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+# One cache per directory per process; worker processes build their own on first use.
+_ASSETS: Dict[str, CardAssets] = {}
+_ASSETS_LOCK = threading.Lock()
+
+def get_assets(backgrounds_dir: str) -> CardAssets:
+    """Return the process-wide asset cache for `backgrounds_dir`, creating it if needed."""
+    key = os.path.abspath(backgrounds_dir)
+    assets = _ASSETS.get(key)
+    if assets is None:
+        with _ASSETS_LOCK:
+            assets = _ASSETS.setdefault(key, CardAssets(key))
+    return assets
+
+def warm_assets(backgrounds_dir: Optional[str]) -> None:
+    """Load backgrounds and fonts up front (used at cog load and as a pool initializer)."""
+    if backgrounds_dir is None:
+        return
+    assets = get_assets(backgrounds_dir)
+    assets.refresh()
+    assets.fonts()
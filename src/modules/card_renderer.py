@@ -0,0 +1,197 @@
+import asyncio
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw
+from easy_pil import Canvas, Editor
+
+try:
+    from src.modules.card_assets import CARD_SIZE, get_assets, warm_assets
+except ImportError:
+    from modules.card_assets import CARD_SIZE, get_assets, warm_assets
+
+AVATAR_SIZE = 150
+DIGEST_AVATAR_SIZE = 96
+DIGEST_COLUMNS = 8
+
+@dataclass(frozen=True)
+class CardRequest:
+    """Serialisable inputs for a single member card (safe to ship to a worker process)."""
+    avatar: bytes
+    top_text: str
+    bottom_text: str
+    background_path: Optional[str] = None
+
+@dataclass(frozen=True)
+class DigestRequest:
+    """Serialisable inputs for a composite card showing a grid of several avatars."""
+    avatars: Tuple[bytes, ...]
+    top_text: str
+    bottom_text: str
+    background_path: Optional[str] = None
+
+class CardQueueFull(RuntimeError):
+    """Raised when the renderer backlog is full and the caller would not wait."""
+
+def render_card(request: CardRequest) -> bytes:
+    """Render a 1000×300 PNG card: avatar + two lines of text centered horizontally."""
+    assets = get_assets(os.path.dirname(request.background_path)) if request.background_path else None
+
+    # Use the cached pre-scaled background or fallback to blank canvas
+    image = assets.background(request.background_path) if assets else None
+    background = Editor(image) if image is not None else Editor(Canvas(CARD_SIZE))
+
+    # Circular-crop member avatar
+    avatar = Editor(Image.open(BytesIO(request.avatar)).convert("RGBA")).resize((AVATAR_SIZE, AVATAR_SIZE)).circle_image()
+
+    # Fonts stay resident in the asset cache
+    font_big, font_small = (assets or get_assets(".")).fonts()
+    text_color = "white"
+
+    # Avatar placement (centered horizontally, 30 px from top)
+    avatar_x = (CARD_SIZE[0] - AVATAR_SIZE) // 2
+    avatar_y = 30
+
+    # Measure text widths for horizontal centering
+    draw = ImageDraw.Draw(background.image)
+    top_bbox = draw.textbbox((0, 0), request.top_text, font=font_big)
+    bottom_bbox = draw.textbbox((0, 0), request.bottom_text, font=font_small)
+    top_x = (CARD_SIZE[0] - (top_bbox[2] - top_bbox[0])) // 2
+    bottom_x = (CARD_SIZE[0] - (bottom_bbox[2] - bottom_bbox[0])) // 2
+
+    # Composite layers: avatar first, then text lines below it
+    background.paste(avatar.image, (avatar_x, avatar_y))
+    background.text((top_x, avatar_y + AVATAR_SIZE + 10), request.top_text, font=font_big, color=text_color)
+    background.text((bottom_x, avatar_y + AVATAR_SIZE + 10 + 40 + 10), request.bottom_text, font=font_small, color=text_color)
+
+    # Export to PNG bytes
+    buf = BytesIO()
+    background.image.save(buf, format="PNG")
+    return buf.getvalue()
+
+def render_digest(request: DigestRequest) -> bytes:
+    """Render a 1000px wide PNG with a title line, a grid of avatars and a subtitle line."""
+    assets = get_assets(os.path.dirname(request.background_path)) if request.background_path else None
+    font_big, font_small = (assets or get_assets(".")).fonts()
+
+    rows = max(1, math.ceil(len(request.avatars) / DIGEST_COLUMNS))
+    cell = DIGEST_AVATAR_SIZE + 12
+    size = (CARD_SIZE[0], 20 + 50 + rows * cell + 60)
+
+    image = assets.background(request.background_path) if assets else None
+    if image is not None and image.size != size:
+        image = image.resize(size)
+    background = Editor(image) if image is not None else Editor(Canvas(size))
+    draw = ImageDraw.Draw(background.image)
+
+    top_bbox = draw.textbbox((0, 0), request.top_text, font=font_big)
+    background.text(((size[0] - (top_bbox[2] - top_bbox[0])) // 2, 20), request.top_text, font=font_big, color="white")
+
+    # Lay avatars out row by row, centering the last (possibly short) row
+    for index, data in enumerate(request.avatars):
+        row, col = divmod(index, DIGEST_COLUMNS)
+        in_row = min(DIGEST_COLUMNS, len(request.avatars) - row * DIGEST_COLUMNS)
+        left = (size[0] - in_row * cell) // 2
+        avatar = Editor(Image.open(BytesIO(data)).convert("RGBA")).resize((DIGEST_AVATAR_SIZE, DIGEST_AVATAR_SIZE)).circle_image()
+        background.paste(avatar.image, (left + col * cell + 6, 20 + 50 + row * cell + 6))
+
+    bottom_bbox = draw.textbbox((0, 0), request.bottom_text, font=font_small)
+    background.text(((size[0] - (bottom_bbox[2] - bottom_bbox[0])) // 2, size[1] - 55), request.bottom_text, font=font_small, color="white")
+
+    buf = BytesIO()
+    background.image.save(buf, format="PNG")
+    return buf.getvalue()
+
+class CardRenderer:
+    """Runs `render_card` in a thread or process pool behind a bounded backlog.
+
+    At most `queue_size` cards may be pending (rendering or waiting for a worker).
+    Further callers wait up to `timeout` seconds for a slot and then get
+    `CardQueueFull`, so a join flood degrades by dropping cards instead of
+    piling up work on the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: str = "thread",
+        workers: int = 2,
+        queue_size: int = 64,
+        timeout: Optional[float] = 5.0,
+        backgrounds_dir: Optional[str] = None,
+    ) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown card renderer mode '{mode}' (expected 'thread' or 'process').")
+        self.mode = mode
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=workers, initializer=warm_assets, initargs=(backgrounds_dir,))
+            if mode == "process"
+            else ThreadPoolExecutor(max_workers=workers, thread_name_prefix="card-render")
+        )
+        self._slots = asyncio.Semaphore(queue_size)
+        self.pending = 0
+        self.rendered = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], *, backgrounds_dir: Optional[str] = None) -> "CardRenderer":
+        """Build a renderer from the optional `CardRenderer` section of config.json."""
+        section = config.get("CardRenderer") or {}
+        return cls(
+            backgrounds_dir=backgrounds_dir,
+            mode=section.get("Mode", "thread"),
+            workers=section.get("Workers", 2),
+            queue_size=section.get("QueueSize", 64),
+            timeout=section.get("Timeout", 5.0),
+        )
+
+    async def render(self, request: CardRequest) -> bytes:
+        """Render a member card off the event loop, waiting for a free backlog slot first."""
+        return await self._submit(render_card, request)
+
+    async def render_digest(self, request: DigestRequest) -> bytes:
+        """Render a multi-member digest card off the event loop."""
+        return await self._submit(render_digest, request)
+
+    async def _submit(self, func: Callable[[Any], bytes], request: Any) -> bytes:
+        try:
+            if self.timeout is None:
+                await self._slots.acquire()
+            elif self.timeout <= 0:
+                if self._slots.locked():
+                    raise asyncio.TimeoutError
+                await self._slots.acquire()
+            else:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise CardQueueFull(f"Card renderer backlog is full ({self.queue_size} pending).")
+
+        self.pending += 1
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(self._executor, func, request)
+            self.rendered += 1
+            return data
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,81 @@
+import time
+from typing import Any, Dict, Mapping, Optional
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream host.
+
+    closed: requests flow; `failure_threshold` failures in a row open it.
+    open: `allow()` is False for `reset_timeout` seconds (or for the
+    upstream's Retry-After), so callers skip straight to the next host.
+    half-open: after that, a single probe request is let through; success
+    closes the breaker, failure opens it again.
+    """
+
+    __slots__ = ("name", "failure_threshold", "reset_timeout", "failures", "opened_until", "_probing",
+                 "state_changes", "rejected", "total_failures")
+
+    def __init__(self, name: str, *, failure_threshold: int = 3, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until: Optional[float] = None
+        self._probing = False
+        self.state_changes = 0
+        self.rejected = 0
+        self.total_failures = 0
+
+    @classmethod
+    def from_config(cls, name: str, section: Optional[Mapping[str, Any]]) -> "CircuitBreaker":
+        section = section or {}
+        return cls(name, failure_threshold=section.get("FailureThreshold", 3), reset_timeout=section.get("ResetTimeout", 30.0))
+
+    @property
+    def state(self) -> str:
+        if self.opened_until is None:
+            return "closed"
+        return "open" if time.monotonic() < self.opened_until else "half-open"
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will let a request through again (0 unless open)."""
+        if self.opened_until is None:
+            return 0.0
+        return max(self.opened_until - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self.opened_until is not None:
+            self.state_changes += 1
+            print(f"Circuit for {self.name} closed again.")
+        self.failures = 0
+        self.opened_until = None
+        self._probing = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        """Count a failed request; a Retry-After (429) opens the breaker straight away."""
+        self.failures += 1
+        self.total_failures += 1
+        if self._probing or self.failures >= self.failure_threshold or retry_after is not None:
+            if self.opened_until is None:
+                self.state_changes += 1
+                print(f"Circuit for {self.name} opened after {self.failures} failure(s).")
+            self.opened_until = time.monotonic() + (self.reset_timeout if retry_after is None else retry_after)
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failures": self.total_failures,
+            "rejected": self.rejected,
+            "state_changes": self.state_changes,
+        }
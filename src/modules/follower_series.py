@@ -0,0 +1,180 @@
+import asyncio
+import sqlite3
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[int, int]  # (unix seconds, follower count)
+
+class _Track:
+    """Points for one user as two parallel arrays: 16 bytes per sample, no per-point objects."""
+
+    __slots__ = ("times", "counts", "seen")
+
+    def __init__(self) -> None:
+        self.times = array("q")
+        self.counts = array("q")
+        self.seen = 0  # last poll that confirmed the latest count, even if no point was stored
+
+class FollowerSeries:
+    """Append-only follower-count history for watched Roblox users.
+
+    Every user's history is held in memory as parallel arrays so reads are a
+    bisect, and mirrored to a SQLite table that is only ever appended to.
+    A poll that sees the same count as the last point only bumps `seen`; a
+    new point is stored when the count changes or `min_interval` seconds
+    have passed, which keeps idle accounts to a handful of rows per day.
+    Appends are queued and written in one transaction by `flush()`.
+    """
+
+    def __init__(self, path: str = ":memory:", *, min_interval: int = 3600, retention_days: Optional[float] = 365) -> None:
+        if path != ":memory:":
+            Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.min_interval = min_interval
+        self.retention_days = retention_days
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="series")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS follower_points ("
+            "user_id INTEGER NOT NULL, ts INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (user_id, ts)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._tracks: Dict[int, _Track] = {}
+        self._pending: List[Tuple[int, int, int]] = []
+        self.samples = 0
+        self.points_written = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FollowerSeries":
+        """Build the series store from the optional `RobloxWatchlist` section of config.json."""
+        section = config.get("RobloxWatchlist") or {}
+        return cls(
+            section.get("Path", "data/rblx_followers.sqlite3"),
+            min_interval=section.get("MinPointInterval", 3600),
+            retention_days=section.get("RetentionDays", 365),
+        )
+
+    async def _run(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _load_all(self) -> List[Tuple[int, int, int]]:
+        if self.retention_days:
+            with self._conn:
+                self._conn.execute("DELETE FROM follower_points WHERE ts < ?", (int(time.time() - self.retention_days * 86400),))
+        return self._conn.execute("SELECT user_id, ts, count FROM follower_points ORDER BY user_id, ts").fetchall()
+
+    async def load(self) -> None:
+        """Drop points past retention and read the rest into memory."""
+        self._tracks.clear()
+        for user_id, ts, count in await self._run(self._load_all):
+            track = self._tracks.get(user_id)
+            if track is None:
+                track = self._tracks[user_id] = _Track()
+            track.times.append(ts)
+            track.counts.append(count)
+            track.seen = ts
+
+    def append(self, user_id: int, count: int, ts: Optional[int] = None) -> bool:
+        """Record a polled count; returns True if it became a stored point."""
+        ts = int(time.time()) if ts is None else int(ts)
+        self.samples += 1
+        track = self._tracks.get(user_id)
+        if track is None:
+            track = self._tracks[user_id] = _Track()
+        if track.times and ts <= track.times[-1]:
+            return False
+        track.seen = max(track.seen, ts)
+        if track.counts and track.counts[-1] == count and ts - track.times[-1] < self.min_interval:
+            return False
+        track.times.append(ts)
+        track.counts.append(count)
+        self._pending.append((user_id, ts, count))
+        return True
+
+    def latest(self, user_id: int) -> Optional[Point]:
+        """`(last confirmed at, count)` for a user, or None with no history."""
+        track = self._tracks.get(user_id)
+        if track is None or not track.counts:
+            return None
+        return track.seen, track.counts[-1]
+
+    def at(self, user_id: int, ts: float) -> Optional[Point]:
+        """The last stored point at or before `ts`."""
+        track = self._tracks.get(user_id)
+        if track is None:
+            return None
+        i = bisect_right(track.times, ts)
+        return (track.times[i - 1], track.counts[i - 1]) if i else None
+
+    def points(self, user_id: int, since: float = 0) -> List[Point]:
+        """Stored points from `since` on, led by the last point before it as a baseline."""
+        track = self._tracks.get(user_id)
+        if track is None:
+            return []
+        i = max(bisect_right(track.times, since) - 1, 0)
+        return list(zip(track.times[i:], track.counts[i:]))
+
+    def delta(self, user_id: int, seconds: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Change over the last `seconds`; `partial` is set when history starts inside the range."""
+        latest = self.latest(user_id)
+        if latest is None:
+            return None
+        track = self._tracks[user_id]
+        since = (time.time() if now is None else now) - seconds
+        start = self.at(user_id, since)
+        partial = start is None
+        if start is None:
+            start = track.times[0], track.counts[0]
+        change = latest[1] - start[1]
+        return {
+            "start_ts": start[0],
+            "start": start[1],
+            "end_ts": latest[0],
+            "end": latest[1],
+            "change": change,
+            "percent": round(change / start[1] * 100, 2) if start[1] else None,
+            "partial": partial,
+        }
+
+    def forget(self, user_id: int) -> None:
+        """Stop holding a user's history in memory (rows stay on disk until retention drops them)."""
+        self._tracks.pop(user_id, None)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            await self._run(self._write, rows)
+        except Exception as e:
+            print(f"Follower series flush failed, will retry: {e}")
+            self._pending[:0] = rows
+            return
+        self.points_written += len(rows)
+
+    def _write(self, rows: List[Tuple[int, int, int]]) -> None:
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO follower_points (user_id, ts, count) VALUES (?, ?, ?)", rows)
+
+    def stats(self) -> Dict[str, Any]:
+        points = sum(len(track.times) for track in self._tracks.values())
+        return {
+            "users": len(self._tracks),
+            "points": points,
+            "samples": self.samples,
+            "points_written": self.points_written,
+            "pending": len(self._pending),
+            "memory_bytes": points * 16,
+        }
+
+    async def close(self) -> None:
+        await self.flush()
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,305 @@
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import yarl
+from discord.gateway import DiscordWebSocket
+from discord.member import Member
+
+try:
+    from src.modules.storage import Storage
+except ImportError:
+    from modules.storage import Storage
+
+# Events that change what discord.py caches. Messages, typing, presences and
+# interactions are not journaled: nothing has to be rebuilt from them.
+STATE_EVENTS = frozenset({
+    "GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE",
+    "GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE", "GUILD_ROLE_DELETE",
+    "GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE", "GUILD_MEMBER_REMOVE", "GUILD_MEMBERS_CHUNK",
+    "GUILD_EMOJIS_UPDATE", "GUILD_STICKERS_UPDATE",
+    "GUILD_SCHEDULED_EVENT_CREATE", "GUILD_SCHEDULED_EVENT_UPDATE", "GUILD_SCHEDULED_EVENT_DELETE",
+    "CHANNEL_CREATE", "CHANNEL_UPDATE", "CHANNEL_DELETE",
+    "THREAD_CREATE", "THREAD_UPDATE", "THREAD_DELETE", "THREAD_LIST_SYNC",
+    "THREAD_MEMBER_UPDATE", "THREAD_MEMBERS_UPDATE",
+    "STAGE_INSTANCE_CREATE", "STAGE_INSTANCE_UPDATE", "STAGE_INSTANCE_DELETE",
+    "VOICE_STATE_UPDATE", "USER_UPDATE",
+})
+_RESTORED_READY_TIMEOUT = 0.05  # a restored cache has every guild already queued; no need to wait for more
+
+class _Journal:
+    """One shard's session: id, resume URL and the state events since READY, in storage segments."""
+
+    __slots__ = ("key", "session_id", "resume_url", "shard_count", "base", "segment", "events", "stored", "dirty", "overflowed")
+
+    def __init__(self, key: str, shard_count: Optional[int]) -> None:
+        self.key = key
+        self.shard_count = shard_count
+        self.session_id: Optional[str] = None
+        self.resume_url: Optional[str] = None
+        self.base = 0  # index of the open segment; every one before it is already in storage
+        self.segment: List[list] = []
+        self.events = 0
+        self.stored = 0  # segments of this key in storage, including a previous session's
+        self.dirty = False
+        self.overflowed = False
+
+class GatewaySessions:
+    """Checkpoints gateway sessions so a restarted process RESUMEs instead of re-IDENTIFYing.
+
+    On every heartbeat each shard's session id, sequence number and resume
+    URL are written to the `gateway` storage namespace, together with a
+    journal of the state events (READY, guild/channel/role/member changes and
+    member chunks) received since READY, kept in `segment_size` event
+    segments so a checkpoint only rewrites the newest one. When the process
+    starts again and the checkpoint is younger than `max_age` seconds, the
+    journal is replayed through discord.py's parsers with events muted (so
+    the cache is rebuilt without re-running listeners) and the shard sends
+    RESUME: Discord then only sends what happened since the checkpoint. A
+    stale, foreign or rejected session falls back to a normal IDENTIFY.
+
+    A clean `close()` ends the session on Discord's side (close code 1000),
+    so `discard()` drops the checkpoints; only crashes and kills resume.
+    """
+
+    _installed = False
+
+    def __init__(self, storage: Storage, *, enabled: bool = True, max_age: float = 120.0, segment_size: int = 200, max_events: int = 100_000) -> None:
+        self.enabled = enabled
+        self.max_age = max_age
+        self.segment_size = segment_size
+        self.max_events = max_events
+        self._namespace = storage.namespace("gateway", cache=False)
+        self._journals: Dict[str, _Journal] = {}
+        self._ready_timeout: Optional[float] = None
+        self.checkpoints = 0
+        self.restored = 0
+        self.resumed = 0
+        self.rejected = 0
+        self.stale = 0
+        self.replayed_events = 0
+        self.replay_ms = 0.0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], storage: Storage) -> "GatewaySessions":
+        """Build the checkpointer from the optional `GatewaySession` section of config.json."""
+        section = config.get("GatewaySession") or {}
+        return cls(
+            storage,
+            enabled=section.get("Enabled", True),
+            max_age=section.get("MaxAge", 120.0),
+            segment_size=section.get("SegmentSize", 200),
+            max_events=section.get("MaxEvents", 100_000),
+        )
+
+    @classmethod
+    def install(cls) -> None:
+        """Route discord.py's websocket creation and heartbeats through the client's `gateway_sessions`."""
+        if cls._installed:
+            return
+        cls._installed = True
+        from_client = DiscordWebSocket.from_client.__func__
+        send_heartbeat = DiscordWebSocket.send_heartbeat
+
+        async def resuming_from_client(ws_cls, client, **kwargs: Any) -> DiscordWebSocket:
+            sessions: Optional[GatewaySessions] = getattr(client, "gateway_sessions", None)
+            if sessions is None or not sessions.enabled:
+                return await from_client(ws_cls, client, **kwargs)
+            if kwargs.get("initial") and not kwargs.get("resume"):
+                kwargs = await sessions.restore(client, kwargs)
+            ws = await from_client(ws_cls, client, **kwargs)
+            sessions.attach(ws)
+            return ws
+
+        async def checkpointing_heartbeat(ws: DiscordWebSocket, data: Any) -> None:
+            await send_heartbeat(ws, data)
+            sessions: Optional[GatewaySessions] = getattr(ws, "_gateway_sessions", None)
+            if sessions is not None:
+                await sessions.checkpoint(ws)
+
+        DiscordWebSocket.from_client = classmethod(resuming_from_client)
+        DiscordWebSocket.send_heartbeat = checkpointing_heartbeat
+
+    @staticmethod
+    def _key(shard_id: Optional[int]) -> str:
+        return str(shard_id or 0)
+
+    # ---------- startup ----------
+    async def restore(self, client: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the shard's cache from its checkpoint and turn the connect into a RESUME, if it's fresh."""
+        state = client._connection
+        key = self._key(kwargs.get("shard_id"))
+        journal = self._journals[key] = _Journal(key, state.shard_count)
+        record = await self._namespace.get(key)
+        if record is None:
+            return kwargs
+        journal.stored = record["segments"]
+        age = time.time() - record["saved_at"]
+        if age > self.max_age or record["shard_count"] != state.shard_count:
+            self.stale += 1
+            print(f"Gateway session for shard {key} is not resumable ({age:.0f} s old, {record['shard_count']} shards); identifying")
+            return kwargs
+
+        started = time.perf_counter()
+        entries: List[list] = []
+        for index in range(record["segments"]):
+            entries.extend(await self._namespace.get(f"{key}:{index}", []))
+        # A segment may have been written after events the session record doesn't cover yet;
+        # Discord re-sends those on RESUME, so they must not be applied twice
+        entries = [entry for entry in entries if entry[0] is None or entry[0] <= record["sequence"]]
+        if not entries or entries[0][1] != "READY":
+            return kwargs
+        self._replay(state, entries, kwargs.get("shard_id"))
+
+        journal.session_id = record["session_id"]
+        journal.resume_url = record["resume_url"]
+        journal.base = max((len(entries) - 1) // self.segment_size, 0)
+        journal.segment = entries[journal.base * self.segment_size:]
+        journal.events = len(entries)
+        self.restored += 1
+        self.replayed_events += len(entries)
+        self.replay_ms += (time.perf_counter() - started) * 1000
+        return {
+            **kwargs,
+            "resume": True,
+            "session": record["session_id"],
+            "sequence": record["sequence"],
+            "gateway": yarl.URL(record["resume_url"]),
+        }
+
+    def _replay(self, state: Any, entries: List[list], shard_id: Optional[int]) -> None:
+        """Feed journaled events to the parsers with dispatch muted: listeners already saw them."""
+        dispatch = state.dispatch
+        state.dispatch = lambda *args, **kwargs: None
+        if self._ready_timeout is None:
+            self._ready_timeout = state.guild_ready_timeout
+            state.guild_ready_timeout = _RESTORED_READY_TIMEOUT
+        try:
+            for _, event, data in entries:
+                if event == "GUILD_MEMBERS_CHUNK":
+                    self._replay_chunk(state, data)
+                else:
+                    state.parsers[event](data)
+        finally:
+            state.dispatch = dispatch
+        # parse_ready() started the task that fires on_ready once the guild queue goes quiet
+        tasks = getattr(state, "_ready_tasks", None)  # AutoShardedConnectionState keeps one per shard
+        task = tasks.get(shard_id) if tasks is not None else state._ready_task
+        if task is not None:
+            task.add_done_callback(lambda _: self._restore_ready_timeout(state))
+
+    @staticmethod
+    def _replay_chunk(state: Any, data: Mapping[str, Any]) -> None:
+        # A chunk only fills the cache through the request that asked for it; there is none after a restart
+        guild = state._get_guild(int(data["guild_id"]))
+        if guild is None:
+            return
+        for member in data.get("members", []):
+            guild._add_member(Member(guild=guild, data=member, state=state))
+
+    # ---------- live session ----------
+    def attach(self, ws: DiscordWebSocket) -> None:
+        """Journal the state events this websocket parses."""
+        key = self._key(ws.shard_id)
+        journal = self._journals.get(key) or self._journals.setdefault(key, _Journal(key, ws.shard_count))
+        state = ws._connection
+        parsers = dict(ws._discord_parsers)
+        for event in STATE_EVENTS | {"READY", "RESUMED"}:
+            if event in parsers:
+                parsers[event] = self._recorder(ws, state, journal, event, parsers[event])
+        ws._discord_parsers = parsers
+        ws._gateway_sessions = self
+
+    def _recorder(self, ws: DiscordWebSocket, state: Any, journal: _Journal, event: str, parse: Callable[[Any], None]) -> Callable[[Any], None]:
+        def record(data: Any) -> None:
+            if event == "READY":
+                self._reset(journal, ws)
+            elif event == "RESUMED":
+                self.resumed += 1
+                return parse(data)
+            elif event == "GUILD_MEMBERS_CHUNK" and not self._cached_chunk(state, data):
+                return parse(data)
+            self._append(journal, ws.sequence, event, data)
+            parse(data)
+        return record
+
+    @staticmethod
+    def _cached_chunk(state: Any, data: Mapping[str, Any]) -> bool:
+        guild_id, nonce = int(data["guild_id"]), data.get("nonce")
+        return any(request.cache and request.guild_id == guild_id and request.nonce == nonce for request in state._chunk_requests.values())
+
+    def _reset(self, journal: _Journal, ws: DiscordWebSocket) -> None:
+        if journal.session_id is not None and journal.session_id != ws.session_id and journal.events:
+            self.rejected += 1  # we resumed from a checkpoint but Discord made us identify
+        self._restore_ready_timeout(ws._connection)
+        journal.session_id = ws.session_id
+        journal.resume_url = str(ws.gateway)
+        journal.base, journal.segment, journal.events = 0, [], 0
+        journal.dirty = True
+        journal.overflowed = False
+
+    def _append(self, journal: _Journal, sequence: Optional[int], event: str, data: Any) -> None:
+        if journal.overflowed:
+            return
+        if journal.events >= self.max_events:
+            journal.overflowed = True
+            print(f"Gateway journal for shard {journal.key} passed {self.max_events} events; it will identify after a restart")
+            return
+        journal.segment.append([sequence, event, data])
+        journal.events += 1
+        journal.dirty = True
+
+    def _restore_ready_timeout(self, state: Any) -> None:
+        if self._ready_timeout is not None:
+            state.guild_ready_timeout, self._ready_timeout = self._ready_timeout, None
+
+    async def checkpoint(self, ws: DiscordWebSocket) -> None:
+        """Queue the shard's session record and any journal segments that changed (called after each heartbeat)."""
+        journal = self._journals.get(self._key(ws.shard_id))
+        if journal is None or journal.session_id is None or ws.session_id != journal.session_id:
+            return
+        if journal.overflowed:
+            return
+        key = journal.key
+        while len(journal.segment) > self.segment_size:
+            # Full segments are written once and dropped from memory
+            await self._namespace.set(f"{key}:{journal.base}", journal.segment[:self.segment_size])
+            journal.segment = journal.segment[self.segment_size:]
+            journal.base += 1
+        if journal.dirty:
+            await self._namespace.set(f"{key}:{journal.base}", list(journal.segment))
+            journal.dirty = False
+        segments = journal.base + 1
+        for index in range(segments, journal.stored):
+            await self._namespace.delete(f"{key}:{index}")  # left over from a longer, older session
+        journal.stored = segments
+        await self._namespace.set(key, {
+            "session_id": journal.session_id,
+            "sequence": ws.sequence,
+            "resume_url": journal.resume_url,
+            "shard_count": journal.shard_count,
+            "segments": segments,
+            "events": journal.events,
+            "saved_at": time.time(),
+        })
+        self.checkpoints += 1
+
+    async def discard(self) -> None:
+        """Forget every checkpoint and its journal segments; called on a clean close, which ends the sessions on Discord's side."""
+        for key, journal in self._journals.items():
+            await self._namespace.delete(key)
+            for index in range(max(journal.base + 1, journal.stored)):
+                await self._namespace.delete(f"{key}:{index}")
+            journal.stored = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "checkpoints": self.checkpoints,
+            "restored": self.restored,
+            "resumed": self.resumed,
+            "rejected": self.rejected,
+            "stale": self.stale,
+            "replayed_events": self.replayed_events,
+            "replay_ms": round(self.replay_ms, 1),
+            "journaled_events": sum(journal.events for journal in self._journals.values()),
+        }
@@ -0,0 +1,206 @@
+import bisect
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional
+
+import aiohttp
+
+# Upper bounds (ms) of the latency buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class LatencyHistogram:
+    """Fixed log-spaced latency buckets; cheap to update, good enough for p50/p99."""
+
+    __slots__ = ("counts", "total", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile (max latency for the last bucket)."""
+        if not self.total:
+            return None
+        rank = p / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 1) if self.total else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {f"le_{bound}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)} | {"inf": self.counts[-1]},
+        }
+
+class HostMetrics:
+    __slots__ = ("latency", "requests", "errors", "in_flight", "max_in_flight", "new_connections", "reused_connections", "pool_waits", "pool_wait_ms")
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.pool_waits = 0  # requests that had to queue for a free connection (pool saturated)
+        self.pool_wait_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "pool_waits": self.pool_waits,
+            "pool_wait_ms": round(self.pool_wait_ms, 1),
+            "latency": self.latency.to_dict(),
+        }
+
+class HttpClient:
+    """One pooled aiohttp session shared by every cog.
+
+    Connections are kept alive and capped per host, DNS answers are cached,
+    and all requests share one timeout policy. aiohttp trace hooks feed
+    per-host latency histograms, new-vs-reused connection counts and
+    pool-saturation counters, exposed through `stats()`.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hosts: Dict[str, HostMetrics] = {}
+        self.dns_hits = 0
+        self.dns_misses = 0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "HttpClient":
+        """Build the client from the optional `HttpClient` section of config.json."""
+        section = config.get("HttpClient") or {}
+        return cls(
+            limit=section.get("Limit", 100),
+            limit_per_host=section.get("LimitPerHost", 10),
+            keepalive_timeout=section.get("KeepAlive", 30.0),
+            dns_cache_ttl=section.get("DnsCacheTtl", 300),
+            timeout=section.get("Timeout", 10.0),
+            connect_timeout=section.get("ConnectTimeout", 5.0),
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session; created on first use inside the running loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[self._trace_config()])
+        return self._session
+
+    def get(self, url: str, **kwargs: Any):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        return self.session.post(url, **kwargs)
+
+    def _host(self, ctx: SimpleNamespace) -> HostMetrics:
+        metrics = self.hosts.get(ctx.host)
+        if metrics is None:
+            metrics = self.hosts[ctx.host] = HostMetrics()
+        return metrics
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params) -> None:
+            ctx.host = params.url.host or "?"
+            ctx.started = time.perf_counter()
+            metrics = self._host(ctx)
+            metrics.requests += 1
+            metrics.in_flight += 1
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+
+        async def on_request_end(session, ctx, params) -> None:
+            metrics = self._host(ctx)
+            metrics.in_flight -= 1
+            metrics.latency.record((time.perf_counter() - ctx.started) * 1000)
+
+        async def on_request_exception(session, ctx, params) -> None:
+            metrics = self._host(ctx)
+            metrics.in_flight -= 1
+            metrics.errors += 1
+
+        async def on_queued_start(session, ctx, params) -> None:
+            ctx.queued = time.perf_counter()
+            self._host(ctx).pool_waits += 1
+
+        async def on_queued_end(session, ctx, params) -> None:
+            self._host(ctx).pool_wait_ms += (time.perf_counter() - ctx.queued) * 1000
+
+        async def on_create_end(session, ctx, params) -> None:
+            self._host(ctx).new_connections += 1
+
+        async def on_reuse(session, ctx, params) -> None:
+            self._host(ctx).reused_connections += 1
+
+        async def on_dns_hit(session, ctx, params) -> None:
+            self.dns_hits += 1
+
+        async def on_dns_miss(session, ctx, params) -> None:
+            self.dns_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_queued_start.append(on_queued_start)
+        trace.on_connection_queued_end.append(on_queued_end)
+        trace.on_connection_create_end.append(on_create_end)
+        trace.on_connection_reuseconn.append(on_reuse)
+        trace.on_dns_cache_hit.append(on_dns_hit)
+        trace.on_dns_cache_miss.append(on_dns_miss)
+        return trace
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_cache_hits": self.dns_hits,
+            "dns_cache_misses": self.dns_misses,
+            "hosts": {host: metrics.to_dict() for host, metrics in self.hosts.items()},
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,277 @@
+import typing
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import discord
+from discord.ext import commands
+
+# Gateway events Discord only sends with one of these intents
+EVENT_INTENTS: Dict[str, Tuple[str, ...]] = {
+    "GUILD_MEMBER_ADD": ("members",),
+    "GUILD_MEMBER_UPDATE": ("members",),
+    "GUILD_MEMBER_REMOVE": ("members",),
+    "GUILD_BAN_ADD": ("moderation",),
+    "GUILD_BAN_REMOVE": ("moderation",),
+    "GUILD_AUDIT_LOG_ENTRY_CREATE": ("moderation",),
+    "GUILD_EMOJIS_UPDATE": ("emojis_and_stickers",),
+    "GUILD_STICKERS_UPDATE": ("emojis_and_stickers",),
+    "GUILD_INTEGRATIONS_UPDATE": ("integrations",),
+    "INTEGRATION_CREATE": ("integrations",),
+    "INTEGRATION_UPDATE": ("integrations",),
+    "INTEGRATION_DELETE": ("integrations",),
+    "WEBHOOKS_UPDATE": ("webhooks",),
+    "INVITE_CREATE": ("invites",),
+    "INVITE_DELETE": ("invites",),
+    "VOICE_STATE_UPDATE": ("voice_states",),
+    "PRESENCE_UPDATE": ("presences",),
+    "MESSAGE_CREATE": ("guild_messages", "dm_messages"),
+    "MESSAGE_UPDATE": ("guild_messages", "dm_messages"),
+    "MESSAGE_DELETE": ("guild_messages", "dm_messages"),
+    "MESSAGE_DELETE_BULK": ("guild_messages",),
+    "MESSAGE_REACTION_ADD": ("guild_reactions", "dm_reactions"),
+    "MESSAGE_REACTION_REMOVE": ("guild_reactions", "dm_reactions"),
+    "MESSAGE_REACTION_REMOVE_ALL": ("guild_reactions", "dm_reactions"),
+    "MESSAGE_REACTION_REMOVE_EMOJI": ("guild_reactions", "dm_reactions"),
+    "TYPING_START": ("guild_typing", "dm_typing"),
+    "GUILD_SCHEDULED_EVENT_CREATE": ("guild_scheduled_events",),
+    "GUILD_SCHEDULED_EVENT_UPDATE": ("guild_scheduled_events",),
+    "GUILD_SCHEDULED_EVENT_DELETE": ("guild_scheduled_events",),
+    "GUILD_SCHEDULED_EVENT_USER_ADD": ("guild_scheduled_events",),
+    "GUILD_SCHEDULED_EVENT_USER_REMOVE": ("guild_scheduled_events",),
+    "AUTO_MODERATION_RULE_CREATE": ("auto_moderation_configuration",),
+    "AUTO_MODERATION_RULE_UPDATE": ("auto_moderation_configuration",),
+    "AUTO_MODERATION_RULE_DELETE": ("auto_moderation_configuration",),
+    "AUTO_MODERATION_ACTION_EXECUTION": ("auto_moderation_execution",),
+    "MESSAGE_POLL_VOTE_ADD": ("guild_polls", "dm_polls"),
+    "MESSAGE_POLL_VOTE_REMOVE": ("guild_polls", "dm_polls"),
+}
+
+# discord.py event (listener name without "on_") -> the gateway events it is built from
+LISTENER_EVENTS: Dict[str, Tuple[str, ...]] = {
+    "message": ("MESSAGE_CREATE",),
+    "message_edit": ("MESSAGE_UPDATE",),
+    "raw_message_edit": ("MESSAGE_UPDATE",),
+    "message_delete": ("MESSAGE_DELETE",),
+    "raw_message_delete": ("MESSAGE_DELETE",),
+    "bulk_message_delete": ("MESSAGE_DELETE_BULK",),
+    "raw_bulk_message_delete": ("MESSAGE_DELETE_BULK",),
+    "reaction_add": ("MESSAGE_REACTION_ADD",),
+    "raw_reaction_add": ("MESSAGE_REACTION_ADD",),
+    "reaction_remove": ("MESSAGE_REACTION_REMOVE",),
+    "raw_reaction_remove": ("MESSAGE_REACTION_REMOVE",),
+    "reaction_clear": ("MESSAGE_REACTION_REMOVE_ALL",),
+    "raw_reaction_clear": ("MESSAGE_REACTION_REMOVE_ALL",),
+    "reaction_clear_emoji": ("MESSAGE_REACTION_REMOVE_EMOJI",),
+    "raw_reaction_clear_emoji": ("MESSAGE_REACTION_REMOVE_EMOJI",),
+    "typing": ("TYPING_START",),
+    "raw_typing": ("TYPING_START",),
+    "presence_update": ("PRESENCE_UPDATE",),
+    "member_join": ("GUILD_MEMBER_ADD",),
+    "member_remove": ("GUILD_MEMBER_REMOVE",),
+    "raw_member_remove": ("GUILD_MEMBER_REMOVE",),
+    "member_update": ("GUILD_MEMBER_UPDATE",),
+    "user_update": ("GUILD_MEMBER_UPDATE",),
+    "member_ban": ("GUILD_BAN_ADD",),
+    "member_unban": ("GUILD_BAN_REMOVE",),
+    "audit_log_entry_create": ("GUILD_AUDIT_LOG_ENTRY_CREATE",),
+    "guild_emojis_update": ("GUILD_EMOJIS_UPDATE",),
+    "guild_stickers_update": ("GUILD_STICKERS_UPDATE",),
+    "guild_integrations_update": ("GUILD_INTEGRATIONS_UPDATE",),
+    "integration_create": ("INTEGRATION_CREATE",),
+    "integration_update": ("INTEGRATION_UPDATE",),
+    "raw_integration_delete": ("INTEGRATION_DELETE",),
+    "webhooks_update": ("WEBHOOKS_UPDATE",),
+    "invite_create": ("INVITE_CREATE",),
+    "invite_delete": ("INVITE_DELETE",),
+    "voice_state_update": ("VOICE_STATE_UPDATE",),
+    "scheduled_event_create": ("GUILD_SCHEDULED_EVENT_CREATE",),
+    "scheduled_event_update": ("GUILD_SCHEDULED_EVENT_UPDATE",),
+    "scheduled_event_delete": ("GUILD_SCHEDULED_EVENT_DELETE",),
+    "scheduled_event_user_add": ("GUILD_SCHEDULED_EVENT_USER_ADD",),
+    "raw_scheduled_event_user_add": ("GUILD_SCHEDULED_EVENT_USER_ADD",),
+    "scheduled_event_user_remove": ("GUILD_SCHEDULED_EVENT_USER_REMOVE",),
+    "raw_scheduled_event_user_remove": ("GUILD_SCHEDULED_EVENT_USER_REMOVE",),
+    "automod_rule_create": ("AUTO_MODERATION_RULE_CREATE",),
+    "automod_rule_update": ("AUTO_MODERATION_RULE_UPDATE",),
+    "automod_rule_delete": ("AUTO_MODERATION_RULE_DELETE",),
+    "automod_action": ("AUTO_MODERATION_ACTION_EXECUTION",),
+    "poll_vote_add": ("MESSAGE_POLL_VOTE_ADD",),
+    "raw_poll_vote_add": ("MESSAGE_POLL_VOTE_ADD",),
+    "poll_vote_remove": ("MESSAGE_POLL_VOTE_REMOVE",),
+    "raw_poll_vote_remove": ("MESSAGE_POLL_VOTE_REMOVE",),
+}
+
+# Keep discord.py's caches (members, voice, emojis, scheduled events) current; never dropped
+CACHE_EVENTS = frozenset({
+    "GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE", "GUILD_MEMBER_REMOVE", "VOICE_STATE_UPDATE",
+    "GUILD_EMOJIS_UPDATE", "GUILD_STICKERS_UPDATE",
+    "GUILD_SCHEDULED_EVENT_CREATE", "GUILD_SCHEDULED_EVENT_UPDATE", "GUILD_SCHEDULED_EVENT_DELETE",
+})
+# Keep discord.py's message cache (`max_messages`) current; only dropped when that cache is off
+MESSAGE_CACHE_EVENTS = frozenset({
+    "MESSAGE_UPDATE", "MESSAGE_DELETE", "MESSAGE_DELETE_BULK",
+    "MESSAGE_REACTION_ADD", "MESSAGE_REACTION_REMOVE", "MESSAGE_REACTION_REMOVE_ALL", "MESSAGE_REACTION_REMOVE_EMOJI",
+    "MESSAGE_POLL_VOTE_ADD", "MESSAGE_POLL_VOTE_REMOVE",
+})
+ROUTED_EVENTS = frozenset(EVENT_INTENTS) - CACHE_EVENTS
+
+# What Bot.__init__ always asked for before intents were derived
+LEGACY_INTENTS = ("message_content", "typing", "presences", "members")
+
+def legacy_intents() -> discord.Intents:
+    intents = discord.Intents.default()
+    for name in LEGACY_INTENTS:
+        setattr(intents, name, True)
+    return intents
+
+def _takes_member(converter: Any) -> bool:
+    """Whether a command parameter converts to a Member (the converter queries the gateway, which needs `members`)."""
+    if converter in (discord.Member, commands.MemberConverter) or isinstance(converter, commands.MemberConverter):
+        return True
+    return any(_takes_member(arg) for arg in typing.get_args(converter))
+
+class IntentPlanner:
+    """Derives the gateway intents from what the loaded extensions use, and drops events nobody uses.
+
+    Listeners declare their gateway events implicitly (`on_raw_reaction_add`
+    needs MESSAGE_REACTION_ADD, hence `guild_reactions`/`dm_reactions`), so
+    do prefix commands (`message_content`) and Member parameters
+    (`members`, for the converter's gateway query). Anything else a cog
+    relies on goes in class attributes:
+
+        gateway_intents = ("members",)        # reads guild.members
+        gateway_events = ("MESSAGE_CREATE",)  # bot.wait_for("message")
+
+    Deferred extensions are covered by their manifest entry: its `Events`
+    are registered as listeners, and an optional `Intents` list is added.
+    With `minimal` off the bot keeps the intents it always had. Intents are
+    fixed at IDENTIFY, so declarations are read once, after the extensions
+    load. With `drop_undeclared`, events that arrive anyway (MESSAGE_UPDATE
+    with `guild_messages`, or everything when `minimal` is off) but that no
+    listener or declaration asked for are dropped right after the JSON is
+    parsed, before discord.py builds models or dispatches. Events that keep
+    the member, voice, emoji or scheduled-event caches current always pass.
+    So do edits, deletes, reactions and poll votes while discord.py keeps a
+    message cache, or the messages in it would go stale; a bot that doesn't
+    read cached messages can pass `max_messages=None` to drop those too.
+    """
+
+    def __init__(self, *, minimal: bool = True, extra: Iterable[str] = (), drop_undeclared: bool = True) -> None:
+        extra = tuple(extra)
+        for name in extra:
+            if name not in discord.Intents.VALID_FLAGS:
+                raise ValueError(f"Unknown intent '{name}' (expected one of {', '.join(sorted(discord.Intents.VALID_FLAGS))}).")
+        self.minimal = minimal
+        self.extra = extra
+        self.drop_undeclared = drop_undeclared
+        self.intents: Optional[discord.Intents] = None
+        self.events: Set[str] = set()
+        self.sources: Dict[str, List[str]] = {}  # intent -> what needed it
+        self.dropped: Counter = Counter()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "IntentPlanner":
+        """Build from the optional `Intents` section of config.json."""
+        section = config.get("Intents") or {}
+        return cls(
+            minimal=section.get("Minimal", True),
+            extra=section.get("Extra") or (),
+            drop_undeclared=section.get("DropUndeclared", True),
+        )
+
+    def declared(self, bot: commands.Bot, deferred: Optional[Mapping[str, Mapping[str, Any]]] = None) -> Tuple[Set[str], Dict[str, List[str]]]:
+        """Gateway events the bot listens to and intents it needs, each intent with the cogs/listeners that asked for it."""
+        events: Set[str] = set()
+        needs: Dict[str, List[str]] = {"guilds": ["discord.py cache"]}
+
+        def need(intent: str, source: str) -> None:
+            needs.setdefault(intent, []).append(source)
+
+        def listen(event: str, source: str) -> None:
+            events.add(event)
+            for intent in EVENT_INTENTS.get(event, ()):
+                need(intent, source)
+
+        listeners = {name for name in bot.extra_events}
+        listeners.update(name for name in dir(type(bot)) if name.startswith("on_"))
+        for name in sorted(listeners):
+            for event in LISTENER_EVENTS.get(name[3:], ()):
+                listen(event, name)
+
+        for cog_name, cog in bot.cogs.items():
+            for event in getattr(cog, "gateway_events", ()):
+                listen(event, cog_name)
+            for intent in getattr(cog, "gateway_intents", ()):
+                need(intent, cog_name)
+        for short, entry in (deferred or {}).items():
+            for intent in entry.get("Intents") or ():
+                need(intent, short)
+
+        if bot.commands:
+            need("message_content", "prefix commands")
+        for command in bot.walk_commands():
+            if any(_takes_member(param.converter) for param in command.clean_params.values()):
+                need("members", f"{command.qualified_name} (Member argument)")
+        for intent in self.extra:
+            need(intent, "config")
+        return events, needs
+
+    def plan(self, bot: commands.Bot, deferred: Optional[Mapping[str, Mapping[str, Any]]] = None) -> discord.Intents:
+        """The intents to IDENTIFY with: the declared set, or the legacy one with `minimal` off."""
+        self.events, self.sources = self.declared(bot, deferred)
+        if not self.minimal:
+            intents = legacy_intents()
+            for name in self.extra:
+                setattr(intents, name, True)
+            return intents
+        intents = discord.Intents.none()
+        for name in self.sources:
+            setattr(intents, name, True)
+        return intents
+
+    def apply(self, bot: commands.Bot, deferred: Optional[Mapping[str, Mapping[str, Any]]] = None) -> discord.Intents:
+        """Switch the (not yet connected) bot to the planned intents and install the event router."""
+        intents = self.intents = self.plan(bot, deferred)
+        state = bot._connection
+        # What ConnectionState.__init__ derives from the intents it was built with
+        state._intents = intents
+        state.member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+        state._chunk_guilds = intents.members
+        if not intents.members or state.member_cache_flags._empty:
+            state.store_user = state.store_user_no_intents
+        else:
+            state.__dict__.pop("store_user", None)
+        state.raw_presence_flag = not intents.members and intents.presences
+        if self.drop_undeclared:
+            self.route(state.parsers, message_cache=state._messages is not None)
+
+        enabled = [name for name, value in intents if value]
+        skipped = [name for name in LEGACY_INTENTS if not getattr(intents, name)]
+        print(f"Gateway intents: {', '.join(enabled)}" + (f" (not needed: {', '.join(skipped)})" if skipped else ""))
+        return intents
+
+    def route(self, parsers: Dict[str, Callable[[Any], None]], *, message_cache: bool = True) -> List[str]:
+        """Replace the parsers of undeclared events with a counter; returns the events now dropped."""
+        routed = ROUTED_EVENTS - MESSAGE_CACHE_EVENTS if message_cache else ROUTED_EVENTS
+        dropped = sorted(event for event in routed - self.events if event in parsers)
+        for event in dropped:
+            parsers[event] = self._dropper(event)
+        return dropped
+
+    def _dropper(self, event: str) -> Callable[[Any], None]:
+        dropped = self.dropped
+
+        def drop(data: Any) -> None:
+            dropped[event] += 1
+
+        return drop
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "intents": self.intents.value if self.intents is not None else None,
+            "enabled": [name for name, value in self.intents if value] if self.intents is not None else [],
+            "sources": self.sources,
+            "listened_events": sorted(self.events),
+            "dropped_events": sum(self.dropped.values()),
+            "dropped": dict(self.dropped),
+        }
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class JoinBatcher(Generic[T]):
+    """Adaptive batching for per-member announcements.
+
+    While the observed join rate stays below `rate_threshold` (joins/second,
+    averaged over `rate_window` seconds) and no earlier send is still waiting
+    on the channel, every item goes straight to `send_single`. Otherwise items
+    are held for at most `window` seconds (never longer than `target_latency`)
+    or until `max_batch` items are pending, then handed to `send_batch` in one
+    call — one API request instead of one per member.
+    """
+
+    def __init__(
+        self,
+        send_single: Callable[[T], Awaitable[None]],
+        send_batch: Callable[[List[T]], Awaitable[None]],
+        *,
+        rate_threshold: float = 2.0,
+        rate_window: float = 10.0,
+        window: float = 3.0,
+        max_batch: int = 40,
+        target_latency: float = 5.0,
+    ) -> None:
+        self._send_single = send_single
+        self._send_batch = send_batch
+        self.rate_threshold = rate_threshold
+        self.rate_window = rate_window
+        self.window = min(window, target_latency)
+        self.max_batch = max_batch
+        self.target_latency = target_latency
+        self._joins: Deque[float] = deque()
+        self._pending: List[Tuple[float, T]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._inflight = 0
+        self.items = 0
+        self.api_calls = 0
+        self.batches = 0
+        self.max_latency = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], send_single: Callable[[T], Awaitable[None]], send_batch: Callable[[List[T]], Awaitable[None]]) -> "JoinBatcher[T]":
+        """Build a batcher from the optional `WelcomeBatching` section of config.json."""
+        section = config.get("WelcomeBatching") or {}
+        return cls(
+            send_single,
+            send_batch,
+            rate_threshold=section.get("RateThreshold", 2.0),
+            rate_window=section.get("RateWindow", 10.0),
+            window=section.get("Window", 3.0),
+            max_batch=section.get("MaxBatch", 40),
+            target_latency=section.get("TargetLatency", 5.0),
+        )
+
+    @property
+    def rate(self) -> float:
+        """Joins per second over the last `rate_window` seconds."""
+        cutoff = time.monotonic() - self.rate_window
+        while self._joins and self._joins[0] < cutoff:
+            self._joins.popleft()
+        return len(self._joins) / self.rate_window
+
+    async def submit(self, item: T) -> None:
+        now = time.monotonic()
+        self._joins.append(now)
+        self.items += 1
+
+        if not self._pending and not self._inflight and self.rate <= self.rate_threshold:
+            await self._call(self._send_single, item, started=(now,))
+            return
+
+        self._pending.append((now, item))
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send everything that is pending as one batch."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        self.batches += 1
+        started = tuple(ts for ts, _ in pending)
+        items = [item for _, item in pending]
+        await self._call(self._send_batch, items, started=started)
+
+    async def _call(self, func: Callable[[Any], Awaitable[None]], arg: Any, *, started: Tuple[float, ...]) -> None:
+        self._inflight += 1
+        try:
+            await func(arg)
+        finally:
+            self._inflight -= 1
+            self.api_calls += 1
+            self.max_latency = max(self.max_latency, time.monotonic() - min(started))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "api_calls": self.api_calls,
+            "batches": self.batches,
+            "calls_saved": self.items - self.api_calls - len(self._pending),
+            "pending": len(self._pending),
+            "join_rate": round(self.rate, 2),
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+        }
+
+    async def close(self) -> None:
+        """Flush anything still pending (used on cog unload)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
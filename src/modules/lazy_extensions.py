@@ -0,0 +1,154 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from discord.ext import commands
+
+try:
+    from src.modules.startup import StartupReport, rss_bytes
+except ImportError:
+    from modules.startup import StartupReport, rss_bytes
+
+class LazyExtensions:
+    """Defers rarely used extensions until one of their commands is invoked.
+
+    The manifest (the `LazyExtensions.Manifest` config section) maps an
+    extension's short name to the commands and, optionally, the events that
+    should pull it in:
+
+        "botinfo": {"Commands": {"botinfo": ["botstats"]}}
+
+    An entry may also list the gateway `Intents` the extension needs beyond
+    its events (the `IntentPlanner` can't inspect a module it never loaded).
+
+    For each entry a stub prefix command (with the same aliases) is
+    registered instead of importing the module. The first invocation removes
+    the stubs, loads the real extension and runs the real command in the same
+    invocation; event stubs hand the event to the extension's own listeners.
+    If the load fails the stubs are put back, so the next use retries.
+    Import time and the resident-memory delta of every lazy load are recorded
+    in the startup report.
+    """
+
+    def __init__(self, bot: commands.Bot, manifest: Mapping[str, Mapping[str, Any]], report: Optional[StartupReport] = None) -> None:
+        self.bot = bot
+        self.manifest = manifest
+        self.report = report
+        self._deferred: Dict[str, str] = {}  # short name -> full extension name
+        self._stubs: Dict[str, List[commands.Command]] = {}
+        self._listeners: Dict[str, List[tuple]] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.loaded: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(cls, bot: commands.Bot, config: Mapping[str, Any], report: Optional[StartupReport] = None) -> Optional["LazyExtensions"]:
+        """Build from the optional `LazyExtensions` section; None when lazy mode is off."""
+        section = config.get("LazyExtensions") or {}
+        if not section.get("Enabled", False):
+            return None
+        return cls(bot, section.get("Manifest") or {}, report)
+
+    def split(self, names: Iterable[str]) -> List[str]:
+        """Return the extensions to load eagerly; the rest are remembered for `install()`."""
+        eager: List[str] = []
+        for name in names:
+            short = name.rsplit(".", 1)[-1]
+            if short in self.manifest:
+                self._deferred[short] = name
+            else:
+                eager.append(name)
+        return eager
+
+    def install(self) -> None:
+        """Register stub commands/listeners for every deferred extension."""
+        for short, name in self._deferred.items():
+            entry = self.manifest[short]
+            for command_name, aliases in (entry.get("Commands") or {}).items():
+                stub = self._make_stub(short, command_name, list(aliases))
+                self.bot.add_command(stub)
+                self._stubs.setdefault(short, []).append(stub)
+            for event in entry.get("Events") or ():
+                listener = self._make_listener(short, event)
+                self.bot.add_listener(listener, event)
+                self._listeners.setdefault(short, []).append((listener, event))
+            if self.report is not None:
+                self.report.record(name, deferred=True)
+        if self._deferred:
+            print(f"Deferred extensions until first use: {', '.join(sorted(self._deferred))}")
+
+    def deferred(self) -> Dict[str, Mapping[str, Any]]:
+        """Manifest entries of the extensions that are still deferred."""
+        return {short: self.manifest[short] for short in self._deferred}
+
+    def _make_stub(self, short: str, command_name: str, aliases: List[str]) -> commands.Command:
+        async def stub(ctx: commands.Context) -> None:
+            await self.ensure_loaded(short)
+            # Re-parse the original message now that the real command is registered, and run it
+            # inside this invocation (Bot.invoke already timed it and dispatches its outcome)
+            real_ctx = await self.bot.get_context(ctx.message)
+            if real_ctx.command is None:
+                raise commands.CommandNotFound(f'Command "{ctx.invoked_with}" is not found')
+            await real_ctx.command.invoke(real_ctx)
+
+        return commands.Command(stub, name=command_name, aliases=aliases, help=f"Loads the {short} extension on first use.")
+
+    def _make_listener(self, short: str, event: str):
+        name = self._deferred[short]
+
+        async def listener(*args: Any) -> None:
+            if short not in self._deferred:
+                return
+            await self.ensure_loaded(short)
+            # Only the extension's own listeners missed this event; the rest already saw it
+            for handler in list(self.bot.extra_events.get(event, ())):
+                if handler.__module__ == name or handler.__module__.startswith(name + "."):
+                    await handler(*args)
+
+        return listener
+
+    async def ensure_loaded(self, short: str) -> None:
+        """Load a deferred extension once; concurrent callers share the same load."""
+        if short not in self._deferred:
+            return
+        task = self._loading.get(short)
+        if task is None:
+            task = asyncio.create_task(self._load(short))
+            self._loading[short] = task
+        await asyncio.shield(task)
+
+    async def _load(self, short: str) -> None:
+        name = self._deferred[short]
+        # The real commands take the stubs' names, so the stubs go first (and come back on failure)
+        stubs = self._stubs.pop(short, [])
+        listeners = self._listeners.pop(short, [])
+        for stub in stubs:
+            self.bot.remove_command(stub.name)
+        for listener, event in listeners:
+            self.bot.remove_listener(listener, event)
+
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            await self.bot.load_extension(name)
+        except Exception as e:
+            print(f"Failed to lazy-load extension {short}, will retry on next use: {e}")
+            for stub in stubs:
+                self.bot.add_command(stub)
+            for listener, event in listeners:
+                self.bot.add_listener(listener, event)
+            self._stubs[short], self._listeners[short] = stubs, listeners
+            raise
+        finally:
+            self._loading.pop(short, None)
+        del self._deferred[short]
+        stats = {
+            "lazy_load_ms": round((time.perf_counter() - started) * 1000, 2),
+            "rss_delta_kb": max(0, rss_bytes() - rss_before) // 1024,
+        }
+        self.loaded[short] = stats
+        if self.report is not None:
+            self.report.record(name, deferred=False, **stats)
+        print(f"Lazy-loaded extension {short} in {stats['lazy_load_ms']} ms (+{stats['rss_delta_kb']} KiB RSS)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"deferred": sorted(self._deferred), "loaded": self.loaded}
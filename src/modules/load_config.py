@@ -1,12 +1,15 @@
+import asyncio
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 class JsonLoader:
     def __init__(self, path: str = 'config.json') -> None:
         self.path: Optional[str, Path] = path
-        self.config: Optional[Dict[str, Any]] = self.load()
-        
+        self.config: Optional[Dict[str, Any]] = None  # filled by load(); not read eagerly
+
     def load(self) -> Dict[str, Any]:
         """Load and return the bot configuration from a JSON file."""
         if self.path is None:
@@ -17,6 +20,109 @@ class JsonLoader:
             raise RuntimeError(f"Configuration file '{config_path}' not found.")
         try:
             with config_path.open(encoding='utf-8') as file:
-                return json.load(file)
+                self.config = json.load(file)
+                return self.config
         except json.JSONDecodeError as e:
-            raise RuntimeError(f"Invalid JSON in '{config_path}': {e}")
\ No newline at end of file
+            raise RuntimeError(f"Invalid JSON in '{config_path}': {e}")
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+ConfigSubscriber = Callable[[Mapping[str, Any]], Any]
+
+class ConfigService:
+    """Process-wide, parse-once view of a JSON config file.
+
+    `snapshot` is an immutable mapping shared by every reader, so lookups cost
+    a dict access instead of a disk read and JSON parse. `reload()` re-parses
+    only when the file's mtime/size changed, and `start_watching()` polls for
+    that in the background. Subscribers are called with the new snapshot after
+    every successful reload.
+    """
+
+    _instances: Dict[Path, "ConfigService"] = {}
+
+    def __init__(self, path: str = 'config.json') -> None:
+        self._loader = JsonLoader(path)
+        self.path = Path(path).expanduser().resolve()
+        self._stamp: Optional[Tuple[float, int]] = None
+        self._subscribers: List[ConfigSubscriber] = []
+        self._watcher: Optional[asyncio.Task] = None
+        self.snapshot: Mapping[str, Any] = MappingProxyType({})
+        self.reloads = 0
+        self.reload(force=True)
+
+    @classmethod
+    def shared(cls, path: str = 'config.json') -> "ConfigService":
+        """Return the shared service for `path`, parsing the file on first use."""
+        key = Path(path).expanduser().resolve()
+        if key not in cls._instances:
+            cls._instances[key] = cls(path)
+        return cls._instances[key]
+
+    # Mapping-style access always reads the latest snapshot
+    def __getitem__(self, key: str) -> Any:
+        return self.snapshot[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.snapshot
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.snapshot.get(key, default)
+
+    def _file_stamp(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime, stat.st_size)
+
+    def reload(self, *, force: bool = False) -> bool:
+        """Re-parse the file if it changed; returns True when a new snapshot was published."""
+        stamp = self._file_stamp()
+        if not force and stamp == self._stamp:
+            return False
+        try:
+            snapshot = _freeze(self._loader.load())
+        except RuntimeError as e:
+            if force and not self.snapshot:
+                raise
+            # Keep serving the last good snapshot (e.g. the file is mid-edit)
+            print(f"Config reload failed, keeping previous config: {e}")
+            self._stamp = stamp
+            return False
+        self._stamp = stamp
+        self.snapshot = snapshot
+        self.reloads += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Config subscriber {callback!r} failed: {e}")
+        return True
+
+    def subscribe(self, callback: ConfigSubscriber) -> Callable[[], None]:
+        """Call `callback(snapshot)` after each reload; returns a function that unsubscribes."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def start_watching(self, interval: float = 5.0) -> None:
+        """Poll the file's mtime every `interval` seconds and hot-reload on change."""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self._file_stamp() != self._stamp:
+                self.reload()
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
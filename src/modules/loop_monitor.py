@@ -0,0 +1,251 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from src.modules.metrics import HdrHistogram
+except ImportError:
+    from modules.metrics import HdrHistogram
+
+ROOT = str(Path(__file__).resolve().parents[2])
+_UNSAMPLED = "unknown (ended before the watchdog sampled it)"
+
+class _Site:
+    """Stalls blamed on one code location: counts, blocked time and the last stack seen there."""
+
+    __slots__ = ("count", "blocked", "max", "task", "stack")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.blocked = 0.0
+        self.max = 0.0
+        self.task = ""
+        self.stack: List[str] = []
+
+    def add(self, blocked: float, task: str, stack: List[str]) -> None:
+        self.count += 1
+        self.blocked += blocked
+        self.max = max(self.max, blocked)
+        self.task = task
+        self.stack = stack
+
+class _Window:
+    __slots__ = ("started", "lag", "sites")
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.lag = HdrHistogram()
+        self.sites: Dict[str, _Site] = {}
+
+class LoopMonitor:
+    """Continuous event-loop lag measurement with stack samples of whatever blocked it.
+
+    A ticker task sleeps `interval` and records how late it woke up. A
+    watchdog thread watches the ticker's heartbeat; once it is `threshold`
+    overdue the loop thread is still inside the offending callback, so the
+    watchdog grabs that thread's stack and the task it is running. When the
+    ticker finally runs, the full stall is filed under the innermost frame
+    from this repo. Lag histograms and per-site totals are kept per `window`
+    seconds for the last `windows` windows, so `report()` is a rolling view.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        interval: float = 0.25,
+        threshold: float = 0.1,
+        warn_after: float = 1.0,
+        window: float = 60.0,
+        windows: int = 60,
+        max_stalls: int = 50,
+        stack_depth: int = 12,
+    ) -> None:
+        self.enabled = enabled
+        self.interval = interval
+        self.threshold = threshold
+        self.warn_after = warn_after
+        self.window = window
+        self.stack_depth = stack_depth
+        self.ticks = 0
+        self.stalls = 0
+        self.blocked = 0.0
+        self.unsampled = 0
+        self._windows: Deque[_Window] = deque(maxlen=windows)
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self._heartbeat: Tuple[int, float] = (0, 0.0)
+        self._pending: Optional[Tuple[int, str, List[str]]] = None
+        self._sampled = -1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "LoopMonitor":
+        """Build the monitor from the optional `LoopMonitor` section of config.json."""
+        section = config.get("LoopMonitor") or {}
+        return cls(
+            enabled=section.get("Enabled", True),
+            interval=section.get("Interval", 0.25),
+            threshold=section.get("Threshold", 0.1),
+            warn_after=section.get("WarnAfter", 1.0),
+            window=section.get("Window", 60.0),
+            windows=section.get("Windows", 60),
+            max_stalls=section.get("MaxStalls", 50),
+            stack_depth=section.get("StackDepth", 12),
+        )
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        """Start the ticker on the running loop and the watchdog thread."""
+        if not self.enabled or self._ticker is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = (0, time.monotonic())
+        self._stop.clear()
+        self._ticker = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        if self._ticker is None:
+            return
+        self._stop.set()
+        self._ticker.cancel()
+        try:
+            await self._ticker
+        except asyncio.CancelledError:
+            pass
+        self._ticker = None
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+
+    # ---------- loop side ----------
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            beat = self._heartbeat[0]
+            self._heartbeat = (beat + 1, now)
+            self.ticks += 1
+            window = self._current_window(now)
+            window.lag.record(lag)
+            if lag >= self.threshold:
+                self._file_stall(beat, lag, window)
+
+    def _current_window(self, now: float) -> _Window:
+        if not self._windows or now - self._windows[-1].started >= self.window:
+            self._windows.append(_Window(now))
+        return self._windows[-1]
+
+    def _file_stall(self, beat: int, lag: float, window: _Window) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None and pending[0] == beat:
+            _, task, stack = pending
+            site = self._site(stack)
+        else:
+            task, stack, site = "", [], _UNSAMPLED
+            self.unsampled += 1
+        self.stalls += 1
+        self.blocked += lag
+        window.sites.setdefault(site, _Site()).add(lag, task, stack)
+        self._recent.append({"at": time.time(), "blocked_ms": round(lag * 1000, 1), "site": site, "task": task, "stack": stack})
+        if lag >= self.warn_after:
+            print(f"Event loop blocked for {lag * 1000:.0f} ms by {task or 'a callback'} at {site}")
+
+    @staticmethod
+    def _site(stack: List[str]) -> str:
+        """Innermost frame in this repo's code (the caller of the blocking library), else the innermost frame."""
+        for line in reversed(stack):
+            if line.startswith(("src/", "bot.py", "benchmarks/")):
+                return line
+        return stack[-1] if stack else _UNSAMPLED
+
+    # ---------- watchdog thread ----------
+    def _watch(self) -> None:
+        check = max(self.threshold / 2, 0.01)
+        while not self._stop.wait(check):
+            beat, at = self._heartbeat
+            if beat == self._sampled or time.monotonic() - at < self.interval + self.threshold:
+                continue
+            self._sampled = beat
+            task, stack = self._sample()
+            self._pending = (beat, task, stack)
+
+    def _sample(self) -> Tuple[str, List[str]]:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = []
+        if frame is not None:
+            for entry in traceback.extract_stack(frame, limit=self.stack_depth):
+                filename = entry.filename
+                if filename.startswith(ROOT):
+                    filename = filename[len(ROOT) + 1:].replace("\\", "/")
+                stack.append(f"{filename}:{entry.lineno} in {entry.name}")
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return "", stack
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', type(coro).__name__)})", stack
+
+    # ---------- reporting ----------
+    def report(self, minutes: Optional[float] = None, *, top: int = 10) -> Dict[str, Any]:
+        """Lag percentiles and the worst stall sites over the last `minutes` (all kept windows by default)."""
+        now = time.monotonic()
+        cutoff = now - minutes * 60 if minutes else float("-inf")
+        lag = HdrHistogram()
+        sites: Dict[str, _Site] = {}
+        span = 0.0
+        for window in self._windows:
+            if window.started + self.window < cutoff:
+                continue
+            span = max(span, now - window.started)
+            lag.merge(window.lag)
+            for name, site in window.sites.items():
+                total = sites.setdefault(name, _Site())
+                total.count += site.count
+                total.blocked += site.blocked
+                total.max = max(total.max, site.max)
+                total.task, total.stack = site.task, site.stack
+        hot = sorted(sites.items(), key=lambda item: item[1].blocked, reverse=True)[:top]
+        return {
+            "span_s": round(span, 1),
+            "lag": lag.to_dict(),
+            "stalls": sum(site.count for site in sites.values()),
+            "blocked_ms": round(sum(site.blocked for site in sites.values()) * 1000, 1),
+            "hot_paths": [
+                {
+                    "site": name,
+                    "count": site.count,
+                    "blocked_ms": round(site.blocked * 1000, 1),
+                    "max_ms": round(site.max * 1000, 1),
+                    "task": site.task,
+                    "stack": site.stack,
+                }
+                for name, site in hot
+            ],
+            "recent": [stall for stall in self._recent if stall["at"] >= time.time() - (now - cutoff)][-5:],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        last = self._windows[-1].lag if self._windows else HdrHistogram()
+        return {
+            "ticks": self.ticks,
+            "stalls": self.stalls,
+            "unsampled_stalls": self.unsampled,
+            "blocked_seconds": round(self.blocked, 3),
+            "lag_p99_ms": round((last.quantile(0.99) or 0) * 1000, 2),
+            "lag_max_ms": round(last.max_us / 1000, 2),
+        }
@@ -0,0 +1,297 @@
+import asyncio
+import sys
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import discord
+from discord.ext import commands
+from discord.guild import Guild
+
+try:
+    from src.modules.single_flight import SingleFlight
+    from src.modules.ttl_cache import TTLCache
+except ImportError:
+    from modules.single_flight import SingleFlight
+    from modules.ttl_cache import TTLCache
+
+# guild._members slot plus the user's weak entry in the state's user cache
+_ENTRY_OVERHEAD = 2 * 104
+
+def member_bytes(member: discord.Member) -> int:
+    """Approximate resident size of a cached Member and its User (users shared across guilds count once per guild)."""
+    user = member._user
+    size = sys.getsizeof(member) + sys.getsizeof(member._roles) + sys.getsizeof(user) + sys.getsizeof(user.id) + _ENTRY_OVERHEAD
+    for value in (member.joined_at, member.nick, member._avatar, member._banner, user.name, user.global_name, user._avatar, user._banner, user.discriminator):
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size
+
+class MemberCache:
+    """Keeps the member cache inside a memory budget instead of every member of every guild.
+
+    Guilds in `guilds` (ids) are chunked at startup and kept complete, as
+    are members holding one of the `roles` (ids) anywhere and the bot
+    itself: those are pinned. Every other member discord.py caches (joins,
+    GUILD_CREATE, lookups) goes into one LRU across guilds; once pinned and
+    LRU members together exceed `budget` bytes (by `member_bytes()`), the
+    least recently used are dropped from their guild. `get()` serves
+    misses with a gateway chunk request for that one user (REST when the
+    gateway is rate limited) and caches the result; `census()` counts a
+    guild's humans and bots from a non-caching chunk of the whole guild,
+    kept for `count_ttl` seconds. A guild the bot leaves takes its entries
+    with it, and so does a fresh READY that rebuilds every guild. With
+    `enabled` off discord.py keeps everyone, as before.
+    """
+
+    _active: Optional["MemberCache"] = None  # read by the patched Guild methods
+    _default_add_member = None
+    _default_remove_member = None
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        budget: int = 64 * 1024 * 1024,
+        guilds: Iterable[int] = (),
+        roles: Iterable[int] = (),
+        count_ttl: float = 600.0,
+        fetch_timeout: float = 10.0,
+    ) -> None:
+        if budget <= 0:
+            raise ValueError(f"MemberCache budget must be positive, got {budget}.")
+        self.enabled = enabled
+        self.budget = budget
+        self.guilds = frozenset(int(guild_id) for guild_id in guilds)
+        self.roles = frozenset(int(role_id) for role_id in roles)
+        self.fetch_timeout = fetch_timeout
+        self._bot: Optional[commands.Bot] = None
+        self._lru: "OrderedDict[Tuple[int, int], int]" = OrderedDict()  # (guild id, user id) -> bytes
+        self._pinned: Dict[Tuple[int, int], int] = {}
+        self._guild_bytes: Counter = Counter()
+        self._guild_members: Counter = Counter()
+        self._censuses = TTLCache(max_size=1000, ttl=count_ttl, shards=4)
+        self._flights = SingleFlight()
+        self.bytes = 0
+        self.lru_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.rest_fetches = 0
+        self.not_found = 0
+        self.evictions = 0
+        self.censuses = 0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "MemberCache":
+        """Build from the optional `MemberCache` section of config.json."""
+        section = config.get("MemberCache") or {}
+        return cls(
+            enabled=section.get("Enabled", True),
+            budget=int(section.get("BudgetMB", 64) * 1024 * 1024),
+            guilds=section.get("Guilds") or (),
+            roles=section.get("Roles") or (),
+            count_ttl=section.get("CountTTL", 600.0),
+            fetch_timeout=section.get("FetchTimeout", 10.0),
+        )
+
+    def install(self, bot: commands.Bot) -> None:
+        """Route the bot's member caching through this budget and chunk only opted-in guilds at startup."""
+        if not self.enabled:
+            return
+        self._bot = bot
+        cls = type(self)
+        cls._active = self
+        if cls._default_add_member is None:
+            cls._default_add_member = add_member = Guild._add_member
+            cls._default_remove_member = remove_member = Guild._remove_member
+
+            def budgeted_add_member(guild: Guild, member: discord.Member, /) -> None:
+                add_member(guild, member)
+                if cls._active is not None:
+                    cls._active.admit(guild, member)
+
+            def budgeted_remove_member(guild: Guild, member: discord.abc.Snowflake, /) -> None:
+                remove_member(guild, member)
+                if cls._active is not None:
+                    cls._active.forget(guild.id, member.id)
+
+            Guild._add_member = budgeted_add_member
+            Guild._remove_member = budgeted_remove_member
+
+        state = bot._connection
+        needs_chunking = state._guild_needs_chunking
+        state._guild_needs_chunking = lambda guild: guild.id in self.guilds and needs_chunking(guild)
+
+        # Not on_guild_remove: the intent router may drop events no cog declares
+        remove_guild, clear = state._remove_guild, state.clear
+
+        def budgeted_remove_guild(guild: Guild) -> None:
+            remove_guild(guild)
+            self.forget_guild(guild.id)
+
+        def budgeted_clear(*args: Any, **kwargs: Any) -> None:
+            clear(*args, **kwargs)
+            self._reset()
+
+        state._remove_guild = budgeted_remove_guild
+        state.clear = budgeted_clear
+
+    # ---------- accounting ----------
+    def is_pinned(self, guild: Guild, member: discord.Member) -> bool:
+        if guild.id in self.guilds or member.id == guild._state.self_id:
+            return True
+        return bool(self.roles) and any(role_id in self.roles for role_id in member._roles)
+
+    def admit(self, guild: Guild, member: discord.Member) -> None:
+        """Account for a member discord.py just cached, then evict down to the budget."""
+        key = (guild.id, member.id)
+        self._drop(key)
+        self._add(key, member_bytes(member), self.is_pinned(guild, member))
+        if self.bytes > self.budget:
+            self._evict(guild)
+
+    def forget(self, guild_id: int, user_id: int) -> None:
+        self._drop((guild_id, user_id))
+
+    def forget_guild(self, guild_id: int) -> None:
+        """Drop every entry of a guild the bot left."""
+        for entries in (self._pinned, self._lru):
+            for key in [key for key in entries if key[0] == guild_id]:
+                self._drop(key)
+        self._guild_bytes.pop(guild_id, None)
+        self._guild_members.pop(guild_id, None)
+        self._censuses.pop(guild_id)
+
+    def _reset(self) -> None:
+        self._pinned.clear()
+        self._lru.clear()
+        self._guild_bytes.clear()
+        self._guild_members.clear()
+        self.bytes = self.lru_bytes = 0
+
+    def _add(self, key: Tuple[int, int], size: int, pinned: bool) -> None:
+        if pinned:
+            self._pinned[key] = size
+        else:
+            self._lru[key] = size
+            self.lru_bytes += size
+        self.bytes += size
+        self._guild_bytes[key[0]] += size
+        self._guild_members[key[0]] += 1
+
+    def _drop(self, key: Tuple[int, int]) -> int:
+        size = self._pinned.pop(key, None)
+        if size is None:
+            size = self._lru.pop(key, None)
+            if size is None:
+                return 0
+            self.lru_bytes -= size
+        self.bytes -= size
+        self._guild_bytes[key[0]] -= size
+        self._guild_members[key[0]] -= 1
+        return size
+
+    def _evict(self, current: Guild) -> None:
+        state = self._bot._connection
+        while self.bytes > self.budget and self._lru:
+            key = next(iter(self._lru))
+            size = self._drop(key)
+            # A guild still being built from GUILD_CREATE isn't in the state yet
+            guild = current if key[0] == current.id else state._get_guild(key[0])
+            member = guild._members.get(key[1]) if guild is not None else None
+            if member is not None and self.is_pinned(guild, member):  # gained an opted-in role since
+                self._add(key, size, True)
+                continue
+            if guild is not None:
+                guild._members.pop(key[1], None)
+            self.evictions += 1
+
+    def _touch(self, guild_id: int, user_id: int) -> None:
+        key = (guild_id, user_id)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+
+    # ---------- lookups ----------
+    async def get(self, guild: Guild, user_id: int) -> Optional[discord.Member]:
+        """The member from the cache, else from a chunk request (cached in the LRU); None if they left."""
+        member = guild.get_member(user_id)
+        if member is not None:
+            self.hits += 1
+            self._touch(guild.id, user_id)
+            return member
+        self.misses += 1
+        return await self._flights.do((guild.id, user_id), lambda: self._fetch(guild, user_id))
+
+    async def _fetch(self, guild: Guild, user_id: int) -> Optional[discord.Member]:
+        ws = self._bot._get_websocket(shard_id=guild.shard_id) if self._bot is not None else None
+        if self.enabled and guild._state._intents.members and ws is not None and not ws.is_ratelimited():
+            self.fetches += 1
+            try:
+                members = await asyncio.wait_for(guild.query_members(user_ids=[user_id], cache=True), self.fetch_timeout)
+                if not members:
+                    self.not_found += 1
+                return members[0] if members else None
+            except asyncio.TimeoutError:
+                pass
+        # Rate limited or no gateway: one REST call, cached the same way
+        self.rest_fetches += 1
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            self.not_found += 1
+            return None
+        guild._add_member(member)
+        return member
+
+    async def census(self, guild: Guild) -> Tuple[int, int]:
+        """(humans, bots) of a guild: from the cache when it holds everyone, else a non-caching chunk of the guild."""
+        if guild.chunked or not self.enabled or not guild._state._intents.members:
+            bots = sum(1 for member in guild.members if member.bot)
+            return len(guild.members) - bots, bots
+        counts = self._censuses.get(guild.id)
+        if counts is None:
+            counts = await self._flights.do(("census", guild.id), lambda: self._census(guild))
+        return counts
+
+    async def _census(self, guild: Guild) -> Tuple[int, int]:
+        self.censuses += 1
+        members = await asyncio.wait_for(guild.chunk(cache=False), self.fetch_timeout * 3)
+        bots = sum(1 for member in members if member.bot)
+        counts = (len(members) - bots, bots)
+        self._censuses.set(guild.id, counts)
+        return counts
+
+    # ---------- reporting ----------
+    def report(self, guilds: Iterable[Guild]) -> List[Dict[str, Any]]:
+        """Per-guild cached members and bytes, largest first."""
+        rows = []
+        for guild in guilds:
+            rows.append({
+                "guild_id": guild.id,
+                "name": guild.name,
+                "opted_in": guild.id in self.guilds,
+                "member_count": guild.member_count or 0,
+                "cached": self._guild_members[guild.id] if self.enabled else len(guild._members),
+                "bytes": self._guild_bytes[guild.id] if self.enabled else sum(member_bytes(member) for member in guild._members.values()),
+            })
+        rows.sort(key=lambda row: row["bytes"], reverse=True)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "budget_bytes": self.budget,
+            "bytes": self.bytes,
+            "lru_bytes": self.lru_bytes,
+            "pinned": len(self._pinned),
+            "lru": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "fetches": self.fetches,
+            "rest_fetches": self.rest_fetches,
+            "not_found": self.not_found,
+            "evictions": self.evictions,
+            "censuses": self.censuses,
+        }
@@ -0,0 +1,331 @@
+import contextvars
+import time
+from array import array
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import discord
+from aiohttp import web
+from discord import app_commands
+
+SUB_BITS = 5  # 32 sub-buckets per power of two: every recorded value is within ~3% of its bucket bound
+SUB_COUNT = 1 << SUB_BITS
+MAX_SHIFT = 27  # values are capped at 2**(27 + SUB_BITS + 1) us, about 2.4 hours
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+class HdrHistogram:
+    """Log-linear histogram of microsecond values in fixed memory (~3.6 KiB).
+
+    Values below 32 us get their own slot; above that each power of two is
+    split into 32 equal sub-buckets, the layout HdrHistogram uses, so the
+    relative error of any percentile is bounded by 1/32 regardless of how
+    many samples were recorded.
+    """
+
+    __slots__ = ("counts", "total", "sum_us", "min_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts = array("I", bytes(4 * (SUB_COUNT * (MAX_SHIFT + 2))))
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    @staticmethod
+    def _index(us: int) -> int:
+        if us < SUB_COUNT:
+            return us
+        shift = min(us.bit_length() - SUB_BITS - 1, MAX_SHIFT)
+        return SUB_COUNT * (shift + 1) + min((us >> shift) - SUB_COUNT, SUB_COUNT - 1)
+
+    @staticmethod
+    def _upper(index: int) -> int:
+        if index < SUB_COUNT:
+            return index
+        shift, sub = divmod(index - SUB_COUNT, SUB_COUNT)
+        return ((SUB_COUNT + sub + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        us = max(int(seconds * 1_000_000), 0)
+        self.counts[self._index(us)] += 1
+        self.min_us = us if not self.total else min(self.min_us, us)
+        self.max_us = max(self.max_us, us)
+        self.total += 1
+        self.sum_us += us
+
+    def merge(self, other: "HdrHistogram") -> None:
+        """Add `other`'s samples to this histogram (same layout, so bucket-by-bucket)."""
+        if not other.total:
+            return
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min_us = other.min_us if not self.total else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.total += other.total
+        self.sum_us += other.sum_us
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value (seconds) at quantile `q`, reported as its bucket's upper bound and capped at the max seen."""
+        if not self.total:
+            return None
+        rank = max(q * self.total, 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        ms = lambda seconds: None if seconds is None else round(seconds * 1000, 2)
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_us / self.total / 1000, 2) if self.total else None,
+            **{f"p{q * 100:g}".replace(".", "") + "_ms": ms(self.quantile(q)) for q in QUANTILES},
+            "max_ms": round(self.max_us / 1000, 2),
+        }
+
+class CommandStats:
+    __slots__ = ("calls", "errors", "latency", "discord_wait", "cpu")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors: Counter = Counter()
+        self.latency = HdrHistogram()
+        self.discord_wait = HdrHistogram()
+        self.cpu = HdrHistogram()
+
+class Invocation:
+    """Timing for one command run; Discord waits are added while it is the current invocation."""
+
+    __slots__ = ("kind", "started", "cpu_started", "wall", "cpu", "discord_wait", "failed")
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.cpu_started = time.thread_time()
+        self.wall: Optional[float] = None
+        self.cpu = 0.0
+        self.discord_wait = 0.0
+        self.failed: Optional[Tuple[str, BaseException]] = None  # set by error hooks that run inside the call
+
+    def stop(self) -> None:
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.thread_time() - self.cpu_started
+
+_current: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar("command_invocation", default=None)
+
+def current_invocation() -> Optional[Invocation]:
+    """The command invocation running in this task, if any."""
+    return _current.get()
+
+def note_discord_wait(seconds: float) -> None:
+    """Charge time spent waiting on Discord to the command running in this task, if any."""
+    invocation = _current.get()
+    if invocation is not None:
+        invocation.discord_wait += seconds
+
+class Metrics:
+    """Per-command latency, call and error counters for prefix and slash commands.
+
+    `Bot.invoke` and `MetricsTree._call` open an `Invocation` around every
+    command, and Discord REST calls made from that task are charged to it,
+    including time queued in `Outbound`. The `on_command*` /
+    `on_app_command_completion` listeners then file it under the command
+    name with the outcome; the tree's error hook runs inside the call, so it
+    marks the invocation with `fail()` and `track()` files it on the way
+    out. CPU is the loop thread's CPU time over the invocation, which
+    includes whatever other tasks ran while it was waiting.
+    """
+
+    MAX_PENDING = 1000
+
+    def __init__(self, *, port: Optional[int] = None, host: str = "127.0.0.1") -> None:
+        self.port = port
+        self.host = host
+        self.commands: Dict[Tuple[str, str], CommandStats] = {}
+        self.in_flight = 0
+        self.unknown_commands = 0
+        self._pending: "OrderedDict[Hashable, Invocation]" = OrderedDict()
+        self._sources: Dict[str, Tuple[Callable[[], Mapping[str, Any]], Optional[str]]] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Metrics":
+        """Build metrics from the optional `Metrics` section; the endpoint is off without a `Port`."""
+        section = config.get("Metrics") or {}
+        return cls(port=section.get("Port"), host=section.get("Host", "127.0.0.1"))
+
+    # ---------- invocation tracking ----------
+    async def track(self, key: Hashable, kind: str, call: Awaitable[Any]) -> Any:
+        """Run a command invocation as the current one; the listeners file it later under `key`."""
+        invocation = Invocation(kind)
+        token = _current.set(invocation)
+        self.in_flight += 1
+        try:
+            return await call
+        finally:
+            invocation.stop()
+            self.in_flight -= 1
+            _current.reset(token)
+            if invocation.failed is not None:
+                self._record(invocation, *invocation.failed)
+            else:
+                self._pending[key] = invocation
+                while len(self._pending) > self.MAX_PENDING:
+                    self._pending.popitem(last=False)
+
+    def fail(self, name: str, error: BaseException) -> None:
+        """Mark the running invocation as failed; `track()` records it when the call returns."""
+        invocation = _current.get()
+        if invocation is not None:
+            invocation.failed = (name, error)
+
+    def finish(self, key: Hashable, name: str, error: Optional[BaseException] = None) -> None:
+        invocation = self._pending.pop(key, None)
+        if invocation is not None:
+            self._record(invocation, name, error)
+
+    def _record(self, invocation: Invocation, name: str, error: Optional[BaseException]) -> None:
+        stats = self.commands.get((invocation.kind, name))
+        if stats is None:
+            stats = self.commands[(invocation.kind, name)] = CommandStats()
+        stats.calls += 1
+        if error is not None:
+            stats.errors[type(error).__name__] += 1
+        stats.latency.record(invocation.wall)
+        stats.discord_wait.record(invocation.discord_wait)
+        stats.cpu.record(invocation.cpu)
+
+    def timed_request(self, request: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wrap `HTTPClient.request` so every REST call is charged to the running command."""
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await request(*args, **kwargs)
+            finally:
+                note_discord_wait(time.perf_counter() - started)
+        return wrapper
+
+    # ---------- reporting ----------
+    def add_source(self, name: str, stats: Callable[[], Mapping[str, Any]], *, label: Optional[str] = None) -> None:
+        """Export the numeric fields of another component's stats (keep label-like keys such as ids out).
+
+        With `label`, `stats()` maps label values (e.g. hosts) to stats and
+        each becomes the same series with a `label="value"` label.
+        """
+        self._sources[name] = (stats, label)
+
+    def remove_source(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        rows = []
+        for (kind, name), stats in self.commands.items():
+            rows.append({
+                "command": name,
+                "kind": kind,
+                "calls": stats.calls,
+                "errors": sum(stats.errors.values()),
+                "error_types": dict(stats.errors),
+                "latency": stats.latency.to_dict(),
+                "discord_wait_ms": round(stats.discord_wait.sum_us / 1000, 1),
+                "cpu_ms": round(stats.cpu.sum_us / 1000, 1),
+            })
+        return sorted(rows, key=lambda row: row["calls"], reverse=True)
+
+    def prometheus(self) -> str:
+        """Everything in the Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            "# HELP bot_command_calls_total Commands completed or failed.",
+            "# TYPE bot_command_calls_total counter",
+        ]
+        label = lambda kind, name: f'command="{name}",kind="{kind}"'
+        for (kind, name), stats in sorted(self.commands.items()):
+            lines.append(f"bot_command_calls_total{{{label(kind, name)}}} {stats.calls}")
+        lines += ["# HELP bot_command_errors_total Failed commands by error type.", "# TYPE bot_command_errors_total counter"]
+        for (kind, name), stats in sorted(self.commands.items()):
+            for error, count in sorted(stats.errors.items()):
+                lines.append(f'bot_command_errors_total{{{label(kind, name)},error="{error}"}} {count}')
+        for metric, attr, help_text in (
+            ("bot_command_duration_seconds", "latency", "Wall time from invoke to completion."),
+            ("bot_command_discord_wait_seconds", "discord_wait", "Time spent waiting on Discord REST calls."),
+            ("bot_command_cpu_seconds", "cpu", "Loop thread CPU time while the command ran."),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+            for (kind, name), stats in sorted(self.commands.items()):
+                histogram: HdrHistogram = getattr(stats, attr)
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{{label(kind, name)},quantile="{q}"}} {histogram.quantile(q) or 0:.6f}')
+                lines.append(f"{metric}_sum{{{label(kind, name)}}} {histogram.sum_us / 1_000_000:.6f}")
+                lines.append(f"{metric}_count{{{label(kind, name)}}} {histogram.total}")
+        lines += [
+            "# TYPE bot_commands_in_flight gauge", f"bot_commands_in_flight {self.in_flight}",
+            "# TYPE bot_unknown_commands_total counter", f"bot_unknown_commands_total {self.unknown_commands}",
+        ]
+        for source, (stats, label) in self._sources.items():
+            if label is None:
+                for key, value in _flatten(stats()):
+                    lines.append(f"bot_{source}_{key} {value}")
+                continue
+            series: Dict[str, List[str]] = {}  # one metric's samples stay together, as the format expects
+            for label_value, labelled in sorted(stats().items()):
+                escaped = str(label_value).replace("\\", "\\\\").replace('"', '\\"')
+                for key, value in _flatten(labelled):
+                    series.setdefault(key, []).append(f'bot_{source}_{key}{{{label}="{escaped}"}} {value}')
+            for samples in series.values():
+                lines += samples
+        return "\n".join(lines) + "\n"
+
+    # ---------- endpoint ----------
+    async def start(self) -> None:
+        """Serve `GET /metrics` on host:port (local only by default)."""
+        if self.port is None or self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            print(f"Metrics endpoint disabled, could not bind {self.host}:{self.port}: {e}")
+            await self.close()
+            return
+        print(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.prometheus(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def _flatten(stats: Mapping[str, Any], prefix: str = "") -> List[Tuple[str, float]]:
+    """Numeric leaves of a nested stats() dict as (snake_case_path, value) pairs."""
+    out = []
+    for key, value in stats.items():
+        name = f"{prefix}{key}".replace("-", "_").replace(".", "_").replace(":", "_")
+        if isinstance(value, bool) or value is None:
+            continue
+        if isinstance(value, (int, float)):
+            out.append((name, value))
+        elif isinstance(value, Mapping):
+            out.extend(_flatten(value, f"{name}_"))
+    return out
+
+class MetricsTree(app_commands.CommandTree):
+    """Command tree that times every slash command invocation for `Metrics`."""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if interaction.type is discord.InteractionType.autocomplete:  # not a command run, nothing files it
+            return await super()._call(interaction)
+        await self.client.metrics.track(interaction.id, "slash", super()._call(interaction))
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        # Awaited inside _call, before track() has filed the invocation
+        command = interaction.command
+        self.client.metrics.fail(command.qualified_name if command else "unknown", error)
+        await super().on_error(interaction, error)
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFetcher = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+class MicroBatcher(Generic[K, V]):
+    """Gather single-key lookups arriving within `window` seconds into one batched call.
+
+    `load(key)` parks the caller on a future; the first key of a batch arms a
+    timer and the batch is sent when it fires or when `max_batch` distinct
+    keys are waiting, whichever comes first. `fetch_many(keys)` returns a
+    dict; keys it leaves out resolve to None, and if it raises, every caller
+    in that batch gets the exception.
+    """
+
+    def __init__(self, fetch_many: BatchFetcher, *, window: float = 0.005, max_batch: int = 100) -> None:
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[K, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+        self.loads = 0
+        self.batches = 0
+        self.keys = 0
+
+    async def load(self, key: K) -> Optional[V]:
+        self.loads += 1
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._send(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _send(self, batch: Dict[K, asyncio.Future]) -> None:
+        self.batches += 1
+        self.keys += len(batch)
+        try:
+            results = await self.fetch_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "batches": self.batches,
+            "keys": self.keys,
+            "avg_batch": round(self.keys / self.batches, 1) if self.batches else None,
+            "calls_saved": self.loads - self.batches,
+        }
+
+    async def close(self) -> None:
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
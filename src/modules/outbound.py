@@ -0,0 +1,298 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import discord
+
+try:
+    from src.modules.http_client import LatencyHistogram
+    from src.modules.metrics import current_invocation, note_discord_wait
+except ImportError:
+    from modules.http_client import LatencyHistogram
+    from modules.metrics import current_invocation, note_discord_wait
+
+LANES = ("moderation", "normal", "fun")  # served in this order when a route is backed up
+
+# Discord's per-channel limits for the routes cogs use: (requests, window seconds)
+DEFAULT_BUCKETS = {"messages": (5, 5.0), "reactions": (1, 0.25), "edits": (5, 5.0)}
+
+# Sends made of only these fields can be merged into one message
+_COALESCIBLE = {"content", "embed", "embeds"}
+MAX_CONTENT = 2000
+MAX_EMBEDS = 10
+
+class RouteBucket:
+    """Fixed-window bucket like Discord's: `limit` requests, then wait until the window resets.
+
+    The window starts with the first request after a reset, the same way
+    Discord's X-RateLimit-Reset-After counts. Once discord.py has seen a
+    route's headers it also sleeps out an exhausted bucket inside the
+    request, which keeps the two clocks from drifting apart.
+    """
+
+    __slots__ = ("limit", "per", "remaining", "reset_at")
+
+    def __init__(self, limit: int, per: float) -> None:
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def delay(self, reserve: int = 0) -> float:
+        """Seconds until a request may go out (0 if one may go now) while leaving `reserve` tokens unspent."""
+        now = time.monotonic()
+        if now >= self.reset_at:
+            return 0.0
+        return 0.0 if self.remaining > min(reserve, self.limit - 1) else self.reset_at - now
+
+    def take(self) -> None:
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        self.remaining -= 1
+
+    @property
+    def idle(self) -> bool:
+        return time.monotonic() >= self.reset_at
+
+class _GlobalGate:
+    """The bot-wide bucket; waiters are released lane-first, then first come first served."""
+
+    def __init__(self, limit: int, per: float = 1.0) -> None:
+        self.bucket = RouteBucket(limit, per)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+        self.waits = 0
+
+    async def acquire(self, lane: int) -> None:
+        if not self._waiters and self.bucket.delay() == 0:
+            self.bucket.take()
+            return
+        self.waits += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), future))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.create_task(self._release())
+        await future
+
+    async def _release(self) -> None:
+        while self._waiters:
+            delay = self.bucket.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.bucket.take()
+                future.set_result(None)
+
+class _Job:
+    __slots__ = ("lane", "call", "kwargs", "destination", "origin", "future", "enqueued")
+
+    def __init__(self, lane: int, call: Optional[Callable[[], Awaitable[Any]]], destination: Any = None, kwargs: Optional[Dict[str, Any]] = None) -> None:
+        self.lane = lane
+        self.call = call
+        self.destination = destination
+        self.kwargs = kwargs  # set only for sends that may be coalesced
+        # Only sends from the same command run (or, outside commands, the same task) are merged
+        self.origin = current_invocation() or asyncio.current_task()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued = time.monotonic()
+
+class _Route:
+    __slots__ = ("key", "bucket", "queue", "worker", "wakeup", "throttled")
+
+    def __init__(self, key: Tuple[str, int], bucket: RouteBucket) -> None:
+        self.key = key
+        self.bucket = bucket
+        self.queue: List[Tuple[int, int, _Job]] = []
+        self.worker: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()  # set when a job is queued, so a higher lane can cut a throttled wait short
+        self.throttled = 0
+
+class Outbound:
+    """Single dispatch point for messages and reactions the bot sends.
+
+    Every request is queued on its route, e.g. ("messages", channel_id), and
+    a worker per busy route sends them in order once both the route bucket
+    and the global bucket have a token, so bursts wait client-side instead
+    of earning 429s. Queued work is taken lane-first (moderation, normal,
+    fun), and fun work leaves `reserve` tokens of every window for the
+    other lanes so a moderation notice never waits behind a flood. Plain
+    content/embed sends queued back to back for the same channel by the same
+    command run (or task) are merged into one message, up to Discord's 2000
+    characters and 10 embeds, and every caller gets the resulting message;
+    interaction responses are never merged.
+    """
+
+    def __init__(self, *, global_limit: int = 50, buckets: Optional[Mapping[str, Tuple[int, float]]] = None, reserve: int = 1, max_routes: int = 1024) -> None:
+        self.buckets = {kind: tuple(limit) for kind, limit in {**DEFAULT_BUCKETS, **(buckets or {})}.items()}
+        self.reserve = reserve
+        self.max_routes = max_routes
+        self._global = _GlobalGate(global_limit)
+        self._routes: Dict[Tuple[str, int], _Route] = {}
+        self._seq = itertools.count()
+        self.submitted = {lane: 0 for lane in LANES}
+        self.requests = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.waits = {lane: LatencyHistogram() for lane in LANES}
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "Outbound":
+        """Build the dispatcher from the optional `Outbound` section of config.json."""
+        section = config.get("Outbound") or {}
+        return cls(
+            global_limit=section.get("GlobalPerSecond", 50),
+            buckets=section.get("Buckets"),
+            reserve=section.get("ReserveForPriority", 1),
+            max_routes=section.get("MaxRoutes", 1024),
+        )
+
+    # ---------- public api ----------
+    async def send(self, destination: discord.abc.Messageable, content: Optional[str] = None, *, lane: str = "normal", coalesce: bool = True, **kwargs: Any) -> discord.Message:
+        """Queue `destination.send(...)`; resolves to the sent (possibly shared) message."""
+        channel = await destination._get_channel()  # opens the DM channel for users/members
+        if content is not None:
+            kwargs["content"] = str(content)
+        # An interaction-backed Context answers through the interaction, which can't take other sends
+        mergeable = coalesce and set(kwargs) <= _COALESCIBLE and getattr(destination, "interaction", None) is None
+        job = _Job(self._lane(lane), None, destination, kwargs)
+        if not mergeable:
+            job.call = lambda: destination.send(**kwargs)
+            job.kwargs = None
+        return await self._submit(("messages", channel.id), job)
+
+    async def react(self, message: discord.Message, emojis: Iterable[Any], *, lane: str = "normal") -> None:
+        """Add reactions in order, paced to the channel's reaction bucket."""
+        key = ("reactions", message.channel.id)
+        jobs = [self._submit(key, _Job(self._lane(lane), lambda emoji=emoji: message.add_reaction(emoji))) for emoji in emojis]
+        await asyncio.gather(*jobs)
+
+    async def remove_reaction(self, message: discord.Message, emoji: Any, member: discord.abc.Snowflake, *, lane: str = "normal") -> None:
+        """Remove `member`'s reaction, on the same bucket as adding one."""
+        await self._submit(("reactions", message.channel.id), _Job(self._lane(lane), lambda: message.remove_reaction(emoji, member)))
+
+    async def edit(self, message: discord.Message, *, lane: str = "normal", **kwargs: Any) -> Any:
+        return await self._submit(("edits", message.channel.id), _Job(self._lane(lane), lambda: message.edit(**kwargs)))
+
+    # ---------- internals ----------
+    def _lane(self, lane: str) -> int:
+        try:
+            return LANES.index(lane)
+        except ValueError:
+            raise ValueError(f"Unknown lane '{lane}' (expected one of {', '.join(LANES)}).") from None
+
+    async def _submit(self, key: Tuple[str, int], job: _Job) -> Any:
+        route = self._routes.get(key)
+        if route is None:
+            if len(self._routes) >= self.max_routes:
+                self._prune()
+            route = self._routes[key] = _Route(key, RouteBucket(*self.buckets[key[0]]))
+        heapq.heappush(route.queue, (job.lane, next(self._seq), job))
+        self.submitted[LANES[job.lane]] += 1
+        self.max_depth = max(self.max_depth, len(route.queue))
+        if route.worker is None or route.worker.done():
+            # A clean context, so the worker's requests aren't charged to whichever command started it
+            route.worker = contextvars.Context().run(asyncio.create_task, self._drain(route))
+        else:
+            route.wakeup.set()
+        try:
+            return await job.future
+        finally:
+            note_discord_wait(time.monotonic() - job.enqueued)
+
+    def _prune(self) -> None:
+        for key, route in list(self._routes.items()):
+            if not route.queue and route.bucket.idle and (route.worker is None or route.worker.done()):
+                del self._routes[key]
+
+    async def _drain(self, route: _Route) -> None:
+        while route.queue:
+            # The fun lane never spends a window's last tokens; they are kept for moderation/normal work
+            delay = route.bucket.delay(self.reserve if route.queue[0][0] == LANES.index("fun") else 0)
+            if delay > 0:
+                route.throttled += 1
+                route.wakeup.clear()
+                try:
+                    await asyncio.wait_for(route.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._global.acquire(route.queue[0][0])
+            route.bucket.take()
+            jobs = [heapq.heappop(route.queue)[2]]
+            if jobs[0].kwargs is not None:
+                self._merge_queued(route, jobs)
+            now = time.monotonic()
+            for job in jobs:
+                self.waits[LANES[job.lane]].record((now - job.enqueued) * 1000)
+            await self._run(jobs)
+
+    def _merge_queued(self, route: _Route, jobs: List[_Job]) -> None:
+        """Pull the mergeable sends queued right behind jobs[0] into the same request."""
+        content_len = len(jobs[0].kwargs.get("content") or "")
+        embeds = self._embeds(jobs[0].kwargs)
+        while route.queue:
+            job = route.queue[0][2]
+            if job.kwargs is None or job.origin is not jobs[0].origin or job.destination is not jobs[0].destination:
+                break
+            extra = len(job.kwargs.get("content") or "")
+            more = self._embeds(job.kwargs)
+            if content_len + extra + 1 > MAX_CONTENT or len(embeds) + len(more) > MAX_EMBEDS:
+                break
+            heapq.heappop(route.queue)
+            jobs.append(job)
+            content_len += extra + 1
+            embeds += more
+        self.coalesced += len(jobs) - 1
+
+    @staticmethod
+    def _embeds(kwargs: Mapping[str, Any]) -> List[discord.Embed]:
+        if kwargs.get("embed") is not None:
+            return [kwargs["embed"]]
+        return list(kwargs.get("embeds") or [])
+
+    async def _run(self, jobs: List[_Job]) -> None:
+        self.requests += 1
+        try:
+            if jobs[0].call is not None:
+                result = await jobs[0].call()
+            else:
+                contents = [job.kwargs["content"] for job in jobs if job.kwargs.get("content")]
+                embeds = [embed for job in jobs for embed in self._embeds(job.kwargs)]
+                result = await jobs[0].destination.send(content="\n".join(contents) or None, embeds=embeds or None)
+        except Exception as e:
+            self.failed += 1
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        for job in jobs:
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {lane: 0 for lane in LANES}
+        for route in self._routes.values():
+            for lane, _, _ in route.queue:
+                queued[LANES[lane]] += 1
+        throttled = sorted(self._routes.values(), key=lambda route: route.throttled, reverse=True)[:5]
+        return {
+            "submitted": dict(self.submitted),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "queued": queued,
+            "max_depth": self.max_depth,
+            "routes": len(self._routes),
+            "global_waits": self._global.waits,
+            "busiest_routes": {f"{route.key[0]}:{route.key[1]}": route.throttled for route in throttled if route.throttled},
+            "wait": {lane: {"p50_ms": hist.percentile(50), "p99_ms": hist.percentile(99), "max_ms": round(hist.max_ms, 1)} for lane, hist in self.waits.items()},
+        }
@@ -1,77 +1,107 @@
-class GetIdentify:
+import zlib
+from typing import Any, Dict, Mapping, Optional, Type
+
+from discord import utils
+from discord.gateway import DiscordWebSocket
+from discord.guild import Guild
+
+# The `$browser`/`$device` Discord shows the bot's status for
+DEVICES = {"mobile": "Discord iOS", "pc": "Discord Client"}
+TRANSPORTS = ("auto", "zlib-stream", "zstd-stream", "none")
+
+class ZlibStreamContext:
+    """discord.py's zlib-stream decompressor, which it only defines when zstd is unavailable."""
+
+    __slots__ = ("context", "buffer")
+
+    COMPRESSION_TYPE = "zlib-stream"
+
     def __init__(self) -> None:
-        self.payload = None
-        self.data = None  # Will be set after payload is built
-        self.device_type = None
-
-    async def set_identify_to_mobile(self) -> str:
-        """Override the identify method to use mobile properties."""
-        self.device_type = "Discord iOS"
-
-        self.payload = {
-            'op': self.IDENTIFY,
-            'd': {
-                'token': self.token,
-                'properties': {
-                    '$os': '',
-                    '$browser': self.device_type,
-                    '$device': self.device_type,
-                    '$referrer': '',
-                    '$referring_domain': ''
-                },
-                'compress': True,
-                'large_threshold': 250,
-                'v': 3
-            }
-        }
+        self.buffer = bytearray()
+        self.context = zlib.decompressobj()
 
-        self.data = self.payload["d"]
-        if self.shard_id is not None and self.shard_count is not None:
-            self.data["shard"] = [self.shard_id, self.shard_count]
+    def decompress(self, data: bytes, /) -> Optional[str]:
+        self.buffer.extend(data)
+        # A message is complete once a frame ends with the Z_SYNC_FLUSH marker
+        if len(data) < 4 or data[-4:] != b"\x00\x00\xff\xff":
+            return None
+        message = self.context.decompress(self.buffer)
+        self.buffer = bytearray()
+        return message.decode("utf-8")
 
-        state = self._connection
-        if state._activity is not None or state._status is not None:
-            self.data["presence"] = {
-                "status": state._status,
-                "game": state._activity,
-                "since": 0,
-                "afk": False,
-            }
+# zstd-stream when zstandard is installed, else zlib-stream
+_LIBRARY_CONTEXT = getattr(utils, "_ActiveDecompressionContext", ZlibStreamContext)
 
-        if state._intents is not None:
-            self.data["intents"] = state._intents.value
-
-        await self.call_hooks("before_identify", self.shard_id, initial=self._initial_identify)
-        await self.send_as_json(self.payload)
-    
-    async def set_identify_to_pc(self) -> str:
-        """Override the identify method to use PC properties."""
-        self.device_type = "Discord Client"
-
-        self.payload = {
-            'op': self.IDENTIFY,
-            'd': {
-                'token': self.token,
-                'properties': {
-                    '$os': '',
-                    '$browser': self.device_type,
-                    '$device': self.device_type,
-                    '$referrer': '',
-                    '$referring_domain': ''
-                },
-                'compress': True,
-                'large_threshold': 250,
-                'v': 3
-            }
-        }
+def decompression_context(transport: str) -> Optional[Type[Any]]:
+    """The decompressor class for a transport ("auto" is whatever discord.py picked), None for "none"."""
+    if transport == "none":
+        return None
+    if transport == "zlib-stream":
+        return ZlibStreamContext
+    if transport == "zstd-stream" and _LIBRARY_CONTEXT.COMPRESSION_TYPE != "zstd-stream":
+        raise ValueError("Gateway compression 'zstd-stream' needs the zstandard package (pip install zstandard).")
+    return _LIBRARY_CONTEXT
 
-        self.data = self.payload["d"]
-        if self.shard_id is not None and self.shard_count is not None:
-            self.data["shard"] = [self.shard_id, self.shard_count]
+class GetIdentify:
+    """Builds the IDENTIFY payload and picks the gateway transport compression.
+
+    `device` is the client Discord believes the bot runs on ("mobile" shows
+    the phone status icon). `transport` is the compression of the whole
+    gateway stream: "zlib-stream", "zstd-stream" (needs `zstandard`),
+    "auto" (discord.py's pick) or "none". `large_threshold` (50-250) is the
+    member count above which Discord leaves offline members out of
+    GUILD_CREATE; below it a guild arrives complete and needs no chunking.
+    """
+
+    _default_from_client = None
+    _default_guild_from_data = None
+    _transport = "zlib-stream"  # of the last installed builder; read by the from_client wrapper
+
+    def __init__(self, *, device: str = "mobile", transport: str = "zlib-stream", large_threshold: int = 250) -> None:
+        if device not in DEVICES:
+            raise ValueError(f"Unknown identify device '{device}' (expected one of {', '.join(DEVICES)}).")
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown gateway compression '{transport}' (expected one of {', '.join(TRANSPORTS)}).")
+        if not 50 <= large_threshold <= 250:
+            raise ValueError(f"LargeThreshold must be between 50 and 250, got {large_threshold}.")
+        self.device = device
+        self.device_type = DEVICES[device]
+        self.transport = transport
+        self.large_threshold = large_threshold
+        self.context = decompression_context(transport)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "GetIdentify":
+        """Build the identify settings from the optional `Gateway` section of config.json."""
+        section = config.get("Gateway") or {}
+        return cls(
+            device=section.get("Device", "mobile"),
+            transport=section.get("Compression", "zlib-stream"),
+            large_threshold=section.get("LargeThreshold", 250),
+        )
 
-        state = self._connection
+    def payload(self, ws: DiscordWebSocket) -> Dict[str, Any]:
+        """The IDENTIFY packet for `ws` (shard, presence and intents come from its connection state)."""
+        data: Dict[str, Any] = {
+            "token": ws.token,
+            "properties": {
+                "$os": "",
+                "$browser": self.device_type,
+                "$device": self.device_type,
+                "$referrer": "",
+                "$referring_domain": "",
+            },
+            # Per-message compression; never alongside transport compression, and discord.py can't read it alone
+            "compress": False,
+            "large_threshold": self.large_threshold,
+            "v": 3,
+        }
+        if ws.shard_id is not None and ws.shard_count is not None:
+            data["shard"] = [ws.shard_id, ws.shard_count]
+
+        state = ws._connection
         if state._activity is not None or state._status is not None:
-            self.data["presence"] = {
+            data["presence"] = {
                 "status": state._status,
                 "game": state._activity,
                 "since": 0,
@@ -79,7 +109,51 @@ class GetIdentify:
             }
 
         if state._intents is not None:
-            self.data["intents"] = state._intents.value
+            data["intents"] = state._intents.value
+        return {"op": ws.IDENTIFY, "d": data}
+
+    def install(self) -> None:
+        """Make every gateway connection identify with these settings and use this transport."""
+        builder = self
+
+        async def identify(ws: DiscordWebSocket) -> None:
+            await ws.call_hooks("before_identify", ws.shard_id, initial=ws._initial_identify)
+            await ws.send_as_json(builder.payload(ws))
+            await ws.call_hooks("after_identify", ws.shard_id, initial=ws._initial_identify)
 
-        await self.call_hooks("before_identify", self.shard_id, initial=self._initial_identify)
-        await self.send_as_json(self.payload)
\ No newline at end of file
+        DiscordWebSocket.identify = identify
+        if self.context is not None:
+            # Read by from_client() for the URL's compress= and by each websocket for its decompressor
+            utils._ActiveDecompressionContext = self.context
+
+        cls = type(self)
+        if cls._default_from_client is None:
+            cls._default_from_client = DiscordWebSocket.from_client.__func__
+            from_client = cls._default_from_client
+
+            async def transport_from_client(ws_cls, client, **kwargs: Any) -> DiscordWebSocket:
+                if cls._transport == "none":
+                    kwargs["compress"] = False
+                return await from_client(ws_cls, client, **kwargs)
+
+            DiscordWebSocket.from_client = classmethod(transport_from_client)
+        cls._transport = self.transport
+
+        if cls._default_guild_from_data is None:
+            # discord.py derives Guild.large from member_count >= 250 and ignores the payload's flag, so
+            # with presences on, guilds between a lower threshold and 250 would arrive partial and never be chunked
+            cls._default_guild_from_data = from_data = Guild._from_data
+
+            def large_from_data(guild: Guild, data: Dict[str, Any]) -> None:
+                from_data(guild, data)
+                if "large" in data:
+                    guild._large = data["large"]
+
+            Guild._from_data = large_from_data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "device": self.device,
+            "transport": self.context.COMPRESSION_TYPE if self.context is not None else "none",
+            "large_threshold": self.large_threshold,
+        }
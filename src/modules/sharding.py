@@ -0,0 +1,492 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import secrets
+import signal
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+import discord
+
+IDENTIFY_INTERVAL = 5.0  # Discord allows one IDENTIFY per max_concurrency bucket every 5 s
+IDENTIFY_HOLD = 15.0  # a permit not confirmed as sent by then is released anyway (worker died mid-identify)
+_LINE_LIMIT = 2 ** 22  # status replies carry every shard's stats
+
+EventHandler = Callable[[Any], Optional[Awaitable[None]]]
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """Split shard ids into `workers` contiguous ranges.
+
+    Consecutive ids land in different identify buckets (bucket = id %
+    max_concurrency), so the shards of one worker can identify back to back.
+    """
+    workers = max(min(workers, shard_count), 1)
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def _thaw(value: Any) -> Any:
+    """Plain dicts/lists from a frozen config snapshot, so it can be pickled to a worker."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
+async def _send(writer: asyncio.StreamWriter, message: Mapping[str, Any]) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+@dataclass(frozen=True)
+class WorkerSpec:
+    """Everything a worker process needs to run its shard range (pickled to the child)."""
+    index: int
+    workers: int
+    shard_ids: Tuple[int, ...]
+    shard_count: int
+    address: Tuple[str, int]
+    key: str
+    token: str
+    config: Dict[str, Any]
+    stats_interval: float = 10.0
+    initializer: Optional[Callable[..., None]] = None
+    initargs: Tuple[Any, ...] = field(default_factory=tuple)
+
+class IdentifyGate:
+    """One IDENTIFY per `max_concurrency` bucket every `interval` seconds, across all workers.
+
+    A permit holds its bucket until the worker confirms the IDENTIFY was
+    sent (`release()`), and the interval counts from then: timing it from
+    the grant would let a worker that was slow to act on its permit send
+    closer to the next one than Discord allows.
+    """
+
+    def __init__(self, max_concurrency: int = 1, interval: float = IDENTIFY_INTERVAL) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.interval = interval
+        self._next: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._held: Dict[int, asyncio.TimerHandle] = {}
+        self.granted = 0
+        self.waited = 0.0
+
+    def bucket(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def acquire(self, shard_id: int) -> float:
+        """Wait for the shard's bucket to be free and claim it until `release(shard_id)`; returns seconds waited."""
+        bucket = self.bucket(shard_id)
+        lock = self._locks.setdefault(bucket, asyncio.Lock())
+        await lock.acquire()
+        delay = max(self._next.get(bucket, 0.0) - time.monotonic(), 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self.waited += delay
+        self._held[shard_id] = asyncio.get_running_loop().call_later(IDENTIFY_HOLD, self.release, shard_id)
+        self.granted += 1
+        return delay
+
+    def release(self, shard_id: int) -> None:
+        """The shard's IDENTIFY went out: start the bucket's interval and let the next shard in."""
+        handle = self._held.pop(shard_id, None)
+        if handle is None:
+            return
+        handle.cancel()
+        bucket = self.bucket(shard_id)
+        self._next[bucket] = time.monotonic() + self.interval
+        self._locks[bucket].release()
+
+class _Worker:
+    __slots__ = ("spec", "process", "writer", "restarts", "started", "loop_lag_p99_ms")
+
+    def __init__(self, spec: WorkerSpec) -> None:
+        self.spec = spec
+        self.process: Optional[multiprocessing.Process] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.restarts = 0
+        self.started = 0.0
+        self.loop_lag_p99_ms: Optional[float] = None
+
+class ShardOrchestrator:
+    """Parent of a sharded launch: N worker processes, each an AutoShardedBot over a shard range.
+
+    The parent asks Discord for the shard count (unless `ShardCount` is set)
+    and the identify `max_concurrency`, splits the shards into contiguous
+    ranges and starts one process per range. Workers connect back over a
+    local socket speaking JSON lines: before every IDENTIFY they ask the
+    parent's `IdentifyGate` for a permit, they report per-shard latency and
+    event rates every `stats_interval` seconds, and state-changing events
+    (storage writes, presence changes, shutdown) are relayed to every other
+    worker. Workers that die are restarted after `restart_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        config: Mapping[str, Any],
+        token: str,
+        worker: Callable[[WorkerSpec], None],
+        *,
+        shard_count: Optional[int] = None,
+        workers: Optional[int] = None,
+        identify_interval: float = IDENTIFY_INTERVAL,
+        stats_interval: float = 10.0,
+        restart_delay: float = 5.0,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ) -> None:
+        self.config = _thaw(config)
+        self.token = token
+        self.worker = worker
+        self.shard_count = shard_count
+        self.worker_count = workers or os.cpu_count() or 1
+        self.identify_interval = identify_interval
+        self.stats_interval = stats_interval
+        self.restart_delay = restart_delay
+        self.initializer = initializer
+        self.initargs = initargs
+        self.gate: Optional[IdentifyGate] = None
+        self.shards: Dict[int, Dict[str, Any]] = {}
+        self.relayed = 0
+        self._workers: List[_Worker] = []
+        self._key = secrets.token_hex(16)
+        self._stopping = asyncio.Event()
+        self._context = multiprocessing.get_context("spawn")
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], token: str, worker: Callable[[WorkerSpec], None], **kwargs: Any) -> "ShardOrchestrator":
+        """Build the orchestrator from the `Sharding` section of config.json."""
+        section = config.get("Sharding") or {}
+        shard_count = section.get("ShardCount", "auto")
+        return cls(
+            config,
+            token,
+            worker,
+            shard_count=None if shard_count in (None, "auto") else int(shard_count),
+            workers=section.get("Workers"),
+            identify_interval=section.get("IdentifyInterval", IDENTIFY_INTERVAL),
+            stats_interval=section.get("StatsInterval", 10.0),
+            restart_delay=section.get("RestartDelay", 5.0),
+            **kwargs,
+        )
+
+    def run(self) -> None:
+        """Blocking entry point for `Launcher`: run until every worker has been stopped."""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def serve(self) -> None:
+        shard_count, max_concurrency = await self._gateway_info()
+        self.shard_count = shard_count
+        self.gate = IdentifyGate(max_concurrency, self.identify_interval)
+        server = await asyncio.start_server(self._accept, "127.0.0.1", 0, limit=_LINE_LIMIT)
+        address = server.sockets[0].getsockname()[:2]
+        ranges = shard_ranges(shard_count, self.worker_count)
+        for index, shard_ids in enumerate(ranges):
+            self._workers.append(_Worker(WorkerSpec(
+                index=index,
+                workers=len(ranges),
+                shard_ids=tuple(shard_ids),
+                shard_count=shard_count,
+                address=address,
+                key=self._key,
+                token=self.token,
+                config=self.config,
+                stats_interval=self.stats_interval,
+                initializer=self.initializer,
+                initargs=self.initargs,
+            )))
+        print(f"Sharding: {shard_count} shard(s) over {len(ranges)} worker(s), max_concurrency {max_concurrency}")
+        try:
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTERM, self._stopping.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C still ends run()
+        try:
+            for worker in self._workers:
+                self._spawn(worker)
+            await self._supervise()
+        finally:
+            await self._stop_workers()
+            server.close()
+            await server.wait_closed()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+
+    # ---------- workers ----------
+    async def _gateway_info(self) -> Tuple[int, int]:
+        http = discord.http.HTTPClient(asyncio.get_running_loop())
+        try:
+            await http.static_login(self.token)
+            recommended, _, limits = await http.get_bot_gateway()
+        finally:
+            await http.close()
+        return self.shard_count or recommended, limits.get("max_concurrency", 1)
+
+    def _spawn(self, worker: _Worker) -> None:
+        worker.process = self._context.Process(target=self.worker, args=(worker.spec,), name=f"shard-worker-{worker.spec.index}")
+        worker.process.start()
+        worker.started = time.monotonic()
+
+    async def _supervise(self) -> None:
+        next_report = time.monotonic() + self.stats_interval
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping.is_set():
+                break
+            for worker in self._workers:
+                process = worker.process
+                if process.is_alive() or time.monotonic() - worker.started < self.restart_delay:
+                    continue
+                print(f"Shard worker {worker.spec.index} (shards {_span(worker.spec.shard_ids)}) exited with {process.exitcode}; restarting.")
+                worker.restarts += 1
+                self._spawn(worker)
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + self.stats_interval
+                print(f"Sharding: {self.summary()}")
+
+    async def _stop_workers(self) -> None:
+        for worker in self._workers:
+            if worker.writer is not None:
+                try:
+                    await _send(worker.writer, {"op": "event", "kind": "stop", "data": None})
+                except ConnectionError:
+                    pass
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            await asyncio.to_thread(worker.process.join, 15.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                await asyncio.to_thread(worker.process.join, 5.0)
+
+    # ---------- ipc ----------
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            if hello.get("op") != "hello" or hello.get("key") != self._key:
+                return
+            worker = self._workers[hello["worker"]]
+            worker.writer = writer
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._handle(worker, json.loads(line))
+        except (ConnectionError, json.JSONDecodeError, IndexError, KeyError) as e:
+            print(f"Sharding: dropped a worker connection: {e!r}")
+        finally:
+            for worker in self._workers:
+                if worker.writer is writer:
+                    worker.writer = None
+            writer.close()
+
+    def _handle(self, worker: _Worker, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+        if op == "identify":
+            asyncio.create_task(self._grant_identify(worker, message))
+        elif op == "identified":
+            self.gate.release(message["shard"])
+        elif op == "stats":
+            for shard_id, stats in message["shards"].items():
+                self.shards[int(shard_id)] = {**stats, "worker": worker.spec.index, "reported": time.time()}
+            worker.loop_lag_p99_ms = message.get("loop_lag_p99_ms")
+        elif op == "broadcast":
+            asyncio.create_task(self._relay(worker, message["kind"], message.get("data")))
+        elif op == "status":
+            asyncio.create_task(self._reply(worker, message["id"], status=self.status()))
+        elif op == "shutdown":
+            print(f"Sharding: shutdown requested by worker {worker.spec.index}.")
+            self._stopping.set()
+
+    async def _grant_identify(self, worker: _Worker, message: Dict[str, Any]) -> None:
+        waited = await self.gate.acquire(message["shard"])
+        await self._reply(worker, message["id"], waited=waited)
+
+    async def _reply(self, worker: _Worker, request_id: int, **fields: Any) -> None:
+        if worker.writer is not None:
+            try:
+                await _send(worker.writer, {"op": "reply", "id": request_id, **fields})
+            except ConnectionError:
+                pass
+
+    async def _relay(self, source: _Worker, kind: str, data: Any) -> None:
+        self.relayed += 1
+        for worker in self._workers:
+            if worker is not source and worker.writer is not None:
+                try:
+                    await _send(worker.writer, {"op": "event", "kind": kind, "data": data})
+                except ConnectionError:
+                    pass
+
+    # ---------- reporting ----------
+    def status(self) -> Dict[str, Any]:
+        return {
+            "shard_count": self.shard_count,
+            "max_concurrency": self.gate.max_concurrency if self.gate else None,
+            "identifies": self.gate.granted if self.gate else 0,
+            "identify_wait_s": round(self.gate.waited, 2) if self.gate else 0.0,
+            "relayed": self.relayed,
+            "workers": [
+                {
+                    "index": worker.spec.index,
+                    "shards": _span(worker.spec.shard_ids),
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": bool(worker.process and worker.process.is_alive()),
+                    "connected": worker.writer is not None,
+                    "restarts": worker.restarts,
+                    "loop_lag_p99_ms": worker.loop_lag_p99_ms,
+                }
+                for worker in self._workers
+            ],
+            "shards": {str(shard_id): stats for shard_id, stats in sorted(self.shards.items())},
+        }
+
+    def summary(self) -> str:
+        reporting = [stats for stats in self.shards.values() if stats.get("latency_ms") is not None]
+        events = sum(stats.get("events_per_s", 0.0) for stats in self.shards.values())
+        alive = sum(1 for worker in self._workers if worker.process and worker.process.is_alive())
+        worst = max(reporting, key=lambda stats: stats["latency_ms"], default=None)
+        latency = f"worst latency {worst['latency_ms']} ms" if worst else "no heartbeats yet"
+        return f"{alive}/{len(self._workers)} workers up, {len(reporting)}/{self.shard_count} shards reporting, {events:.1f} events/s, {latency}"
+
+def _span(shard_ids: Tuple[int, ...]) -> str:
+    return f"{shard_ids[0]}-{shard_ids[-1]}" if len(shard_ids) > 1 else str(shard_ids[0])
+
+class ShardBus:
+    """Worker side of the orchestrator's local IPC.
+
+    `acquire_identify()` waits for the parent's permit, `broadcast()` sends a
+    state change to every other worker, where handlers registered with
+    `subscribe()` apply it, and `start_reporting()` ships per-shard stats to
+    the parent. If the parent is unreachable, identifies fall back to the
+    plain 5 s spacing and broadcasts are dropped.
+    """
+
+    def __init__(self, spec: WorkerSpec) -> None:
+        self.spec = spec
+        self.index = spec.index
+        self.workers = spec.workers
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._handlers: Dict[str, List[EventHandler]] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._seq = itertools.count(1)
+        self._tasks: List[asyncio.Task] = []
+        self.sent = 0
+        self.received = 0
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(*self.spec.address, limit=_LINE_LIMIT)
+        await _send(self._writer, {"op": "hello", "worker": self.index, "key": self.spec.key})
+        self._tasks.append(asyncio.create_task(self._read()))
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    def subscribe(self, kind: str, handler: EventHandler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    async def acquire_identify(self, shard_id: int) -> None:
+        try:
+            await self._request("identify", shard=shard_id)
+        except ConnectionError:
+            await asyncio.sleep(IDENTIFY_INTERVAL)
+
+    async def identified(self, shard_id: int) -> None:
+        """Tell the parent the permitted IDENTIFY is on the wire, so the bucket's interval starts now."""
+        if self.connected:
+            try:
+                await _send(self._writer, {"op": "identified", "shard": shard_id})
+            except ConnectionError:
+                pass
+
+    async def broadcast(self, kind: str, data: Any = None) -> None:
+        if not self.connected:
+            return
+        self.sent += 1
+        try:
+            await _send(self._writer, {"op": "broadcast", "kind": kind, "data": data})
+        except ConnectionError:
+            pass
+
+    async def cluster_status(self) -> Dict[str, Any]:
+        return (await self._request("status"))["status"]
+
+    async def request_shutdown(self) -> None:
+        if self.connected:
+            await _send(self._writer, {"op": "shutdown"})
+
+    def start_reporting(self, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Send `collect()` (a `{"shards": {...}}` dict) to the parent every stats interval."""
+        self._tasks.append(asyncio.create_task(self._report(collect)))
+
+    async def _report(self, collect: Callable[[], Dict[str, Any]]) -> None:
+        while True:
+            await asyncio.sleep(self.spec.stats_interval)
+            if self.connected:
+                try:
+                    await _send(self._writer, {"op": "stats", **collect()})
+                except ConnectionError:
+                    pass
+
+    async def _request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        if not self.connected:
+            raise ConnectionError("not connected to the shard orchestrator")
+        request_id = next(self._seq)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await _send(self._writer, {"op": op, "id": request_id, **fields})
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message["op"] == "reply":
+                    future = self._pending.get(message["id"])
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                elif message["op"] == "event":
+                    self.received += 1
+                    for handler in self._handlers.get(message["kind"], []):
+                        try:
+                            result = handler(message.get("data"))
+                            if asyncio.iscoroutine(result):
+                                await result
+                        except Exception as e:
+                            print(f"Shard event handler for {message['kind']} failed: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("lost the shard orchestrator"))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight task.
+
+    The first caller for a key starts `factory()`; everyone who asks for that
+    key while it is running awaits the same task and gets the same result
+    (or exception). Waiters are shielded, so one cancelled command does not
+    abort the lookup for the others.
+    """
+
+    __slots__ = ("_inflight", "calls", "shared")
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": len(self._inflight), "calls": self.calls, "shared": self.shared}
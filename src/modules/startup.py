@@ -0,0 +1,95 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from discord import app_commands
+
+class StartupReport:
+    """Per-extension import/setup timings collected while the bot boots."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.extensions: Dict[str, Dict[str, Any]] = {}
+        self.phases: Dict[str, float] = {}
+        self.tree_synced: Optional[bool] = None
+
+    def record(self, name: str, **fields: Any) -> None:
+        self.extensions.setdefault(name, {}).update(fields)
+
+    def phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds * 1000, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "phases_ms": self.phases,
+            "tree_synced": self.tree_synced,
+            "extensions": self.extensions,
+        }
+
+    def summary(self) -> List[str]:
+        """Slowest extensions first, one printable line each."""
+        rows = sorted(
+            self.extensions.items(),
+            key=lambda item: item[1].get("import_ms", 0) + item[1].get("setup_ms", 0),
+            reverse=True,
+        )
+        return [
+            f"{name}: import {info.get('import_ms', 0):.1f} ms, setup {info.get('setup_ms', 0):.1f} ms"
+            + (f" (failed: {info['error']})" if "error" in info else "")
+            for name, info in rows
+        ]
+
+    def write(self, path: str) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+def timed_import(name: str) -> float:
+    """Import `name` (warming its dependencies in sys.modules); returns seconds taken.
+
+    Runs in a worker thread. `load_extension` re-executes the cog module itself
+    afterwards, but everything it imports is already cached by then.
+    """
+    started = time.perf_counter()
+    importlib.import_module(name)
+    return time.perf_counter() - started
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def command_tree_hash(tree: app_commands.CommandTree, application_id: Optional[int]) -> str:
+    """Stable hash of the global slash-command payload that `tree.sync()` would upload."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda data: (data.get("type", 1), data["name"]),
+    )
+    blob = json.dumps({"application_id": application_id, "commands": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def read_synced_hash(path: str) -> Optional[str]:
+    try:
+        return Path(path).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+def write_synced_hash(path: str, digest: str) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(digest, encoding="utf-8")
@@ -0,0 +1,317 @@
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_DELETE = object()  # marker for a pending delete in the write-behind queue
+
+Row = Tuple[str, str, Optional[str]]  # (namespace, key, JSON value or None to delete)
+
+class StorageBackend:
+    """Synchronous key/value backend; `Storage` only ever calls it from one worker thread."""
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def load(self, namespace: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def write_many(self, rows: List[Row]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class MemoryBackend(StorageBackend):
+    """Volatile backend (the old behaviour); handy for benchmarks and throwaway bots."""
+
+    def __init__(self) -> None:
+        self._data: Dict[Tuple[str, str], str] = {}
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        return self._data.get((namespace, key))
+
+    def load(self, namespace: str) -> Dict[str, str]:
+        return {k: v for (ns, k), v in self._data.items() if ns == namespace}
+
+    def write_many(self, rows: List[Row]) -> None:
+        for namespace, key, value in rows:
+            if value is None:
+                self._data.pop((namespace, key), None)
+            else:
+                self._data[(namespace, key)] = value
+
+class SQLiteBackend(StorageBackend):
+    """Single-table SQLite store in WAL mode; each flush is one transaction."""
+
+    def __init__(self, path: str) -> None:
+        Path(path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        return row[0] if row else None
+
+    def load(self, namespace: str) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,)))
+
+    def write_many(self, rows: List[Row]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO kv (namespace, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+                [row for row in rows if row[2] is not None],
+            )
+            self._conn.executemany(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?",
+                [(ns, key) for ns, key, value in rows if value is None],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+class Namespace:
+    """Read-through cached view of one namespace; writes return at dict speed.
+
+    With `cache=False` values are not kept in memory once flushed (reads of
+    flushed keys go to the backend), for large namespaces that are rarely read.
+    Keys found missing are remembered in an LRU of `MAX_ABSENT` entries, so
+    lookups of arbitrary ids (e.g. every reacted message) can't grow it forever.
+    """
+
+    MAX_ABSENT = 10000
+
+    def __init__(self, storage: "Storage", name: str, *, cache: bool = True) -> None:
+        self._storage = storage
+        self.name = name
+        self.cache = cache
+        self._cache: Dict[str, Any] = {}
+        self._absent: "OrderedDict[str, None]" = OrderedDict()
+        self._loaded = False
+
+    async def get(self, key: Any, default: Any = None) -> Any:
+        key = str(key)
+        if not self.cache:
+            pending = self._storage._dirty.get((self.name, key), default)
+            if pending is not default:
+                return default if pending is _DELETE else pending
+            raw = await self._storage._run(self._storage.backend.get, self.name, key)
+            return default if raw is None else json.loads(raw)
+        if key in self._cache:
+            return self._cache[key]
+        if self._loaded:
+            return default
+        if key in self._absent:
+            self._absent.move_to_end(key)
+            return default
+        if self._storage._dirty.get((self.name, key)) is _DELETE:  # its absent marker may have been evicted
+            return default
+        raw = await self._storage._run(self._storage.backend.get, self.name, key)
+        if key in self._cache or key in self._absent:  # written while we were reading
+            return self._cache.get(key, default)
+        if raw is None:
+            self._mark_absent(key)
+            return default
+        value = self._cache[key] = json.loads(raw)
+        return value
+
+    async def contains(self, key: Any) -> bool:
+        marker = object()
+        return await self.get(key, marker) is not marker
+
+    async def set(self, key: Any, value: Any) -> None:
+        key = str(key)
+        if self.cache:
+            self._cache[key] = value
+            self._absent.pop(key, None)
+        self._storage._enqueue(self.name, key, value)
+
+    async def delete(self, key: Any) -> None:
+        key = str(key)
+        if self.cache:
+            self._cache.pop(key, None)
+            self._mark_absent(key)
+        self._storage._enqueue(self.name, key, _DELETE)
+
+    def invalidate(self, key: Any) -> None:
+        """Forget the cached value of `key` (another process wrote it); the next read goes to the backend."""
+        key = str(key)
+        self._cache.pop(key, None)
+        self._absent.pop(key, None)
+        self._loaded = False
+
+    def _mark_absent(self, key: str) -> None:
+        self._absent[key] = None
+        self._absent.move_to_end(key)
+        while len(self._absent) > self.MAX_ABSENT:
+            self._absent.popitem(last=False)
+
+    async def items(self) -> List[Tuple[str, Any]]:
+        """Every entry in the namespace (loads the whole namespace on first call)."""
+        if not self.cache:
+            rows = await self._storage._run(self._storage.backend.load, self.name)
+            merged = {key: json.loads(raw) for key, raw in rows.items()}
+            for (ns, key), value in self._storage._dirty.items():
+                if ns != self.name:
+                    continue
+                if value is _DELETE:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+            return list(merged.items())
+        if not self._loaded:
+            rows = await self._storage._run(self._storage.backend.load, self.name)
+            for key, raw in rows.items():
+                if key not in self._cache and key not in self._absent:
+                    self._cache[key] = json.loads(raw)
+            self._absent.clear()
+            self._loaded = True
+        return list(self._cache.items())
+
+class Storage:
+    """Shared async key/value store for cog state.
+
+    Reads are served from an in-memory cache filled on demand from the backend.
+    Writes update the cache immediately and are queued; a single background
+    task coalesces them per key and flushes them in one backend transaction
+    every `flush_interval` seconds (or sooner once `max_pending` keys are dirty).
+    """
+
+    def __init__(self, backend: StorageBackend, *, flush_interval: float = 0.5, max_pending: int = 1000) -> None:
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        self._namespaces: Dict[str, Namespace] = {}
+        self._dirty: Dict[Tuple[str, str], Any] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_listeners: List[Callable[[List[Tuple[str, str]]], Any]] = []
+        self.writes = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Storage":
+        """Build storage from the optional `Storage` section of config.json."""
+        section = config.get("Storage") or {}
+        kind = section.get("Backend", "sqlite")
+        if kind == "sqlite":
+            backend: StorageBackend = SQLiteBackend(section.get("Path", "data/bot.sqlite3"))
+        elif kind == "memory":
+            backend = MemoryBackend()
+        else:
+            raise ValueError(f"Unknown storage backend '{kind}' (expected 'sqlite' or 'memory').")
+        return cls(
+            backend,
+            flush_interval=section.get("FlushInterval", 0.5),
+            max_pending=section.get("MaxPending", 1000),
+        )
+
+    def namespace(self, name: str, *, cache: bool = True) -> Namespace:
+        if name not in self._namespaces:
+            self._namespaces[name] = Namespace(self, name, cache=cache)
+        return self._namespaces[name]
+
+    def on_flush(self, callback: Callable[[List[Tuple[str, str]]], Any]) -> None:
+        """Call `callback([(namespace, key), ...])` after each successful flush."""
+        self._flush_listeners.append(callback)
+
+    def invalidate(self, namespace: str, key: str) -> None:
+        """Drop a key from the namespace's cache unless this process has its own write pending."""
+        if namespace in self._namespaces and (namespace, key) not in self._dirty:
+            self._namespaces[namespace].invalidate(key)
+
+    async def _run(self, func, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _enqueue(self, namespace: str, key: str, value: Any) -> None:
+        self._dirty[(namespace, key)] = value
+        self.writes += 1
+        self._ensure_flusher()
+        if len(self._dirty) >= self.max_pending:
+            self._wakeup.set()
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every queued change to the backend now."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        # Serialise on the loop so cogs can't mutate a value mid-dump
+        rows: List[Row] = []
+        for (ns, key), value in list(dirty.items()):
+            try:
+                rows.append((ns, key, None if value is _DELETE else json.dumps(value)))
+            except (TypeError, ValueError) as e:
+                # Retrying can't fix the value; drop this key and keep the rest of the batch
+                print(f"Storage write of {ns}/{key} dropped, value is not JSON-serialisable: {e}")
+                del dirty[(ns, key)]
+                self._namespaces[ns].invalidate(key)  # reads fall back to what the backend holds
+                self.dropped += 1
+        if not rows:
+            return
+        try:
+            await self._run(self.backend.write_many, rows)
+        except Exception as e:
+            print(f"Storage flush failed, will retry: {e}")
+            for item, value in dirty.items():
+                self._dirty.setdefault(item, value)
+            return
+        self.flushes += 1
+        self.rows_flushed += len(rows)
+        for callback in self._flush_listeners:
+            try:
+                callback(list(dirty))
+            except Exception as e:
+                print(f"Storage flush listener {callback!r} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "namespaces": len(self._namespaces),
+            "writes": self.writes,
+            "pending": len(self._dirty),
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "dropped": self.dropped,
+        }
+
+    async def close(self) -> None:
+        """Stop the flusher, write everything still pending and close the backend."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        await self._run(self.backend.close)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+PageFetcher = Callable[[str], Awaitable[List[str]]]
+
+class _Page:
+    __slots__ = ("gifs", "expires", "cursor", "hits")
+
+    def __init__(self, gifs: List[str], expires: float) -> None:
+        self.gifs = gifs
+        self.expires = expires
+        self.cursor = 0
+        self.hits = 0  # served since this page was fetched; drives prefetching
+
+class TenorCache:
+    """Per-query cache of Tenor result pages with TTL + LRU eviction.
+
+    One upstream call fetches a page of GIF URLs; successive `next_gif()`
+    calls for the same query walk through that page (in Tenor's order, or
+    shuffled once per fetch) instead of re-requesting it. A background task
+    refetches pages that are still being used shortly before they expire,
+    so popular searches never wait on Tenor. Concurrent misses for one query
+    share a single fetch.
+    """
+
+    def __init__(
+        self,
+        fetch_page: PageFetcher,
+        *,
+        ttl: float = 600.0,
+        max_queries: int = 256,
+        order: str = "shuffle",
+        prefetch_before: float = 60.0,
+        prefetch_min_hits: int = 3,
+        prefetch_interval: float = 15.0,
+    ) -> None:
+        if order not in ("shuffle", "rotate"):
+            raise ValueError(f"Unknown Tenor result order: {order}")
+        self.fetch_page = fetch_page
+        self.ttl = ttl
+        self.max_queries = max_queries
+        self.order = order
+        self.prefetch_before = prefetch_before
+        self.prefetch_min_hits = prefetch_min_hits
+        self.prefetch_interval = prefetch_interval
+        self._pages: "OrderedDict[str, _Page]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._prefetcher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.prefetches = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], fetch_page: PageFetcher) -> "TenorCache":
+        """Build a cache from the optional `TenorCache` section of config.json."""
+        section = config.get("TenorCache") or {}
+        return cls(
+            fetch_page,
+            ttl=section.get("Ttl", 600.0),
+            max_queries=section.get("MaxQueries", 256),
+            order=section.get("Order", "shuffle"),
+            prefetch_before=section.get("PrefetchBefore", 60.0),
+            prefetch_min_hits=section.get("PrefetchMinHits", 3),
+            prefetch_interval=section.get("PrefetchInterval", 15.0),
+        )
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    async def next_gif(self, query: str) -> Optional[str]:
+        """Return the next GIF URL for `query`, or None when Tenor has no results."""
+        key = self.normalize(query)
+        page = self._pages.get(key)
+        if page is not None and page.expires > time.monotonic():
+            self._pages.move_to_end(key)
+            self.hits += 1
+        else:
+            page = await self._refresh(key)
+        if not page.gifs:
+            return None
+        page.hits += 1
+        gif = page.gifs[page.cursor % len(page.gifs)]
+        page.cursor += 1
+        return gif
+
+    async def _refresh(self, key: str) -> _Page:
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._start_fetch(key)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: str) -> asyncio.Task:
+        task = asyncio.create_task(self._fetch(key))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch(self, key: str) -> _Page:
+        self.upstream_calls += 1
+        gifs = list(await self.fetch_page(key))
+        if self.order == "shuffle":
+            random.shuffle(gifs)
+        page = _Page(gifs, time.monotonic() + self.ttl)
+        self._pages[key] = page
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_queries:
+            self._pages.popitem(last=False)
+            self.evictions += 1
+        return page
+
+    def start(self) -> None:
+        """Start the background prefetcher."""
+        if self._prefetcher is None or self._prefetcher.done():
+            self._prefetcher = asyncio.create_task(self._prefetch_loop())
+
+    async def _prefetch_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.prefetch_interval)
+            now = time.monotonic()
+            for key, page in list(self._pages.items()):
+                if page.expires <= now:
+                    # Expired and nobody asked again: drop it rather than refetch
+                    del self._pages[key]
+                elif page.expires - now <= self.prefetch_before and page.hits >= self.prefetch_min_hits and key not in self._inflight:
+                    self.prefetches += 1
+                    self._start_fetch(key).add_done_callback(self._log_prefetch_error)
+
+    @staticmethod
+    def _log_prefetch_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Tenor prefetch failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queries": len(self._pages),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "prefetches": self.prefetches,
+            "evictions": self.evictions,
+        }
+
+    async def close(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+            self._prefetcher = None
+        for task in list(self._inflight.values()):
+            task.cancel()
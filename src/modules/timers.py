@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from src.modules.storage import Storage
+except ImportError:
+    from modules.storage import Storage
+
+TimerHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+class TimerService:
+    """Durable one-shot timers driven by a single dispatcher task.
+
+    Deadlines (wall-clock seconds) and their payloads are persisted in the
+    `timers` storage namespace, so pending temp roles and giveaways survive a
+    restart and are re-armed by `start()`. In memory each pending timer costs
+    one heap tuple and one dict entry; payloads stay on disk until they fire.
+    Cogs register a handler per timer `kind`; handlers run as their own tasks
+    so a slow one never delays the rest.
+
+    In a sharded launch every worker shares the store, so timers are stamped
+    with the scheduling worker's `owner` index and each worker only arms its
+    own (timers from unknown or missing owners fall to worker 0).
+    """
+
+    MAX_SLEEP = 300.0  # re-check the heap at least this often (wall-clock jumps)
+
+    def __init__(self, storage: Storage, *, wait_ready: Optional[Callable[[], Awaitable[Any]]] = None, owner: Optional[int] = None, owners: int = 1) -> None:
+        self._records = storage.namespace("timers", cache=False)
+        self._wait_ready = wait_ready
+        self.owner = owner
+        self.owners = owners
+        self._handlers: Dict[str, TimerHandler] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self.fired = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: TimerHandler) -> None:
+        """Route timers of `kind` to `handler(data)` when they come due."""
+        self._handlers[kind] = handler
+
+    async def schedule(self, kind: str, delay: float, data: Dict[str, Any], *, timer_id: Optional[str] = None) -> str:
+        """Persist and arm a timer `delay` seconds from now; an existing `timer_id` is replaced."""
+        due = time.time() + delay
+        timer_id = timer_id or f"{kind}:{time.time_ns()}"
+        record = {"kind": kind, "due": due, "data": data}
+        if self.owner is not None:
+            record["owner"] = self.owner
+        await self._records.set(timer_id, record)
+        self._arm(timer_id, due)
+        return timer_id
+
+    async def cancel(self, timer_id: str) -> bool:
+        """Drop a pending timer; returns False if it was not pending."""
+        if self._due.pop(timer_id, None) is None:
+            return False
+        await self._records.delete(timer_id)
+        return True
+
+    def _owns(self, record: Dict[str, Any]) -> bool:
+        if self.owner is None:
+            return True
+        owner = record.get("owner", 0)
+        return (owner if isinstance(owner, int) and 0 <= owner < self.owners else 0) == self.owner
+
+    def pending(self, timer_id: str) -> bool:
+        return timer_id in self._due
+
+    def _arm(self, timer_id: str, due: float) -> None:
+        # Replaced/cancelled entries stay in the heap and are skipped when popped
+        self._due[timer_id] = due
+        heapq.heappush(self._heap, (due, timer_id))
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(d, t) for t, d in self._due.items()]
+            heapq.heapify(self._heap)
+        if self._heap[0][1] == timer_id:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Re-arm every persisted timer and start the dispatcher."""
+        for timer_id, record in await self._records.items():
+            if self._owns(record):
+                self._due[timer_id] = record["due"]
+        self._heap = [(due, timer_id) for timer_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self) -> None:
+        if self._wait_ready is not None:
+            await self._wait_ready()
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, timer_id = heapq.heappop(self._heap)
+                if self._due.get(timer_id) != due:
+                    continue  # stale entry for a replaced or cancelled timer
+                del self._due[timer_id]
+                task = asyncio.create_task(self._fire(timer_id))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            delay = self._heap[0][0] - now if self._heap else self.MAX_SLEEP
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(delay, self.MAX_SLEEP))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, timer_id: str) -> None:
+        record = await self._records.get(timer_id)
+        if record is None:
+            return
+        handler = self._handlers.get(record["kind"])
+        if handler is None:
+            # Leave it on disk; it is re-armed on the next start once its cog is loaded
+            print(f"No handler registered for timer {timer_id} ({record['kind']}); keeping it for next start.")
+            return
+        try:
+            await handler(record["data"])
+            self.fired += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Timer {timer_id} ({record['kind']}) failed: {e}")
+        if timer_id not in self._due:  # not re-scheduled by the handler
+            await self._records.delete(timer_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._due),
+            "heap": len(self._heap),
+            "running": len(self._running),
+            "fired": self.fired,
+            "failed": self.failed,
+            "next_due_in": round(self._heap[0][0] - time.time(), 1) if self._heap else None,
+        }
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        for task in list(self._running):
+            task.cancel()
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Tuple
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded in-memory cache with per-entry TTL and LRU eviction.
+
+    Keys are spread over `shards` small OrderedDicts, each capped at its share
+    of `max_size`. Entries are bare `(expires, value)` tuples. Expired entries
+    are dropped lazily when read and by a periodic sweep that visits one shard
+    per tick, so a sweep never stalls the event loop on a large cache. With
+    `stale_ttl`, expired entries are kept that much longer so `peek()` can
+    serve them while the caller refreshes in the background.
+    """
+
+    __slots__ = ("ttl", "stale_ttl", "max_size", "sweep_interval", "_shards", "_shard_cap", "_sweeper", "_next_shard",
+                 "hits", "stale_hits", "misses", "expirations", "evictions")
+
+    def __init__(self, *, max_size: int = 10000, ttl: float = 300.0, stale_ttl: float = 0.0, shards: int = 16, sweep_interval: float = 60.0) -> None:
+        if max_size < 1 or shards < 1:
+            raise ValueError("max_size and shards must be positive")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        shards = min(shards, max_size)
+        self._shards: List["OrderedDict[Hashable, Tuple[float, Any]]"] = [OrderedDict() for _ in range(shards)]
+        self._shard_cap = -(-max_size // shards)
+        self._sweeper: Optional[asyncio.Task] = None
+        self._next_shard = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, section: Optional[Mapping[str, Any]], *, ttl: float, stale_ttl: float = 0.0) -> "TTLCache":
+        """Build a cache from a config section with `MaxEntries`, `Shards` and `SweepInterval`."""
+        section = section or {}
+        return cls(
+            max_size=section.get("MaxEntries", 10000),
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            shards=section.get("Shards", 16),
+            sweep_interval=section.get("SweepInterval", 60.0),
+        )
+
+    def _shard(self, key: Hashable) -> "OrderedDict[Hashable, Tuple[float, Any]]":
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value, fresh = self.peek(key, default)
+        return value if fresh else default
+
+    def peek(self, key: Hashable, default: Any = None) -> Tuple[Any, bool]:
+        """Return `(value, fresh)`; expired values still inside `stale_ttl` come back with fresh=False."""
+        shard = self._shard(key)
+        entry = shard.get(key)
+        if entry is None:
+            self.misses += 1
+            return default, False
+        now = time.monotonic()
+        if entry[0] <= now:
+            if entry[0] + self.stale_ttl <= now:
+                del shard[key]
+                self.expirations += 1
+                self.misses += 1
+                return default, False
+            shard.move_to_end(key)
+            self.stale_hits += 1
+            return entry[1], False
+        shard.move_to_end(key)
+        self.hits += 1
+        return entry[1], True
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        shard = self._shard(key)
+        shard[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        shard.move_to_end(key)
+        if len(shard) > self._shard_cap:
+            shard.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._shard(key).pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._shard(key).get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    def sweep(self, shard_index: Optional[int] = None) -> int:
+        """Drop expired entries from one shard (or all of them); returns how many were removed."""
+        now = time.monotonic() - self.stale_ttl
+        shards = self._shards if shard_index is None else [self._shards[shard_index]]
+        removed = 0
+        for shard in shards:
+            expired = [key for key, (expires, _) in shard.items() if expires <= now]
+            for key in expired:
+                del shard[key]
+            removed += len(expired)
+        self.expirations += removed
+        return removed
+
+    def start(self) -> None:
+        """Start the periodic expiry sweep; each full pass over all shards takes `sweep_interval`."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval / len(self._shards))
+            self.sweep(self._next_shard)
+            self._next_shard = (self._next_shard + 1) % len(self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_size": self.max_size,
+            "shards": len(self._shards),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None